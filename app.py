@@ -1,196 +1,81 @@
-from flask import Flask, jsonify, request, render_template_string
+from flask import Flask, jsonify, request
 import os
 import json
 import uuid
 import random
+import threading
 import time
+from concurrent.futures import wait
 from datetime import datetime
 
 # Import from backend modules
-from backend.analyzer import GameplayAnalyzer
+from backend.artifacts import write_analysis
+from backend.assets import register_assets
+from backend.capture import ScreenCapture, SyntheticCapture
+from backend.containers import decodable_seconds
+from backend.events import EventBroker, job_listener, match_topic, parse_last_event_id
+from backend.executor import get_executor
+from backend.jobs import FINISHED_STATES, JobQueue, QueueFullError
+from backend.live import LiveSession, LiveSessionRegistry, demo_detectors, session_options
+from backend.pages import RenderedPage
+from backend.pros import ProIndex, k_from_args
+from backend.responses import conditional_response, negotiate_encoding, not_modified, sse_response
+from backend.store import MatchStore, percentile_query_from_args, query_from_args
+from backend.uploads import UploadError, UploadManager
+from backend.video import VIDEO_EXTENSIONS, probe_video
+from backend.windows import WindowedAnalysis
 
 app = Flask(__name__)
+# Dashboard CSS/JS are served as fingerprinted files under /assets/dist/
+register_assets(app)
 
-# In-memory storage for demo
-MATCHES = {}
 DATA_DIR = "data/matches"
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Persistent match index, shared by every worker process
+MATCH_STORE = MatchStore(os.path.join(DATA_DIR, "matches.db"), DATA_DIR)
+
+# Pro-player reference index, memory-mapped; None until built offline
+PRO_INDEX = ProIndex.load()
+
+# Gameplay analyzer run by the analysis executor (see backend/executor.py)
+ANALYZER = "backend.analyzer:GameplayAnalyzer"
+
+# Frame rate recorded videos are sampled at for analysis
+SAMPLE_FPS = int(os.environ.get("BGMI_SAMPLE_FPS", 10))
+
+# Largest accepted upload (recorded matches run to a few GB)
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("BGMI_MAX_UPLOAD_MB", 4096)) * 1024 * 1024
+
+# Chunked uploads are assembled directly in their match directory
+UPLOADS = UploadManager(DATA_DIR, allowed_extensions=VIDEO_EXTENSIONS)
+
+# Early analyses of uploads still in progress, by upload id (per process)
+EARLY_ANALYSES = {}
+EARLY_ANALYSES_LOCK = threading.Lock()
+
+# SSE broker for live sessions and analysis progress, and the live sessions (both per process)
+EVENTS = EventBroker()
+LIVE_SESSIONS = LiveSessionRegistry(max_sessions=int(os.environ.get("BGMI_LIVE_SESSIONS", 4)))
+# Seconds a live session keeps capturing with no client on its events stream
+LIVE_IDLE_TIMEOUT = int(os.environ.get("BGMI_LIVE_IDLE_SECONDS", 60))
+
+# Background analysis jobs, so uploads never block the request threads.
+# Each job waits on one analysis worker, so keep at least as many job workers.
+JOBS = JobQueue(
+    workers=int(os.environ.get("BGMI_JOB_WORKERS", os.environ.get("BGMI_ANALYSIS_WORKERS", 2))),
+    max_depth=int(os.environ.get("BGMI_JOB_QUEUE_DEPTH", 32)),
+    listener=job_listener(EVENTS)
+)
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
     <title>BGMI Coach Demo</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        body { 
-            font-family: Arial, sans-serif; 
-            margin: 0; 
-            padding: 0; 
-            background: #f8f9fa; 
-            color: #333; 
-        }
-        .container { 
-            max-width: 1000px; 
-            margin: 0 auto; 
-            padding: 20px; 
-        }
-        header {
-            background: #6200ea;
-            color: white;
-            padding: 20px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            margin-bottom: 20px;
-        }
-        header h1 {
-            margin: 0;
-        }
-        .card { 
-            background: white; 
-            border-radius: 8px; 
-            padding: 20px; 
-            margin-bottom: 20px; 
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        .stat-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
-            gap: 15px;
-            margin-top: 15px;
-        }
-        .stat-box {
-            background: #f2f2f2;
-            padding: 15px;
-            border-radius: 4px;
-            text-align: center;
-        }
-        .stat-box h3 {
-            margin-top: 0;
-            font-size: 14px;
-            text-transform: uppercase;
-            color: #666;
-        }
-        .stat-value {
-            font-size: 24px;
-            font-weight: bold;
-            color: #6200ea;
-            margin: 10px 0;
-        }
-        .badge {
-            display: inline-block;
-            padding: 5px 10px;
-            border-radius: 30px;
-            font-size: 12px;
-            font-weight: bold;
-            margin-right: 5px;
-        }
-        .badge-success { background: #28a745; color: white; }
-        .badge-warning { background: #ffc107; color: black; }
-        .badge-danger { background: #dc3545; color: white; }
-        .badge-primary { background: #6200ea; color: white; }
-        .badge-info { background: #17a2b8; color: white; }
-        
-        .recommendations {
-            margin-top: 20px;
-        }
-        .recommendation {
-            background: #f8f9fa;
-            border-left: 4px solid #6200ea;
-            padding: 15px;
-            margin-bottom: 10px;
-            border-radius: 0 4px 4px 0;
-        }
-        .recommendation.high {
-            border-left-color: #dc3545;
-        }
-        .recommendation.medium {
-            border-left-color: #ffc107;
-        }
-        .recommendation.low {
-            border-left-color: #28a745;
-        }
-        .recommendation h4 {
-            margin-top: 0;
-            display: flex;
-            align-items: center;
-        }
-        .recommendation p {
-            margin-bottom: 0;
-            color: #666;
-        }
-        
-        button {
-            background: #6200ea;
-            color: white;
-            border: none;
-            padding: 10px 20px;
-            border-radius: 4px;
-            cursor: pointer;
-            font-weight: bold;
-            transition: background 0.3s;
-        }
-        button:hover {
-            background: #5000ca;
-        }
-        button:disabled {
-            background: #ccc;
-            cursor: not-allowed;
-        }
-        
-        .tabs {
-            display: flex;
-            border-bottom: 1px solid #ddd;
-            margin-bottom: 20px;
-        }
-        .tab {
-            padding: 10px 20px;
-            cursor: pointer;
-            border-bottom: 3px solid transparent;
-        }
-        .tab.active {
-            border-bottom-color: #6200ea;
-            font-weight: bold;
-        }
-        .tab-content {
-            display: none;
-        }
-        .tab-content.active {
-            display: block;
-        }
-        
-        .summary {
-            white-space: pre-line;
-            line-height: 1.5;
-        }
-        
-        .actions {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 20px;
-        }
-        
-        .charts {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-            gap: 20px;
-            margin-top: 20px;
-        }
-        .chart {
-            background: white;
-            padding: 15px;
-            border-radius: 8px;
-            min-height: 300px;
-        }
-        
-        @media (max-width: 768px) {
-            .stat-grid {
-                grid-template-columns: 1fr 1fr;
-            }
-            .charts {
-                grid-template-columns: 1fr;
-            }
-        }
-    </style>
+    <link rel="stylesheet" href="{{ asset_url('dashboard.css') }}">
+    <script src="{{ asset_url('dashboard.js') }}" defer></script>
 </head>
 <body>
     <header>
@@ -255,257 +140,28 @@ HTML_TEMPLATE = """
             </div>
         </div>
     </div>
-
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {
-            // Tab navigation
-            document.querySelectorAll('.tab').forEach(tab => {
-                tab.addEventListener('click', function() {
-                    // Remove active class from all tabs and content
-                    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-                    document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
-                    
-                    // Add active class to clicked tab
-                    this.classList.add('active');
-                    
-                    // Show corresponding content
-                    const tabId = this.getAttribute('data-tab');
-                    document.getElementById(tabId + '-tab').classList.add('active');
-                });
-            });
-            
-            // Simulate match button
-            document.getElementById('simulateMatchBtn').addEventListener('click', async function() {
-                this.disabled = true;
-                this.textContent = 'Analyzing...';
-                
-                try {
-                    const response = await fetch('/api/simulate-match', {
-                        method: 'POST',
-                        headers: {
-                            'Content-Type': 'application/json'
-                        },
-                        body: JSON.stringify({
-                            game_mode: 'Squad',
-                            map_name: 'Erangel'
-                        })
-                    });
-                    
-                    if (response.ok) {
-                        const result = await response.json();
-                        document.getElementById('matchStatus').innerHTML = `
-                            <h2>Match Analysis Complete</h2>
-                            <p>Analysis generated for match ID: ${result.match_id}</p>
-                            <p>Overall score: <b>${Math.round(result.overall_score * 100) / 100}/1.0</b></p>
-                        `;
-                        
-                        // Load the analysis data
-                        loadAnalysisData(result.match_id);
-                    } else {
-                        document.getElementById('matchStatus').innerHTML = `
-                            <h2>Error</h2>
-                            <p>Failed to simulate match analysis.</p>
-                        `;
-                    }
-                } catch (error) {
-                    console.error('Error:', error);
-                    document.getElementById('matchStatus').innerHTML = `
-                        <h2>Error</h2>
-                        <p>An unexpected error occurred: ${error.message}</p>
-                    `;
-                } finally {
-                    this.disabled = false;
-                    this.textContent = 'Simulate Match Analysis';
-                }
-            });
-            
-            // Clear matches button
-            document.getElementById('clearMatchesBtn').addEventListener('click', async function() {
-                if (confirm('Are you sure you want to clear all match data?')) {
-                    const response = await fetch('/api/clear-matches', { method: 'POST' });
-                    if (response.ok) {
-                        document.getElementById('matchStatus').innerHTML = `
-                            <h2>Demo Status</h2>
-                            <p>All match data cleared. Use the "Simulate Match Analysis" button to generate new analysis data.</p>
-                        `;
-                        
-                        // Reset all tabs
-                        document.getElementById('overview-content').innerHTML = '<p>No match analysis data available yet. Please simulate a match first.</p>';
-                        document.getElementById('aim-content').innerHTML = '<p>No aim analysis data available yet. Please simulate a match first.</p>';
-                        document.getElementById('positioning-content').innerHTML = '<p>No positioning analysis data available yet. Please simulate a match first.</p>';
-                        document.getElementById('decisions-content').innerHTML = '<p>No decision making analysis data available yet. Please simulate a match first.</p>';
-                        document.getElementById('recommendations-content').innerHTML = '<p>No recommendations available yet. Please simulate a match first.</p>';
-                    }
-                }
-            });
-            
-            // Function to load analysis data
-            async function loadAnalysisData(matchId) {
-                try {
-                    const response = await fetch(`/api/analysis/${matchId}`);
-                    if (response.ok) {
-                        const analysis = await response.json();
-                        
-                        // Update overview tab
-                        let overviewHtml = `
-                            <div class="summary">${analysis.summary}</div>
-                            <h3>Performance Metrics</h3>
-                            <div class="stat-grid">
-                        `;
-                        
-                        // Calculate overall score for each category
-                        const aimMetrics = analysis.metrics.aim;
-                        const positioningMetrics = analysis.metrics.positioning;
-                        const decisionMetrics = analysis.metrics.decision_making;
-                        
-                        const aimScore = Object.values(aimMetrics).reduce((sum, val) => sum + val, 0) / Object.values(aimMetrics).length;
-                        const positioningScore = Object.values(positioningMetrics).reduce((sum, val) => sum + val, 0) / Object.values(positioningMetrics).length;
-                        const decisionScore = Object.values(decisionMetrics).reduce((sum, val) => sum + val, 0) / Object.values(decisionMetrics).length;
-                        
-                        // Add overall stats
-                        overviewHtml += createStatBox('Aim Overall', Math.round(aimScore * 100) / 100, getRatingClass(aimScore));
-                        overviewHtml += createStatBox('Positioning Overall', Math.round(positioningScore * 100) / 100, getRatingClass(positioningScore));
-                        overviewHtml += createStatBox('Decision Making Overall', Math.round(decisionScore * 100) / 100, getRatingClass(decisionScore));
-                        
-                        overviewHtml += `</div>`;
-                        document.getElementById('overview-content').innerHTML = overviewHtml;
-                        
-                        // Update aim tab
-                        let aimHtml = `<h3>Aim Performance</h3><div class="stat-grid">`;
-                        for (const [key, value] of Object.entries(aimMetrics)) {
-                            aimHtml += createStatBox(formatMetricName(key), Math.round(value * 100) / 100, getRatingClass(value));
-                        }
-                        aimHtml += `</div>`;
-                        document.getElementById('aim-content').innerHTML = aimHtml;
-                        
-                        // Update positioning tab
-                        let positioningHtml = `<h3>Positioning Performance</h3><div class="stat-grid">`;
-                        for (const [key, value] of Object.entries(positioningMetrics)) {
-                            positioningHtml += createStatBox(formatMetricName(key), Math.round(value * 100) / 100, getRatingClass(value));
-                        }
-                        positioningHtml += `</div>`;
-                        document.getElementById('positioning-content').innerHTML = positioningHtml;
-                        
-                        // Update decisions tab
-                        let decisionsHtml = `<h3>Decision Making Performance</h3><div class="stat-grid">`;
-                        for (const [key, value] of Object.entries(decisionMetrics)) {
-                            decisionsHtml += createStatBox(formatMetricName(key), Math.round(value * 100) / 100, getRatingClass(value));
-                        }
-                        decisionsHtml += `</div>`;
-                        document.getElementById('decisions-content').innerHTML = decisionsHtml;
-                        
-                        // Update recommendations tab
-                        let recommendationsHtml = `<div class="recommendations">`;
-                        
-                        // Group recommendations by priority
-                        const highPriority = analysis.recommendations.filter(r => r.priority === 'high');
-                        const mediumPriority = analysis.recommendations.filter(r => r.priority === 'medium');
-                        const lowPriority = analysis.recommendations.filter(r => r.priority === 'low');
-                        
-                        if (highPriority.length > 0) {
-                            recommendationsHtml += `<h3>High Priority</h3>`;
-                            highPriority.forEach(rec => {
-                                recommendationsHtml += createRecommendation(rec);
-                            });
-                        }
-                        
-                        if (mediumPriority.length > 0) {
-                            recommendationsHtml += `<h3>Medium Priority</h3>`;
-                            mediumPriority.forEach(rec => {
-                                recommendationsHtml += createRecommendation(rec);
-                            });
-                        }
-                        
-                        if (lowPriority.length > 0) {
-                            recommendationsHtml += `<h3>Low Priority</h3>`;
-                            lowPriority.forEach(rec => {
-                                recommendationsHtml += createRecommendation(rec);
-                            });
-                        }
-                        
-                        recommendationsHtml += `</div>`;
-                        document.getElementById('recommendations-content').innerHTML = recommendationsHtml;
-                        
-                    } else {
-                        console.error('Failed to load analysis data');
-                    }
-                } catch (error) {
-                    console.error('Error loading analysis data:', error);
-                }
-            }
-            
-            // Helper function to create a stat box
-            function createStatBox(name, value, ratingClass) {
-                return `
-                    <div class="stat-box">
-                        <h3>${name}</h3>
-                        <div class="stat-value">${value}</div>
-                        <span class="badge ${ratingClass}">${getRatingText(ratingClass)}</span>
-                    </div>
-                `;
-            }
-            
-            // Helper function to create a recommendation
-            function createRecommendation(rec) {
-                return `
-                    <div class="recommendation ${rec.priority}">
-                        <h4>
-                            <span class="badge badge-${rec.priority === 'high' ? 'danger' : rec.priority === 'medium' ? 'warning' : 'success'}">
-                                ${rec.category.toUpperCase()}
-                            </span>
-                            ${rec.title}
-                        </h4>
-                        <p>${rec.description}</p>
-                    </div>
-                `;
-            }
-            
-            // Helper function to get rating class
-            function getRatingClass(value) {
-                if (value < 0.4) return 'badge-danger';
-                if (value < 0.6) return 'badge-warning';
-                if (value < 0.8) return 'badge-info';
-                return 'badge-success';
-            }
-            
-            // Helper function to get rating text
-            function getRatingText(ratingClass) {
-                if (ratingClass === 'badge-danger') return 'Poor';
-                if (ratingClass === 'badge-warning') return 'Average';
-                if (ratingClass === 'badge-info') return 'Good';
-                return 'Excellent';
-            }
-            
-            // Helper function to format metric name
-            function formatMetricName(name) {
-                return name.split('_').map(word => word.charAt(0).toUpperCase() + word.slice(1)).join(' ');
-            }
-        });
-    </script>
 </body>
 </html>
 """
 
+INDEX_PAGE = RenderedPage(app, HTML_TEMPLATE)
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return INDEX_PAGE.response()
 
 @app.route('/api/status')
 def status():
     return jsonify({
         "status": "online",
         "message": "BGMI Esports Coach API is running",
-        "match_count": len(MATCHES)
+        "match_count": MATCH_STORE.count(),
+        "jobs": JOBS.stats(),
+        "analysis_cache": MATCH_STORE.cache.stats()
     })
 
-@app.route('/api/simulate-match', methods=['POST'])
-def simulate_match():
-    """Simulate a match analysis for demo purposes"""
-    data = request.json
-    
-    # Create match ID
-    match_id = f"demo_{int(time.time())}_{str(uuid.uuid4())[:8]}"
-    
+def run_match_analysis(job, match_id, game_mode, map_name, player_id=None):
+    """Analyze a match in a background job and register it in the match store"""
     # Create match directory
     match_dir = os.path.join(DATA_DIR, match_id)
     os.makedirs(match_dir, exist_ok=True)
@@ -514,8 +170,9 @@ def simulate_match():
     # Create metadata
     metadata = {
         "match_id": match_id,
-        "game_mode": data.get("game_mode", "Solo"),
-        "map_name": data.get("map_name", "Erangel"),
+        "player_id": player_id,
+        "game_mode": game_mode,
+        "map_name": map_name,
         "start_time": datetime.now().isoformat(),
         "end_time": datetime.now().isoformat(),
         "duration": random.randint(600, 1800),  # 10-30 minutes
@@ -528,10 +185,108 @@ def simulate_match():
     with open(os.path.join(match_dir, "metadata.json"), "w") as f:
         json.dump(metadata, f)
     
-    # Run analyzer
-    analyzer = GameplayAnalyzer(match_dir)
-    analysis_results = analyzer.analyze()
+    # Run analyzer on the analysis executor
+    job.check_cancelled()
+    job.set_progress(0.1)
+    analysis_results = get_executor(ANALYZER).analyze(match_dir)
+    job.check_cancelled()
+    job.set_progress(0.9, {"metrics": analysis_results["metrics"]})
+    
+    return save_match_analysis(match_id, match_dir, game_mode, map_name, analysis_results, player_id)
+
+def run_video_analysis(job, match_id, video_path, game_mode, map_name, player_id=None):
+    """Stream an uploaded match video through the analyzer in a background job"""
+    match_dir = os.path.dirname(video_path)
+    video = probe_video(video_path)
+    
+    # Frames are decoded and analyzed in the executor worker, never written out
+    job.check_cancelled()
+    executor = get_executor(ANALYZER)
+    cancel_event = executor.cancel_event()
+    future = executor.submit_video(match_dir, video_path, SAMPLE_FPS, cancel_event)
+    # Windowed analyses checkpoint after every window; report those as progress
+    windows = WindowedAnalysis(match_dir)
+    while not wait([future], timeout=1.0).done:
+        # The worker stops at its next window and the result raises JobCancelled
+        if job.cancelled:
+            cancel_event.set()
+        checkpoint = windows.load_checkpoint()
+        if checkpoint is not None:
+            job.set_progress(0.95 * checkpoint["completed"] / checkpoint["window_count"])
+    analysis_results, timeline = future.result()
+    job.check_cancelled()
+    
+    metadata = {
+        "match_id": match_id,
+        "player_id": player_id,
+        "game_mode": game_mode,
+        "map_name": map_name,
+        "start_time": datetime.now().isoformat(),
+        "end_time": datetime.now().isoformat(),
+        "duration": video["duration"],
+        "resolution": video["resolution"],
+        "fps": SAMPLE_FPS,
+        "source_video": os.path.basename(video_path),
+        "frames": timeline
+    }
+    with open(os.path.join(match_dir, "metadata.json"), "w") as f:
+        json.dump(metadata, f)
+    
+    return save_match_analysis(match_id, match_dir, game_mode, map_name, analysis_results, player_id)
+
+def run_early_analysis(job, upload_id):
+    """Analyze the windows of an upload's recording that are already on disk
+
+    Only container layouts that say how far a prefix reaches can be read
+    early (see backend/containers.py). The checkpointed windows are picked
+    up by run_video_analysis once the upload completes.
+    """
+    status = UPLOADS.status(upload_id)
+    if status is None or status["finished"]:
+        return None
+    part_path = UPLOADS.part_path(upload_id)
+    seconds = decodable_seconds(part_path, status["ready_bytes"])
+    if not seconds:
+        return None
     
+    executor = get_executor(ANALYZER)
+    cancel_event = executor.cancel_event()
+    future = executor.submit_video(os.path.dirname(part_path), part_path, SAMPLE_FPS, cancel_event, seconds)
+    while not wait([future], timeout=1.0).done:
+        # Completing the upload renames the .part file, possibly from another process
+        if job.cancelled or not os.path.exists(part_path):
+            cancel_event.set()
+    future.result()
+    return {"upload_id": upload_id, "ready_seconds": seconds}
+
+def queue_early_analysis(upload_id):
+    """Queue an early analysis of an upload unless one is already pending here"""
+    with EARLY_ANALYSES_LOCK:
+        job = EARLY_ANALYSES.get(upload_id)
+        if job is not None and job.status not in FINISHED_STATES:
+            return
+        try:
+            # No match_id: partial results are not published as match events
+            EARLY_ANALYSES[upload_id] = JOBS.submit(
+                run_early_analysis, upload_id, priority="low", metadata={"upload_id": upload_id}
+            )
+        except QueueFullError:
+            # Best effort; the analysis after completion covers the whole file anyway
+            EARLY_ANALYSES.pop(upload_id, None)
+
+def run_reanalysis(job, match_id, game_mode, map_name, player_id=None):
+    """Rebuild a match's analysis from its cached window features in a background job"""
+    match_dir = os.path.join(DATA_DIR, match_id)
+    job.check_cancelled()
+    analysis_results, _ = get_executor(ANALYZER).submit_reanalysis(match_dir).result()
+    return save_match_analysis(match_id, match_dir, game_mode, map_name, analysis_results, player_id)
+
+def save_match_analysis(match_id, match_dir, game_mode, map_name, analysis_results, player_id=None):
+    """Score an analysis, write it next to the match and index it in the match store
+
+    A match with a player counts towards that player's trends the first time
+    it is saved; re-analyses update the match but not the trends.
+    """
     # Calculate overall score
     aim_metrics = analysis_results["metrics"]["aim"]
     positioning_metrics = analysis_results["metrics"]["positioning"]
@@ -542,50 +297,383 @@ def simulate_match():
     decision_score = sum(decision_metrics.values()) / len(decision_metrics)
     overall_score = (aim_score + positioning_score + decision_score) / 3
     
-    # Save analysis
+    # Save analysis with its precompressed variants
     analysis_file = os.path.join(match_dir, "analysis.json")
-    with open(analysis_file, "w") as f:
-        json.dump(analysis_results, f)
+    analysis_json = write_analysis(match_dir, analysis_results)
     
-    # Store in memory
-    MATCHES[match_id] = {
+    # Index the match and its analysis
+    MATCH_STORE.save({
         "id": match_id,
-        "game_mode": data.get("game_mode", "Solo"),
-        "map_name": data.get("map_name", "Erangel"),
+        "player_id": player_id,
+        "game_mode": game_mode,
+        "map_name": map_name,
         "created_at": datetime.now().isoformat(),
         "analysis_file": analysis_file
+    }, analysis_json, overall_score)
+    
+    return {
+        "match_id": match_id,
+        "overall_score": overall_score
     }
+
+@app.route('/api/simulate-match', methods=['POST'])
+def simulate_match():
+    """Queue a simulated match analysis for demo purposes"""
+    data = request.json or {}
+    
+    # Create match ID
+    match_id = f"demo_{int(time.time())}_{str(uuid.uuid4())[:8]}"
+    
+    try:
+        job = JOBS.submit(
+            run_match_analysis,
+            match_id,
+            data.get("game_mode", "Solo"),
+            data.get("map_name", "Erangel"),
+            data.get("player_id"),
+            priority=data.get("priority", "normal"),
+            metadata={"match_id": match_id}
+        )
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     return jsonify({
         "success": True,
         "match_id": match_id,
-        "overall_score": overall_score
-    })
+        "job_id": job.id,
+        "status": job.status
+    }), 202
+
+@app.route('/api/upload-match', methods=['POST'])
+def upload_match():
+    """Upload a recorded match video and queue it for streaming analysis"""
+    video = request.files.get("video")
+    if video is None or not video.filename:
+        return jsonify({"error": "No video file uploaded"}), 400
+    extension = os.path.splitext(video.filename)[1].lower()
+    if extension not in VIDEO_EXTENSIONS:
+        return jsonify({"error": f"Unsupported video type: {extension or 'none'}"}), 400
+    
+    match_id = f"upload_{int(time.time())}_{str(uuid.uuid4())[:8]}"
+    match_dir = os.path.join(DATA_DIR, match_id)
+    os.makedirs(match_dir, exist_ok=True)
+    video_path = os.path.join(match_dir, f"source{extension}")
+    # Streams to disk in chunks; the upload is never held in memory
+    video.save(video_path)
+    
+    try:
+        job = JOBS.submit(
+            run_video_analysis,
+            match_id,
+            video_path,
+            request.form.get("game_mode", "Solo"),
+            request.form.get("map_name", "Erangel"),
+            request.form.get("player_id"),
+            priority=request.form.get("priority", "normal"),
+            metadata={"match_id": match_id}
+        )
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "success": True,
+        "match_id": match_id,
+        "job_id": job.id,
+        "status": job.status
+    }), 202
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """Start a chunked, resumable upload of a match recording"""
+    data = request.json or {}
+    match_id = f"upload_{int(time.time())}_{str(uuid.uuid4())[:8]}"
+    try:
+        manifest = UPLOADS.create(
+            match_id,
+            data.get("filename"),
+            data.get("size"),
+            chunk_size=data.get("chunk_size"),
+            metadata={
+                "game_mode": data.get("game_mode", "Solo"),
+                "map_name": data.get("map_name", "Erangel"),
+                "player_id": data.get("player_id"),
+                "priority": data.get("priority", "normal")
+            }
+        )
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "success": True,
+        "upload_id": match_id,
+        "match_id": match_id,
+        "chunk_size": manifest["chunk_size"],
+        "chunk_count": manifest["chunk_count"]
+    }), 201
+
+@app.route('/api/uploads/<upload_id>')
+def get_upload(upload_id):
+    """Upload progress, including the chunks a resuming client still has to send"""
+    status = UPLOADS.status(upload_id)
+    if status is None:
+        return jsonify({"error": "Upload not found"}), 404
+    return jsonify(status)
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def put_upload_chunk(upload_id, index):
+    """Write one chunk; the body is the raw bytes, X-Chunk-SHA256 their checksum"""
+    try:
+        status = UPLOADS.write_chunk(upload_id, index, request.stream, request.headers.get("X-Chunk-SHA256"))
+    except KeyError:
+        return jsonify({"error": "Upload not found"}), 404
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 400
+    if status["ready_bytes"] and not status["complete"]:
+        queue_early_analysis(upload_id)
+    return jsonify(status)
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    """Assemble a fully received upload and queue its analysis"""
+    manifest = UPLOADS.manifest(upload_id)
+    if manifest is None:
+        return jsonify({"error": "Upload not found"}), 404
+    try:
+        video_path = UPLOADS.finish(upload_id)
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 409
+    
+    # Stop analyzing the prefix; the full analysis resumes from its checkpoint
+    with EARLY_ANALYSES_LOCK:
+        early = EARLY_ANALYSES.pop(upload_id, None)
+    if early is not None:
+        JOBS.cancel(early.id)
+    
+    options = manifest["metadata"]
+    try:
+        job = JOBS.submit(
+            run_video_analysis,
+            upload_id,
+            video_path,
+            options["game_mode"],
+            options["map_name"],
+            options.get("player_id"),
+            priority=options["priority"],
+            metadata={"match_id": upload_id}
+        )
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "success": True,
+        "match_id": upload_id,
+        "job_id": job.id,
+        "status": job.status
+    }), 202
+
+@app.route('/api/live/sessions', methods=['POST'])
+def start_live_session():
+    """Start analyzing the running game live; metrics stream from the events URL"""
+    try:
+        source, fps, monitor = session_options(request.json or {})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        if source == "synthetic":
+            capture = SyntheticCapture(fps=fps)
+        else:
+            capture = ScreenCapture(fps=fps, monitor=monitor)
+    except Exception as e:
+        return jsonify({"error": f"Cannot start capture: {e}"}), 400
+    
+    session = LiveSession(capture, demo_detectors(), EVENTS, idle_timeout=LIVE_IDLE_TIMEOUT)
+    try:
+        LIVE_SESSIONS.add(session)
+    except RuntimeError as e:
+        capture.close()
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "30"}
+    
+    return jsonify({
+        "success": True,
+        "session_id": session.id,
+        "events_url": f"/api/live/sessions/{session.id}/events"
+    }), 201
+
+@app.route('/api/live/sessions/<session_id>')
+def get_live_session(session_id):
+    """Current metrics and counters of a live session"""
+    session = LIVE_SESSIONS.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify(session.snapshot())
+
+@app.route('/api/live/sessions/<session_id>/events')
+def live_session_events(session_id):
+    """Server-Sent Events stream of a live session's metric deltas"""
+    session = LIVE_SESSIONS.get(session_id)
+    if session is None:
+        return jsonify({"error": "Session not found"}), 404
+    last_event_id = parse_last_event_id(request.headers.get("Last-Event-ID"))
+    # New clients start from a full snapshot, then receive deltas
+    initial = ("snapshot", session.snapshot()) if last_event_id is None else None
+    return sse_response(EVENTS.subscribe(session.topic, last_event_id, initial))
+
+@app.route('/api/live/sessions/<session_id>/stop', methods=['POST'])
+def stop_live_session(session_id):
+    """Stop a live session"""
+    stats = LIVE_SESSIONS.stop(session_id)
+    if stats is None:
+        return jsonify({"error": "Session not found"}), 404
+    return jsonify({"success": True, **stats})
+
+@app.route('/api/matches/<match_id>/events')
+def match_events(match_id):
+    """Server-Sent Events stream of a match's analysis progress and final result"""
+    last_event_id = parse_last_event_id(request.headers.get("Last-Event-ID"))
+    # Replay the topic's short history so late subscribers catch up on progress
+    subscription = EVENTS.subscribe(match_topic(match_id), last_event_id or 0, create=False)
+    if subscription is not None:
+        return sse_response(subscription)
+    
+    # No analysis in progress: it has already finished, or the match does not exist
+    if MATCH_STORE.get(match_id) is None:
+        return jsonify({"error": "Match not found"}), 404
+    return sse_response(("result", {"match_id": match_id}))
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Get the status of an analysis job"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running analysis job"""
+    if not JOBS.cancel(job_id):
+        return jsonify({"error": "Job not found or already finished"}), 404
+    return jsonify({"success": True, "job_id": job_id})
 
 @app.route('/api/analysis/<match_id>')
 def get_analysis(match_id):
     """Get analysis results for a match"""
-    if match_id not in MATCHES:
+    analysis = MATCH_STORE.get_analysis_body(match_id, negotiate_encoding())
+    if analysis is None:
+        return jsonify({"error": "Match not found"}), 404
+    body, etag, encoding = analysis
+    return conditional_response(body, etag, encoding=encoding)
+
+@app.route('/api/analysis/<match_id>/pros')
+def compare_with_pros(match_id):
+    """The pro players whose matches are most similar to this one, with per-metric deltas"""
+    if PRO_INDEX is None:
+        return jsonify({"error": "Pro reference index not built, see backend/pros.py"}), 503
+    try:
+        k = k_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    vector = MATCH_STORE.get_metric_vector(match_id)
+    if vector is None:
+        return jsonify({"error": "Analysis not found", "match_id": match_id}), 404
+    return jsonify({"match_id": match_id, "pros": PRO_INDEX.compare(vector, k)})
+
+@app.route('/api/analysis/<match_id>/reanalyze', methods=['POST'])
+def reanalyze_match(match_id):
+    """Re-score a recorded match from cached features, e.g. after a rule change"""
+    record = MATCH_STORE.get(match_id)
+    if record is None:
         return jsonify({"error": "Match not found"}), 404
     
     try:
-        with open(MATCHES[match_id]["analysis_file"], "r") as f:
-            analysis = json.load(f)
-        return jsonify(analysis)
-    except Exception as e:
-        return jsonify({"error": f"Failed to load analysis: {str(e)}"}), 500
+        job = JOBS.submit(
+            run_reanalysis,
+            match_id,
+            record.get("game_mode"),
+            record.get("map_name"),
+            record.get("player_id"),
+            priority="low",
+            metadata={"match_id": match_id}
+        )
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    
+    return jsonify({
+        "success": True,
+        "match_id": match_id,
+        "job_id": job.id,
+        "status": job.status
+    }), 202
 
 @app.route('/api/clear-matches', methods=['POST'])
 def clear_matches():
     """Clear all match data"""
-    global MATCHES
-    MATCHES = {}
+    MATCH_STORE.clear()
     return jsonify({"success": True})
 
+@app.route('/api/players/<player_id>/trends')
+def get_player_trends(player_id):
+    """Rolling metric trends of a player across their matches"""
+    trends = MATCH_STORE.get_player_trends(player_id)
+    if trends is None:
+        return jsonify({"error": "Player not found", "player_id": player_id}), 404
+    body, etag = trends
+    return conditional_response(body, etag)
+
+@app.route('/api/percentiles')
+def get_metric_percentiles():
+    """Where a metric value ranks among all analysed matches, optionally of one map and mode"""
+    try:
+        return jsonify(MATCH_STORE.metric_percentiles(**percentile_query_from_args(request.args)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route('/api/matches')
 def list_matches():
-    """List all matches"""
-    return jsonify(list(MATCHES.values()))
+    """List matches one page at a time, with optional filters and sorting"""
+    # Invalid parameters are a 400 even when the client's copy looks current
+    try:
+        query = query_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Any write to the store changes its version tag, so an unchanged tag
+    # means the client's copy of this page is still current
+    etag = MATCH_STORE.version_tag()
+    if not_modified(etag):
+        return conditional_response(b"", etag)
+    
+    matches, next_cursor = MATCH_STORE.query(**query)
+    return conditional_response(json.dumps({
+        "matches": matches,
+        "next_cursor": next_cursor
+    }), etag)
+
+@app.route('/api/matches.ndjson')
+def stream_matches():
+    """Stream every matching match as newline-delimited JSON"""
+    try:
+        query = query_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    etag = MATCH_STORE.version_tag()
+    if not_modified(etag):
+        return conditional_response(b"", etag, mimetype="application/x-ndjson")
+    
+    records = MATCH_STORE.iter_record_json(**query)
+    return conditional_response(
+        (record + "\n" for record in records),
+        etag,
+        mimetype="application/x-ndjson"
+    )
 
 if __name__ == '__main__':
     print("Starting BGMI Esports Coach app on port 5000...")
@@ -0,0 +1,293 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Tab navigation
+    document.querySelectorAll('.tab').forEach(tab => {
+        tab.addEventListener('click', function() {
+            // Remove active class from all tabs and content
+            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+            document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+
+            // Add active class to clicked tab
+            this.classList.add('active');
+
+            // Show corresponding content
+            const tabId = this.getAttribute('data-tab');
+            document.getElementById(tabId + '-tab').classList.add('active');
+        });
+    });
+
+    // Simulate match button
+    document.getElementById('simulateMatchBtn').addEventListener('click', async function() {
+        this.disabled = true;
+        this.textContent = 'Analyzing...';
+
+        try {
+            const response = await fetch('/api/simulate-match', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    game_mode: 'Squad',
+                    map_name: 'Erangel'
+                })
+            });
+
+            if (response.ok) {
+                const queued = await response.json();
+                document.getElementById('matchStatus').innerHTML = `
+                    <h2>Analysis Queued</h2>
+                    <p>Analyzing match ID: ${queued.match_id}</p>
+                    <div class="progress"><div class="progress-bar" id="analysisProgress" style="width: 0%"></div></div>
+                    <div class="stat-grid" id="partialMetrics"></div>
+                `;
+                const result = await followAnalysis(queued.match_id);
+                const score = result.overall_score === undefined ? '' :
+                    `<p>Overall score: <b>${Math.round(result.overall_score * 100) / 100}/1.0</b></p>`;
+                document.getElementById('matchStatus').innerHTML = `
+                    <h2>Match Analysis Complete</h2>
+                    <p>Analysis generated for match ID: ${result.match_id}</p>
+                    ${score}
+                `;
+
+                // Load the analysis data
+                loadAnalysisData(result.match_id);
+            } else {
+                document.getElementById('matchStatus').innerHTML = `
+                    <h2>Error</h2>
+                    <p>Failed to simulate match analysis.</p>
+                `;
+            }
+        } catch (error) {
+            console.error('Error:', error);
+            document.getElementById('matchStatus').innerHTML = `
+                <h2>Error</h2>
+                <p>An unexpected error occurred: ${error.message}</p>
+            `;
+        } finally {
+            this.disabled = false;
+            this.textContent = 'Simulate Match Analysis';
+        }
+    });
+
+    // Clear matches button
+    document.getElementById('clearMatchesBtn').addEventListener('click', async function() {
+        if (confirm('Are you sure you want to clear all match data?')) {
+            const response = await fetch('/api/clear-matches', { method: 'POST' });
+            if (response.ok) {
+                document.getElementById('matchStatus').innerHTML = `
+                    <h2>Demo Status</h2>
+                    <p>All match data cleared. Use the "Simulate Match Analysis" button to generate new analysis data.</p>
+                `;
+
+                // Reset all tabs
+                document.getElementById('overview-content').innerHTML = '<p>No match analysis data available yet. Please simulate a match first.</p>';
+                document.getElementById('aim-content').innerHTML = '<p>No aim analysis data available yet. Please simulate a match first.</p>';
+                document.getElementById('positioning-content').innerHTML = '<p>No positioning analysis data available yet. Please simulate a match first.</p>';
+                document.getElementById('decisions-content').innerHTML = '<p>No decision making analysis data available yet. Please simulate a match first.</p>';
+                document.getElementById('recommendations-content').innerHTML = '<p>No recommendations available yet. Please simulate a match first.</p>';
+            }
+        }
+    });
+
+    // Follow an analysis over Server-Sent Events, rendering updates as they arrive
+    function followAnalysis(matchId) {
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`/api/matches/${matchId}/events`);
+            source.addEventListener('status', event => {
+                const title = document.querySelector('#matchStatus h2');
+                if (title && JSON.parse(event.data).status === 'running') {
+                    title.textContent = 'Analyzing...';
+                }
+            });
+            source.addEventListener('progress', event => {
+                const update = JSON.parse(event.data);
+                const bar = document.getElementById('analysisProgress');
+                if (bar) {
+                    bar.style.width = `${Math.round(update.progress * 100)}%`;
+                    bar.textContent = `${Math.round(update.progress * 100)}%`;
+                }
+                if (update.partial && update.partial.metrics) {
+                    renderPartialMetrics(update.partial.metrics);
+                }
+            });
+            source.addEventListener('result', event => {
+                source.close();
+                resolve(JSON.parse(event.data));
+            });
+            ['failed', 'cancelled'].forEach(name => {
+                source.addEventListener(name, event => {
+                    source.close();
+                    reject(new Error(JSON.parse(event.data).error || `Analysis ${name}`));
+                });
+            });
+            source.onerror = () => {
+                // EventSource reconnects by itself unless the server refused the stream
+                if (source.readyState === EventSource.CLOSED) {
+                    reject(new Error('Lost the analysis progress stream'));
+                }
+            };
+        });
+    }
+
+    // Add or update the stat boxes of metrics computed so far
+    function renderPartialMetrics(metrics) {
+        const grid = document.getElementById('partialMetrics');
+        if (!grid) {
+            return;
+        }
+        for (const [category, values] of Object.entries(metrics)) {
+            for (const [name, value] of Object.entries(values)) {
+                const id = `partial-${category}-${name}`;
+                let box = document.getElementById(id);
+                if (!box) {
+                    box = document.createElement('div');
+                    box.id = id;
+                    grid.appendChild(box);
+                }
+                box.innerHTML = createStatBox(formatMetricName(name), Math.round(value * 100) / 100, getRatingClass(value));
+            }
+        }
+    }
+
+    // Function to load analysis data
+    async function loadAnalysisData(matchId) {
+        try {
+            const response = await fetch(`/api/analysis/${matchId}`);
+            if (response.ok) {
+                const analysis = await response.json();
+
+                // Update overview tab
+                let overviewHtml = `
+                    <div class="summary">${analysis.summary}</div>
+                    <h3>Performance Metrics</h3>
+                    <div class="stat-grid">
+                `;
+
+                // Calculate overall score for each category
+                const aimMetrics = analysis.metrics.aim;
+                const positioningMetrics = analysis.metrics.positioning;
+                const decisionMetrics = analysis.metrics.decision_making;
+
+                const aimScore = Object.values(aimMetrics).reduce((sum, val) => sum + val, 0) / Object.values(aimMetrics).length;
+                const positioningScore = Object.values(positioningMetrics).reduce((sum, val) => sum + val, 0) / Object.values(positioningMetrics).length;
+                const decisionScore = Object.values(decisionMetrics).reduce((sum, val) => sum + val, 0) / Object.values(decisionMetrics).length;
+
+                // Add overall stats
+                overviewHtml += createStatBox('Aim Overall', Math.round(aimScore * 100) / 100, getRatingClass(aimScore));
+                overviewHtml += createStatBox('Positioning Overall', Math.round(positioningScore * 100) / 100, getRatingClass(positioningScore));
+                overviewHtml += createStatBox('Decision Making Overall', Math.round(decisionScore * 100) / 100, getRatingClass(decisionScore));
+
+                overviewHtml += `</div>`;
+                document.getElementById('overview-content').innerHTML = overviewHtml;
+
+                // Update aim tab
+                let aimHtml = `<h3>Aim Performance</h3><div class="stat-grid">`;
+                for (const [key, value] of Object.entries(aimMetrics)) {
+                    aimHtml += createStatBox(formatMetricName(key), Math.round(value * 100) / 100, getRatingClass(value));
+                }
+                aimHtml += `</div>`;
+                document.getElementById('aim-content').innerHTML = aimHtml;
+
+                // Update positioning tab
+                let positioningHtml = `<h3>Positioning Performance</h3><div class="stat-grid">`;
+                for (const [key, value] of Object.entries(positioningMetrics)) {
+                    positioningHtml += createStatBox(formatMetricName(key), Math.round(value * 100) / 100, getRatingClass(value));
+                }
+                positioningHtml += `</div>`;
+                document.getElementById('positioning-content').innerHTML = positioningHtml;
+
+                // Update decisions tab
+                let decisionsHtml = `<h3>Decision Making Performance</h3><div class="stat-grid">`;
+                for (const [key, value] of Object.entries(decisionMetrics)) {
+                    decisionsHtml += createStatBox(formatMetricName(key), Math.round(value * 100) / 100, getRatingClass(value));
+                }
+                decisionsHtml += `</div>`;
+                document.getElementById('decisions-content').innerHTML = decisionsHtml;
+
+                // Update recommendations tab
+                let recommendationsHtml = `<div class="recommendations">`;
+
+                // Group recommendations by priority
+                const highPriority = analysis.recommendations.filter(r => r.priority === 'high');
+                const mediumPriority = analysis.recommendations.filter(r => r.priority === 'medium');
+                const lowPriority = analysis.recommendations.filter(r => r.priority === 'low');
+
+                if (highPriority.length > 0) {
+                    recommendationsHtml += `<h3>High Priority</h3>`;
+                    highPriority.forEach(rec => {
+                        recommendationsHtml += createRecommendation(rec);
+                    });
+                }
+
+                if (mediumPriority.length > 0) {
+                    recommendationsHtml += `<h3>Medium Priority</h3>`;
+                    mediumPriority.forEach(rec => {
+                        recommendationsHtml += createRecommendation(rec);
+                    });
+                }
+
+                if (lowPriority.length > 0) {
+                    recommendationsHtml += `<h3>Low Priority</h3>`;
+                    lowPriority.forEach(rec => {
+                        recommendationsHtml += createRecommendation(rec);
+                    });
+                }
+
+                recommendationsHtml += `</div>`;
+                document.getElementById('recommendations-content').innerHTML = recommendationsHtml;
+
+            } else {
+                console.error('Failed to load analysis data');
+            }
+        } catch (error) {
+            console.error('Error loading analysis data:', error);
+        }
+    }
+
+    // Helper function to create a stat box
+    function createStatBox(name, value, ratingClass) {
+        return `
+            <div class="stat-box">
+                <h3>${name}</h3>
+                <div class="stat-value">${value}</div>
+                <span class="badge ${ratingClass}">${getRatingText(ratingClass)}</span>
+            </div>
+        `;
+    }
+
+    // Helper function to create a recommendation
+    function createRecommendation(rec) {
+        return `
+            <div class="recommendation ${rec.priority}">
+                <h4>
+                    <span class="badge badge-${rec.priority === 'high' ? 'danger' : rec.priority === 'medium' ? 'warning' : 'success'}">
+                        ${rec.category.toUpperCase()}
+                    </span>
+                    ${rec.title}
+                </h4>
+                <p>${rec.description}</p>
+            </div>
+        `;
+    }
+
+    // Helper function to get rating class
+    function getRatingClass(value) {
+        if (value < 0.4) return 'badge-danger';
+        if (value < 0.6) return 'badge-warning';
+        if (value < 0.8) return 'badge-info';
+        return 'badge-success';
+    }
+
+    // Helper function to get rating text
+    function getRatingText(ratingClass) {
+        if (ratingClass === 'badge-danger') return 'Poor';
+        if (ratingClass === 'badge-warning') return 'Average';
+        if (ratingClass === 'badge-info') return 'Good';
+        return 'Excellent';
+    }
+
+    // Helper function to format metric name
+    function formatMetricName(name) {
+        return name.split('_').map(word => word.charAt(0).toUpperCase() + word.slice(1)).join(' ');
+    }
+});
@@ -0,0 +1 @@
+"""Shared analysis and serving components for the BGMI Esports Coach apps"""
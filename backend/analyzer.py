@@ -0,0 +1,143 @@
+"""Demo gameplay analyzer run by the analysis executors
+
+GameplayAnalyzer stands in for the real vision models, like SimpleAnalyzer
+does in the dashboard servers, but it does look at the frames it is given:
+every frame's HUD regions (see backend.roi) are reduced to a brightness and
+a contrast reading, and the match metrics are derived from the averages of
+those readings. Without frames (the "simulate match" demo) the metrics are
+drawn at random.
+
+It implements every interface the executors drive:
+
+    analyze(frames=None)                            one call, frames in memory
+    feed(timestamps, frames) / finish()             streamed video (backend.video)
+    extract_features / accumulate / summarize       checkpointed windows (backend.windows)
+
+Accumulators are per-feature sums and a frame count, so windows merge in
+any order and checkpoint as plain JSON.
+"""
+import random
+import time
+
+import numpy as np
+
+from backend.batch import CATEGORIES, CATEGORY_LABELS, METRIC_KEYS
+from backend.live import DEMO_REGION_METRICS
+from backend.recommendations import DEMO_RULES
+from backend.roi import DEFAULT_LAYOUT, layout_for
+
+# (min, max) range of each simulated metric score, as in SimpleAnalyzer
+SCORE_RANGES = {
+    ("aim", "accuracy"): (0.5, 0.95),
+    ("aim", "reaction_time"): (0.4, 0.9),
+    ("aim", "recoil_control"): (0.3, 0.85),
+    ("aim", "headshot_percentage"): (0.1, 0.6),
+    ("positioning", "cover_usage"): (0.4, 0.9),
+    ("positioning", "movement_efficiency"): (0.3, 0.85),
+    ("positioning", "zone_awareness"): (0.5, 0.95),
+    ("positioning", "rotation_timing"): (0.4, 0.9),
+    ("decision_making", "engagement_choices"): (0.3, 0.8),
+    ("decision_making", "item_management"): (0.4, 0.9),
+    ("decision_making", "tactical_planning"): (0.3, 0.85),
+    ("decision_making", "team_coordination"): (0.2, 0.7),
+}
+
+# Readings taken from every HUD region, each scaled to 0-1
+READINGS = ("level", "contrast")
+
+# Sample rate assumed for frames handed over in memory
+IN_MEMORY_FPS = 10
+
+
+def _metric_features():
+    """(category, metric) -> feature it is derived from; a region's metrics alternate between its readings"""
+    categories = {name: category for category, name in METRIC_KEYS}
+    return {
+        (categories[name], name): f"{region}_{READINGS[i % len(READINGS)]}"
+        for region, names in DEMO_REGION_METRICS.items()
+        for i, name in enumerate(names)
+    }
+
+
+_METRIC_FEATURES = _metric_features()
+
+
+class GameplayAnalyzer:
+    """Analyze one match's frames; constructed with the match directory"""
+
+    # Bump when extract_features changes, so cached window features are recomputed
+    feature_version = 1
+
+    def __init__(self, match_dir, layout=DEFAULT_LAYOUT):
+        self.match_dir = match_dir
+        self.layout_name = layout
+        self._accumulator = None
+
+    @classmethod
+    def load_models(cls):
+        """Build the default HUD layout once per worker, ahead of the first match"""
+        layout_for((1920, 1080), DEFAULT_LAYOUT)
+
+    def analyze(self, frames=None):
+        """Analyze an (N, height, width, 3) frame stack, or simulate a match without one"""
+        if frames is None:
+            metrics = {category: {} for category in CATEGORIES}
+            for (category, name), (low, high) in SCORE_RANGES.items():
+                metrics[category][name] = round(random.uniform(low, high), 2)
+            return self._result(metrics, 0)
+        timestamps = np.arange(len(frames), dtype=np.float64) / IN_MEMORY_FPS
+        self.feed(timestamps, frames)
+        return self.finish()
+
+    def feed(self, timestamps, frames):
+        """Fold one batch of frames into the running analysis"""
+        self._accumulator = self.accumulate(self._accumulator, self.extract_features(timestamps, frames))
+
+    def finish(self):
+        """Result of every frame fed so far"""
+        return self.summarize(self._accumulator)
+
+    def extract_features(self, timestamps, frames):
+        """Per-frame {region}_{reading} arrays of a frame stack"""
+        if not len(frames):
+            return {}
+        layout = layout_for((frames.shape[2], frames.shape[1]), self.layout_name)
+        features = {}
+        for region, view in layout.crop_batch(frames, DEMO_REGION_METRICS).items():
+            pixels = view.reshape(len(view), -1)
+            features[f"{region}_level"] = pixels.mean(axis=1, dtype=np.float32) / 255
+            features[f"{region}_contrast"] = np.minimum(pixels.std(axis=1, dtype=np.float32) / 128, 1)
+        return features
+
+    def accumulate(self, accumulator, features):
+        """Add a window's features to the per-feature sums"""
+        accumulator = accumulator or {"frames": 0, "sums": {}}
+        if not features:
+            return accumulator
+        sums = accumulator["sums"]
+        for name, values in features.items():
+            sums[name] = sums.get(name, 0.0) + float(np.sum(values, dtype=np.float64))
+        accumulator["frames"] += len(next(iter(features.values())))
+        return accumulator
+
+    def summarize(self, accumulator):
+        """Analysis result from the accumulated features"""
+        frames = accumulator["frames"] if accumulator else 0
+        metrics = {category: {} for category in CATEGORIES}
+        for category, name in METRIC_KEYS:
+            low, high = SCORE_RANGES[(category, name)]
+            reading = accumulator["sums"][_METRIC_FEATURES[(category, name)]] / frames if frames else 0.0
+            metrics[category][name] = round(low + (high - low) * reading, 2)
+        return self._result(metrics, frames)
+
+    def _result(self, metrics, frames):
+        averages = [sum(metrics[category].values()) / len(metrics[category]) for category in CATEGORIES]
+        strongest = CATEGORY_LABELS[int(np.argmax(averages))]
+        weakest = CATEGORY_LABELS[int(np.argmin(averages))]
+        return {
+            "analysis_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "frames_analyzed": frames,
+            "metrics": metrics,
+            "recommendations": DEMO_RULES.recommend(metrics),
+            "summary": f"Your strongest area is {strongest}; focus your practice on {weakest}.",
+        }
@@ -0,0 +1,70 @@
+"""Analysis artifact writer with precompressed variants
+
+The canonical analysis.json uses compact separators. Next to it the writer
+stores analysis.json.gz and, when the optional `brotli` package is installed,
+analysis.json.br, so responses never compress on the request path.
+"""
+import gzip
+import json
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ANALYSIS_FILE = "analysis.json"
+
+# Content-Encoding -> file suffix, in server preference order
+VARIANT_SUFFIXES = {
+    "br": ".br",
+    "gzip": ".gz",
+}
+
+
+def available_encodings():
+    """Encodings the writer produces in this environment, best first"""
+    return [encoding for encoding in VARIANT_SUFFIXES if encoding != "br" or brotli is not None]
+
+
+def serialize_analysis(analysis):
+    """Canonical compact JSON text of an analysis"""
+    return json.dumps(analysis, separators=(",", ":"))
+
+
+def _write_atomic(path, data):
+    """Write bytes through a temporary file so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_analysis(match_dir, analysis):
+    """Write analysis.json plus its compressed variants; returns the JSON text
+
+    `analysis` may be a dict or already-serialized JSON text. Variants are
+    written first so analysis.json's mtime (the cache version) only changes
+    once every representation is in place.
+    """
+    text = analysis if isinstance(analysis, str) else serialize_analysis(analysis)
+    data = text.encode("utf-8")
+    path = os.path.join(match_dir, ANALYSIS_FILE)
+
+    _write_atomic(path + VARIANT_SUFFIXES["gzip"], gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(path + VARIANT_SUFFIXES["br"], brotli.compress(data, quality=11))
+    _write_atomic(path, data)
+    return text
+
+
+def read_variant(match_dir, encoding):
+    """Return the stored bytes of a compressed variant, or None if it is missing"""
+    suffix = VARIANT_SUFFIXES.get(encoding)
+    if suffix is None:
+        return None
+    try:
+        with open(os.path.join(match_dir, ANALYSIS_FILE + suffix), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
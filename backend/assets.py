@@ -0,0 +1,224 @@
+"""Fingerprinted static assets for the dashboard pages
+
+Stylesheets, scripts and vendored libraries live in `assets/`. The build
+step copies each of them to `assets/dist/<name>.<content hash>.<ext>`,
+next to precompressed .gz (and, with `brotli` installed, .br) variants,
+and records the mapping in `assets/dist/manifest.json`. Pages link to the
+hashed names, which never change content, so browsers cache them as
+immutable and a repeat visit only revalidates the small HTML shell.
+
+Third-party libraries the pages used to load from a CDN are downloaded
+once into `assets/vendor/` so the app also works offline. Until they are,
+`asset_url()` falls back to the CDN.
+
+    python -m backend.assets vendor    # download the CDN libraries
+    python -m backend.assets build     # (re)build assets/dist
+
+Apps call `register_assets(app)`, which builds when the sources changed,
+serves /assets/ and gives templates an `asset_url(name)` function.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import urllib.request
+
+from flask import request, send_from_directory
+
+from backend.artifacts import VARIANT_SUFFIXES, brotli
+from backend.static_server import HASHED_NAME, IMMUTABLE
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(REPO_ROOT, "assets")
+DIST_DIR = os.path.join(ASSETS_DIR, "dist")
+MANIFEST_FILE = "manifest.json"
+URL_PREFIX = "/assets/"
+
+# Local vendor path -> the CDN URL the pages used to load it from
+VENDOR = {
+    "vendor/bootstrap.min.css": "https://cdn.jsdelivr.net/npm/bootstrap@5.2.3/dist/css/bootstrap.min.css",
+    "vendor/bootstrap.bundle.min.js": "https://cdn.jsdelivr.net/npm/bootstrap@5.2.3/dist/js/bootstrap.bundle.min.js",
+    "vendor/bootstrap-icons.css": "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css",
+    "vendor/fonts/bootstrap-icons.woff2": "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/fonts/bootstrap-icons.woff2",
+    "vendor/fonts/bootstrap-icons.woff": "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/fonts/bootstrap-icons.woff",
+    "vendor/chart.min.js": "https://cdn.jsdelivr.net/npm/chart.js@3.9.1/dist/chart.min.js",
+}
+
+# Only text formats are worth precompressing; woff2 is compressed already
+_COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".html")
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")?#]+)([?#][^'")]*)?\1\s*\)""")
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _sources(assets_dir):
+    """Asset names (relative, with forward slashes) in build order: CSS last"""
+    names = []
+    for root, dirs, files in os.walk(assets_dir):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != os.path.join(assets_dir, "dist")]
+        for filename in files:
+            names.append(os.path.relpath(os.path.join(root, filename), assets_dir).replace(os.sep, "/"))
+    # Stylesheets reference fonts and images, so those get their hashed names first
+    return sorted(names, key=lambda name: (name.endswith(".css"), name))
+
+
+def _hashed_name(name, data):
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{hashlib.blake2b(data, digest_size=5).hexdigest()}{extension}"
+
+
+def _rewrite_css(name, text, manifest):
+    """Point relative url()s in a stylesheet at the hashed files"""
+    base = os.path.dirname(name)
+
+    def replace(match):
+        quote, target, _ = match.groups()
+        if "://" in target or target.startswith(("/", "data:")):
+            return match.group(0)
+        resolved = os.path.normpath(os.path.join(base, target)).replace(os.sep, "/")
+        hashed = manifest.get(resolved)
+        if hashed is None:
+            return match.group(0)
+        return f"url({quote}{os.path.relpath(hashed, base or '.').replace(os.sep, '/')}{quote})"
+
+    return _CSS_URL.sub(replace, text)
+
+
+def build(assets_dir=ASSETS_DIR, dist_dir=DIST_DIR):
+    """Write fingerprinted copies of every asset; returns the manifest"""
+    manifest = {}
+    for name in _sources(assets_dir):
+        with open(os.path.join(assets_dir, name), "rb") as f:
+            data = f.read()
+        if name.endswith(".css"):
+            data = _rewrite_css(name, data.decode("utf-8"), manifest).encode("utf-8")
+        hashed = manifest[name] = _hashed_name(name, data)
+
+        path = os.path.join(dist_dir, hashed)
+        if os.path.exists(path):
+            continue
+        _write_atomic(path, data)
+        if name.endswith(_COMPRESSIBLE):
+            _write_atomic(path + VARIANT_SUFFIXES["gzip"], gzip.compress(data, 9, mtime=0))
+            if brotli is not None:
+                _write_atomic(path + VARIANT_SUFFIXES["br"], brotli.compress(data))
+
+    _write_atomic(os.path.join(dist_dir, MANIFEST_FILE), json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def vendor(assets_dir=ASSETS_DIR):
+    """Download the CDN libraries that are not vendored yet; returns their names"""
+    fetched = []
+    for name, url in VENDOR.items():
+        path = os.path.join(assets_dir, name)
+        if os.path.exists(path):
+            continue
+        with urllib.request.urlopen(url, timeout=30) as response:
+            _write_atomic(path, response.read())
+        fetched.append(name)
+    return fetched
+
+
+class AssetManifest:
+    """Logical asset name -> URL of its fingerprinted build"""
+
+    def __init__(self, assets_dir=ASSETS_DIR, dist_dir=DIST_DIR):
+        self.assets_dir = assets_dir
+        self.dist_dir = dist_dir
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    def _stale(self):
+        """True when any source is newer than the manifest"""
+        try:
+            built = os.stat(os.path.join(self.dist_dir, MANIFEST_FILE)).st_mtime_ns
+        except OSError:
+            return True
+        return any(
+            os.stat(os.path.join(self.assets_dir, name)).st_mtime_ns > built
+            for name in _sources(self.assets_dir)
+        )
+
+    def load(self, rebuild=True):
+        """Read the manifest, building first when it is missing or stale"""
+        with self._lock:
+            if rebuild and self._stale():
+                self._manifest = build(self.assets_dir, self.dist_dir)
+            else:
+                with open(os.path.join(self.dist_dir, MANIFEST_FILE)) as f:
+                    self._manifest = json.load(f)
+        return self._manifest
+
+    @property
+    def manifest(self):
+        return self._manifest if self._manifest is not None else self.load()
+
+    def url(self, name):
+        """URL of an asset's hashed build, or its CDN URL when it has not been vendored"""
+        hashed = self.manifest.get(name)
+        if hashed is not None:
+            return f"{URL_PREFIX}dist/{hashed}"
+        if name in VENDOR:
+            return VENDOR[name]
+        raise KeyError(f"Unknown asset: {name}")
+
+    def localize(self, html):
+        """Replace the CDN URLs in a static page with vendored copies where available"""
+        for name, url in VENDOR.items():
+            if name in self.manifest:
+                html = html.replace(url, self.url(name))
+        return html
+
+
+def _send_asset(dist_dir, filename):
+    """Serve a built asset, immutable and precompressed when the client accepts it"""
+    response = None
+    if filename.endswith(_COMPRESSIBLE):
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            variant = filename + suffix
+            if request.accept_encodings[encoding] and os.path.isfile(os.path.join(dist_dir, variant)):
+                response = send_from_directory(dist_dir, variant, mimetype=mimetype)
+                response.headers["Content-Encoding"] = encoding
+                break
+    if response is None:
+        response = send_from_directory(dist_dir, filename)
+    response.vary.add("Accept-Encoding")
+    if HASHED_NAME.search(filename):
+        response.headers["Cache-Control"] = IMMUTABLE
+    return response
+
+
+def register_assets(app, assets=None):
+    """Serve /assets/dist/ from `app` and expose asset_url() to its templates"""
+    assets = assets or AssetManifest()
+    assets.load()
+    app.jinja_env.globals["asset_url"] = assets.url
+
+    @app.route(f"{URL_PREFIX}dist/<path:filename>")
+    def asset(filename):
+        return _send_asset(assets.dist_dir, filename)
+
+    return assets
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or vendor the dashboard assets")
+    parser.add_argument("command", choices=["build", "vendor"])
+    args = parser.parse_args()
+    if args.command == "vendor":
+        fetched = vendor()
+        print(f"Vendored {len(fetched)} files" + (f": {', '.join(fetched)}" if fetched else ""))
+    manifest = build()
+    print(f"Built {len(manifest)} assets into {os.path.relpath(DIST_DIR)}")
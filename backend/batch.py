@@ -0,0 +1,105 @@
+"""Vectorized metric math for analyzing many matches at once"""
+import numpy as np
+
+# Metric layout shared by every SimpleAnalyzer: 3 categories x 4 metrics.
+# Column order of a metric batch follows this layout exactly.
+CATEGORIES = ("aim", "positioning", "decision_making")
+CATEGORY_LABELS = ("Aim", "Positioning", "Decision Making")
+METRIC_LAYOUT = {
+    "aim": ("accuracy", "reaction_time", "recoil_control", "headshot_percentage"),
+    "positioning": ("cover_usage", "movement_efficiency", "zone_awareness", "rotation_timing"),
+    "decision_making": ("engagement_choices", "item_management", "tactical_planning", "team_coordination"),
+}
+METRIC_KEYS = tuple(
+    (category, name) for category in CATEGORIES for name in METRIC_LAYOUT[category]
+)
+METRIC_COUNT = len(METRIC_KEYS)
+METRICS_PER_CATEGORY = 4
+
+# Overall score tiers: below 0.4 is tier 0, below 0.6 tier 1, below 0.8 tier 2, else tier 3
+RATING_THRESHOLDS = np.array([0.4, 0.6, 0.8])
+RATING_NAMES = ("Beginner", "Intermediate", "Advanced", "Expert")
+
+
+def metric_column(category, name):
+    """Return the batch column index of a metric"""
+    return METRIC_KEYS.index((category, name))
+
+
+def metrics_to_row(metrics):
+    """Flatten a nested metrics dict into a list in METRIC_KEYS order"""
+    return [metrics[category][name] for category, name in METRIC_KEYS]
+
+
+def overall_score(metrics):
+    """Average of the category averages of a nested metrics dict"""
+    return sum(
+        sum(metrics[category].values()) / len(metrics[category]) for category in CATEGORIES
+    ) / len(CATEGORIES)
+
+
+class MetricBatch:
+    """N matches worth of metrics stored as one (N x 12) array"""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != METRIC_COUNT:
+            raise ValueError(f"Expected an (N x {METRIC_COUNT}) metric array, got {values.shape}")
+        self.values = values
+
+        # Per-category averages, overall score and derived labels, all in one pass
+        grouped = values.reshape(len(values), len(CATEGORIES), METRICS_PER_CATEGORY)
+        self.category_averages = grouped.sum(axis=2) / METRICS_PER_CATEGORY
+        self.overall_scores = self.category_averages.sum(axis=1) / len(CATEGORIES)
+        self.strongest = self.category_averages.argmax(axis=1)
+        self.weakest = self.category_averages.argmin(axis=1)
+        self.rating_tiers = np.searchsorted(RATING_THRESHOLDS, self.overall_scores, side="right")
+
+    def __len__(self):
+        return len(self.values)
+
+    @classmethod
+    def simulate(cls, count, score_ranges, rng=None):
+        """Draw simulated scores for `count` matches
+
+        `score_ranges` maps (category, metric) to the (min, max) range used by
+        the analyzer's `_simulate_score` calls.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        low = np.array([score_ranges[key][0] for key in METRIC_KEYS])
+        high = np.array([score_ranges[key][1] for key in METRIC_KEYS])
+        values = rng.uniform(low, high, size=(count, METRIC_COUNT))
+        return cls(np.round(values, 2))
+
+    @classmethod
+    def from_metrics(cls, metrics_list):
+        """Build a batch from a list of nested metrics dicts"""
+        return cls([metrics_to_row(metrics) for metrics in metrics_list])
+
+    def iter_metrics(self):
+        """Yield nested metrics dicts, one per match, with plain Python floats"""
+        aim_keys = METRIC_LAYOUT["aim"]
+        positioning_keys = METRIC_LAYOUT["positioning"]
+        decision_keys = METRIC_LAYOUT["decision_making"]
+        for row in self.values.tolist():
+            yield {
+                "aim": dict(zip(aim_keys, row[0:4])),
+                "positioning": dict(zip(positioning_keys, row[4:8])),
+                "decision_making": dict(zip(decision_keys, row[8:12])),
+            }
+
+    def iter_summaries(self):
+        """Yield (averages, overall, strongest_label, weakest_label, rating) per match"""
+        averages = self.category_averages.tolist()
+        overall = self.overall_scores.tolist()
+        strongest = self.strongest.tolist()
+        weakest = self.weakest.tolist()
+        tiers = self.rating_tiers.tolist()
+        for i in range(len(self.values)):
+            yield (
+                averages[i],
+                overall[i],
+                CATEGORY_LABELS[strongest[i]],
+                CATEGORY_LABELS[weakest[i]],
+                RATING_NAMES[tiers[i]],
+            )
@@ -0,0 +1,58 @@
+"""Bounded LRU cache for pre-serialized analysis responses"""
+import threading
+from collections import OrderedDict
+
+
+class AnalysisCache:
+    """LRU cache of response entries keyed by (match id, encoding) and analysis version
+
+    The version is the analysis file's mtime, so an analysis rewritten by any
+    process misses the cache instead of serving stale bytes.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """Return the cached entry for this version of the analysis, or None"""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, entry):
+        """Cache an entry, evicting the least recently used one when full"""
+        with self._lock:
+            self._entries[key] = (version, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, match_id=None):
+        """Drop every representation of one match, or everything when match_id is None"""
+        with self._lock:
+            if match_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == match_id]:
+                    del self._entries[key]
+
+    def stats(self):
+        """Hit/miss counters for status endpoints"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
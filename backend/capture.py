@@ -0,0 +1,305 @@
+"""Screen capture into a shared-memory ring buffer
+
+`ScreenCapture` grabs the screen with mss at a fixed frame rate and writes
+each frame straight into the next slot of a `FrameRing`. The ring is one
+shared memory block, so analysis consumers in this or any other process read
+frames as NumPy views without copying them.
+
+The ring never blocks the capture loop: when consumers fall behind, the oldest
+frames are overwritten. Each consumer reads through its own `FrameReader`,
+which counts the frames it lost that way as dropped.
+"""
+import contextlib
+import threading
+import time
+from multiprocessing import shared_memory
+
+import mss
+import numpy as np
+
+from backend.roi import DEFAULT_LAYOUT, layout_for
+
+# Header fields, stored as int64 at the start of the shared block
+_SLOTS, _HEIGHT, _WIDTH, _CHANNELS, _WRITE_SEQ, _LATE = range(6)
+_HEADER_FIELDS = 6
+
+
+class FrameRing:
+    """Fixed-size ring of frames in shared memory
+
+    Layout: an int64 header, then per-slot sequence numbers (int64) and
+    capture timestamps (float64), then the (slots, height, width, channels)
+    uint8 frame array. Sequence numbers start at 1; a slot holding sequence
+    0 is empty and -1 is being written.
+
+    There is one writer (the capture loop). The ring keeps no read state;
+    consumers track their position with a FrameReader each.
+    """
+
+    def __init__(self, slots, height, width, channels=3, name=None):
+        if name is None:
+            size = self._size(slots, height, width, channels)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._map(slots, height, width, channels)
+        if self._owner:
+            self._header[:] = 0
+            self._header[[_SLOTS, _HEIGHT, _WIDTH, _CHANNELS]] = (slots, height, width, channels)
+            self._slot_seq[:] = 0
+
+    @staticmethod
+    def _size(slots, height, width, channels):
+        return (_HEADER_FIELDS + 2 * slots) * 8 + slots * height * width * channels
+
+    def _map(self, slots, height, width, channels):
+        buf = self._shm.buf
+        offset = _HEADER_FIELDS * 8
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+        self._slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += slots * 8
+        self._slot_time = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += slots * 8
+        self.frames = np.ndarray((slots, height, width, channels), dtype=np.uint8, buffer=buf, offset=offset)
+        self.slots = slots
+        self.shape = (height, width, channels)
+
+    @classmethod
+    def attach(cls, name):
+        """Map an existing ring created by another process"""
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+            slots, height, width, channels = (int(v) for v in header[:4])
+            del header
+        finally:
+            shm.close()
+        return cls(slots, height, width, channels, name=name)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    # Writer side
+
+    def claim(self):
+        """Return (sequence, writable frame view) for the next frame
+
+        The oldest frame is overwritten when the ring is full.
+        """
+        seq = int(self._header[_WRITE_SEQ]) + 1
+        slot = seq % self.slots
+        self._slot_seq[slot] = -1
+        return seq, self.frames[slot]
+
+    def commit(self, seq, timestamp):
+        """Publish a frame written into the view returned by claim()"""
+        slot = seq % self.slots
+        self._slot_time[slot] = timestamp
+        self._slot_seq[slot] = seq
+        self._header[_WRITE_SEQ] = seq
+
+    def mark_late(self, count=1):
+        """Record capture ticks missed because a grab overran its deadline"""
+        self._header[_LATE] += count
+
+    # Reader side
+
+    def latest(self):
+        """Return (sequence, timestamp, frame view) of the newest frame, or None"""
+        seq = int(self._header[_WRITE_SEQ])
+        if seq == 0:
+            return None
+        slot = seq % self.slots
+        return seq, float(self._slot_time[slot]), self.frames[slot]
+
+    def written(self):
+        """Sequence number of the newest frame, 0 before the first"""
+        return int(self._header[_WRITE_SEQ])
+
+    def frame(self, seq):
+        """Return (timestamp, frame view) of frame `seq`, which must still be in the ring"""
+        slot = seq % self.slots
+        return float(self._slot_time[slot]), self.frames[slot]
+
+    def is_current(self, seq):
+        """True while the slot of frame `seq` has not been reused"""
+        return self._slot_seq[seq % self.slots] == seq
+
+    def stats(self):
+        """Ring counters for status endpoints"""
+        header = self._header
+        return {
+            "slots": self.slots,
+            "written": int(header[_WRITE_SEQ]),
+            "late": int(header[_LATE]),
+        }
+
+    def close(self):
+        """Unmap the ring, and free it when this process created it"""
+        # Views into the buffer must go before the mapping can close
+        self._header = self._slot_seq = self._slot_time = self.frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class FrameReader:
+    """One consumer's cursor over a FrameRing
+
+    Every consumer, in this process or another, reads through a reader of
+    its own, so consumers never race on a shared cursor and each sees every
+    frame the ring still holds. Threads sharing one reader get each frame
+    once between them.
+    """
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.read_seq = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def next_frame(self):
+        """Return (sequence, timestamp, frame view) of the oldest unread frame, or None
+
+        Frames overwritten before they were read are skipped and counted as
+        dropped. The view stays valid until the writer laps the ring; call
+        `ring.is_current(seq)` after processing to detect that.
+        """
+        with self._lock:
+            write_seq = self.ring.written()
+            if self.read_seq >= write_seq:
+                return None
+
+            seq = self.read_seq + 1
+            oldest = write_seq - self.ring.slots + 1
+            if seq < oldest:
+                self.dropped += oldest - seq
+                seq = oldest
+            self.read_seq = seq
+        return (seq, *self.ring.frame(seq))
+
+    def stats(self):
+        """Cursor counters for status endpoints"""
+        with self._lock:
+            read_seq, dropped = self.read_seq, self.dropped
+        return {
+            "read": read_seq,
+            "pending": int(min(self.ring.written() - read_seq, self.ring.slots)),
+            "dropped": dropped,
+        }
+
+
+class ScreenCapture:
+    """Capture a monitor or region with mss into a FrameRing at a fixed rate
+
+    `region` is an mss-style dict (left, top, width, height); without it the
+    whole of `monitor` is captured. Frames are stored as BGR, the layout
+    OpenCV expects. `layout` names the HUD layout (see backend.roi) that
+    `next_rois()` crops frames with.
+    """
+
+    def __init__(self, fps=10, monitor=1, region=None, slots=64, layout=DEFAULT_LAYOUT):
+        with mss.mss() as sct:
+            area = dict(region) if region else dict(sct.monitors[monitor])
+        self.area = {key: int(area[key]) for key in ("left", "top", "width", "height")}
+        self.fps = fps
+        self.ring = FrameRing(slots, self.area["height"], self.area["width"], 3)
+        self.reader = FrameReader(self.ring)
+        self.layout = layout_for((self.area["width"], self.area["height"]), layout)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def resolution(self):
+        """Capture size in the "WIDTHxHEIGHT" form used by match metadata"""
+        return f"{self.area['width']}x{self.area['height']}"
+
+    def start(self):
+        """Start the capture thread"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="screen-capture", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop capturing; the ring stays readable until close()"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop capturing and free the ring"""
+        self.stop()
+        self.ring.close()
+
+    def _open_grabber(self):
+        return mss.mss()
+
+    def _grab_into(self, sct, slot):
+        shot = sct.grab(self.area)
+        # BGRA from mss -> BGR straight into shared memory, the only copy
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        np.copyto(slot, bgra[:, :, :3])
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        ring = self.ring
+        # mss handles are per-thread, so the loop opens its own
+        with self._open_grabber() as grabber:
+            deadline = time.perf_counter()
+            while not self._stop.is_set():
+                seq, slot = ring.claim()
+                self._grab_into(grabber, slot)
+                ring.commit(seq, time.time())
+
+                deadline += interval
+                now = time.perf_counter()
+                if now > deadline:
+                    # Skip the ticks this grab overran instead of bursting to catch up
+                    missed = int((now - deadline) / interval) + 1
+                    ring.mark_late(missed)
+                    deadline += missed * interval
+                self._stop.wait(max(deadline - time.perf_counter(), 0))
+
+    def next_rois(self, regions=None):
+        """Return (sequence, timestamp, {region: view}) for the next unread frame, or None"""
+        frame = self.reader.next_frame()
+        if frame is None:
+            return None
+        seq, timestamp, pixels = frame
+        return seq, timestamp, self.layout.crop(pixels, regions)
+
+    def stats(self):
+        """Capture settings and ring counters"""
+        return {"fps": self.fps, "resolution": self.resolution, **self.ring.stats(), **self.reader.stats()}
+
+
+class SyntheticCapture(ScreenCapture):
+    """Capture stand-in producing moving test frames, for servers without a display"""
+
+    def __init__(self, fps=10, resolution=(1280, 720), slots=16, layout=DEFAULT_LAYOUT):
+        width, height = resolution
+        self.area = {"left": 0, "top": 0, "width": width, "height": height}
+        self.fps = fps
+        self.ring = FrameRing(slots, height, width, 3)
+        self.reader = FrameReader(self.ring)
+        self.layout = layout_for((width, height), layout)
+        self._stop = threading.Event()
+        self._thread = None
+        self._base = np.random.default_rng(0).integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+        self._tick = 0
+
+    def _open_grabber(self):
+        return contextlib.nullcontext()
+
+    def _grab_into(self, grabber, slot):
+        # Scroll the test pattern so consecutive frames differ
+        self._tick += 1
+        shift = (self._tick * 7) % self._base.shape[1]
+        np.copyto(slot[:, shift:], self._base[:, :self._base.shape[1] - shift])
+        np.copyto(slot[:, :shift], self._base[:, self._base.shape[1] - shift:])
@@ -0,0 +1,342 @@
+"""How much of a partly received recording can already be decoded
+
+Chunked uploads (see backend.uploads) arrive in any order, but once the
+first N bytes of a file are in place, the video those bytes hold can be
+analyzed while the rest is still uploading. This module reads just enough
+of the container structure to tell how many seconds of video lie entirely
+within such a prefix:
+
+- MP4/MOV with its index (`moov`) ahead of the media data ("fast start"):
+  the sample tables give the offset, size and decode time of every frame
+- fragmented MP4: the base decode time (`tfdt`) of each `moof` fragment
+- Matroska/WebM: the timecode of each cluster
+
+An MP4 whose index comes last, the default of many recorders, has nothing
+decodable until the whole file is there. For fragments and clusters only
+the start time is read, so the last complete one before the first missing
+byte is not counted; the answer errs on the short side, never the long one.
+"""
+import struct
+
+import numpy as np
+
+# MP4 boxes that only hold other boxes
+_MP4_CONTAINERS = {b"trak", b"mdia", b"minf", b"stbl", b"traf", b"mvex", b"edts"}
+
+# Matroska element IDs
+_EBML = 0x1A45DFA3
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TIMECODE_SCALE = 0x2AD7B1
+_CLUSTER = 0x1F43B675
+_CLUSTER_TIMECODE = 0xE7
+_CRC32 = 0xBF
+_VOID = 0xEC
+# Elements that may follow a cluster at the top of a segment, ending an unknown-size cluster
+_SEGMENT_CHILDREN = {
+    _INFO, _CLUSTER, 0x114D9B74, 0x1654AE6B, 0x1C53BB6B, 0x1941A469, 0x1043A770, 0x1254C367,
+}
+_DEFAULT_TIMECODE_SCALE = 1_000_000
+
+
+def decodable_seconds(path, ready_bytes):
+    """Seconds of video held entirely in the first `ready_bytes` bytes of `path`
+
+    Returns None when the container is not one of the supported layouts or
+    nothing can be decoded from the prefix yet.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(8)
+        f.seek(0)
+        if magic[:4] == struct.pack(">I", _EBML):
+            return _matroska_seconds(f, ready_bytes)
+        if magic[4:8] in (b"ftyp", b"moov", b"free", b"wide", b"skip"):
+            return _mp4_seconds(f, ready_bytes)
+    return None
+
+
+def _fragment_seconds(starts, complete):
+    """Start of the first incomplete fragment, else of the last one (whose end is unknown)"""
+    for start, done in zip(starts, complete):
+        if not done:
+            return start
+    return starts[-1] if starts else None
+
+
+# MP4
+
+
+def _top_level_boxes(f, ready_bytes):
+    """Yield (type, offset, header size, size) of the top-level boxes whose header is ready"""
+    f.seek(0, 2)
+    file_size = f.tell()
+    offset = 0
+    while offset + 8 <= ready_bytes:
+        f.seek(offset)
+        header = f.read(16)
+        size, kind = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            if offset + 16 > ready_bytes:
+                return
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            # The last box runs to the end of the file
+            size = file_size - offset
+        if size < header_size:
+            return
+        yield kind, offset, header_size, size
+        offset += size
+
+
+def _children(data):
+    """Yield (type, payload) of the boxes packed in `data`"""
+    offset = 0
+    while offset + 8 <= len(data):
+        size, kind = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header_size:
+            return
+        yield kind, data[offset + header_size:offset + size]
+        offset += size
+
+
+def _leaves(data, found=None):
+    """{type: payload} of the first box of each type under `data`, looking inside containers"""
+    found = {} if found is None else found
+    for kind, payload in _children(data):
+        if kind in _MP4_CONTAINERS:
+            _leaves(payload, found)
+        else:
+            found.setdefault(kind, payload)
+    return found
+
+
+def _video_track(moov):
+    """Leaf boxes of the first video track in a moov payload, or None"""
+    for kind, trak in _children(moov):
+        if kind == b"trak":
+            leaves = _leaves(trak)
+            hdlr = leaves.get(b"hdlr")
+            if hdlr is not None and bytes(hdlr[8:12]) == b"vide":
+                return leaves
+    return None
+
+
+def _timescale(track):
+    mdhd = track[b"mdhd"]
+    return struct.unpack_from(">I", mdhd, 20 if mdhd[0] == 1 else 12)[0]
+
+
+def _track_id(track):
+    tkhd = track[b"tkhd"]
+    return struct.unpack_from(">I", tkhd, 20 if tkhd[0] == 1 else 12)[0]
+
+
+def _sample_table(track):
+    """(decode times in seconds, byte offsets, sizes, duration in seconds) of a track's samples"""
+    timescale = _timescale(track)
+    stts, stsz, stsc = track.get(b"stts"), track.get(b"stsz"), track.get(b"stsc")
+    chunk_box, chunk_type = (track[b"stco"], ">u4") if b"stco" in track else (track.get(b"co64"), ">u8")
+    if stts is None or stsz is None or stsc is None or chunk_box is None:
+        return None
+
+    count = struct.unpack_from(">I", stts, 4)[0]
+    runs = np.frombuffer(stts, ">u4", count * 2, 8).reshape(count, 2).astype(np.int64)
+    deltas = np.repeat(runs[:, 1], runs[:, 0])
+    decode_times = np.cumsum(deltas) - deltas
+
+    sample_size, sample_count = struct.unpack_from(">II", stsz, 4)
+    if sample_size:
+        sizes = np.full(sample_count, sample_size, dtype=np.int64)
+    else:
+        sizes = np.frombuffer(stsz, ">u4", sample_count, 12).astype(np.int64)
+
+    count = struct.unpack_from(">I", chunk_box, 4)[0]
+    chunk_offsets = np.frombuffer(chunk_box, chunk_type, count, 8).astype(np.int64)
+    count = struct.unpack_from(">I", stsc, 4)[0]
+    entries = np.frombuffer(stsc, ">u4", count * 3, 8).reshape(count, 3).astype(np.int64)
+    # Each stsc entry covers the chunks up to the next entry's first chunk
+    chunk_runs = np.diff(np.append(entries[:, 0] - 1, len(chunk_offsets)))
+    per_chunk = np.repeat(entries[:, 1], np.maximum(chunk_runs, 0))
+    chunk_of_sample = np.repeat(np.arange(len(per_chunk)), per_chunk)[:sample_count]
+    first_of_chunk = np.cumsum(per_chunk) - per_chunk
+    starts = np.cumsum(sizes) - sizes
+    offsets = chunk_offsets[chunk_of_sample] + starts - starts[first_of_chunk[chunk_of_sample]]
+
+    count = min(len(decode_times), len(offsets))
+    return decode_times[:count] / timescale, offsets[:count], sizes[:count], deltas.sum() / timescale
+
+
+def _fragment_time(moof, track_id, timescale):
+    """Base decode time in seconds of a moof's run of the given track, or None"""
+    for kind, traf in _children(moof):
+        if kind != b"traf":
+            continue
+        leaves = _leaves(traf)
+        tfhd, tfdt = leaves.get(b"tfhd"), leaves.get(b"tfdt")
+        if tfhd is None or tfdt is None or struct.unpack_from(">I", tfhd, 4)[0] != track_id:
+            continue
+        return struct.unpack_from(">Q" if tfdt[0] == 1 else ">I", tfdt, 4)[0] / timescale
+    return None
+
+
+def _mp4_seconds(f, ready_bytes):
+    track = None
+    starts, complete = [], []
+    for kind, offset, header_size, size in _top_level_boxes(f, ready_bytes):
+        end = offset + size
+        if kind == b"moov":
+            if end > ready_bytes:
+                return None
+            f.seek(offset + header_size)
+            track = _video_track(memoryview(f.read(size - header_size)))
+            if track is None:
+                return None
+        elif kind == b"moof":
+            if track is None or end > ready_bytes:
+                break
+            f.seek(offset + header_size)
+            start = _fragment_time(memoryview(f.read(size - header_size)), _track_id(track), _timescale(track))
+            if start is None:
+                return None
+            starts.append(start)
+            complete.append(False)
+        elif kind == b"mdat":
+            if complete and not complete[-1]:
+                complete[-1] = end <= ready_bytes
+            if end > ready_bytes:
+                # With the index after the media data, nothing is decodable before it arrives
+                break
+    if track is None:
+        return None
+    if starts:
+        return _fragment_seconds(starts, complete)
+
+    table = _sample_table(track)
+    if table is None:
+        return None
+    decode_times, offsets, sizes, duration = table
+    missing = offsets + sizes > ready_bytes
+    return float(decode_times[missing].min()) if missing.any() else float(duration)
+
+
+# Matroska / WebM
+
+
+def _vint(data, offset, keep_marker):
+    """(value, length) of the EBML variable-size integer at `offset`, None if it is cut off"""
+    if offset >= len(data) or not data[offset]:
+        return None
+    length = 9 - data[offset].bit_length()
+    if offset + length > len(data):
+        return None
+    value = int.from_bytes(data[offset:offset + length], "big")
+    if not keep_marker:
+        value &= (1 << (7 * length)) - 1
+    return value, length
+
+
+def _element(f, offset, ready_bytes):
+    """(id, data offset, data size or None if unknown) of the element at `offset`, None if cut off"""
+    f.seek(offset)
+    header = f.read(max(0, min(12, ready_bytes - offset)))
+    element_id = _vint(header, 0, keep_marker=True)
+    if element_id is None:
+        return None
+    size = _vint(header, element_id[1], keep_marker=False)
+    if size is None:
+        return None
+    header_size = element_id[1] + size[1]
+    unknown = size[0] == (1 << (7 * size[1])) - 1
+    return element_id[0], offset + header_size, None if unknown else size[0]
+
+
+def _unsigned(f, offset, size):
+    f.seek(offset)
+    return int.from_bytes(f.read(size), "big")
+
+
+def _cluster_timecode(f, data_offset, ready_bytes):
+    """Timecode of the cluster whose data starts at `data_offset`, None if not ready
+
+    The timecode is the first child apart from a possible CRC-32 or Void element.
+    """
+    offset = data_offset
+    while True:
+        element = _element(f, offset, ready_bytes)
+        if element is None or element[2] is None or element[1] + element[2] > ready_bytes:
+            return None
+        element_id, child_offset, size = element
+        if element_id == _CLUSTER_TIMECODE:
+            return _unsigned(f, child_offset, size)
+        if element_id not in (_CRC32, _VOID):
+            return None
+        offset = child_offset + size
+
+
+def _cluster_end(f, data_offset, ready_bytes):
+    """End of an unknown-size cluster: where the next segment-level element starts, None if not ready"""
+    offset = data_offset
+    while offset < ready_bytes:
+        element = _element(f, offset, ready_bytes)
+        if element is None:
+            return None
+        element_id, child_offset, size = element
+        if element_id in _SEGMENT_CHILDREN:
+            return offset
+        if size is None:
+            return None
+        offset = child_offset + size
+    return None
+
+
+def _matroska_seconds(f, ready_bytes):
+    header = _element(f, 0, ready_bytes)
+    if header is None or header[2] is None:
+        return None
+    segment = _element(f, header[1] + header[2], ready_bytes)
+    if segment is None or segment[0] != _SEGMENT:
+        return None
+    offset = segment[1]
+    segment_end = ready_bytes if segment[2] is None else min(ready_bytes, segment[1] + segment[2])
+
+    timecode_scale = _DEFAULT_TIMECODE_SCALE
+    starts, complete = [], []
+    while offset < segment_end:
+        element = _element(f, offset, ready_bytes)
+        if element is None:
+            break
+        element_id, data_offset, size = element
+        if element_id == _INFO:
+            if size is None or data_offset + size > ready_bytes:
+                break
+            child = data_offset
+            while child < data_offset + size:
+                info = _element(f, child, ready_bytes)
+                if info is None or info[2] is None:
+                    break
+                if info[0] == _TIMECODE_SCALE:
+                    timecode_scale = _unsigned(f, info[1], info[2])
+                child = info[1] + info[2]
+        elif element_id == _CLUSTER:
+            timecode = _cluster_timecode(f, data_offset, ready_bytes)
+            if timecode is None:
+                break
+            starts.append(timecode * timecode_scale / 1e9)
+            end = data_offset + size if size is not None else _cluster_end(f, data_offset, ready_bytes)
+            complete.append(end is not None and end <= ready_bytes)
+            if not complete[-1]:
+                break
+            offset = end
+            continue
+        if size is None:
+            break
+        offset = data_offset + size
+    return _fragment_seconds(starts, complete)
@@ -0,0 +1,165 @@
+"""Cheap change detection that drops near-duplicate frames before analysis
+
+Each frame is reduced to a tiny grayscale thumbnail by strided sampling,
+and that thumbnail is compared with the last kept frame's thumbnail by mean
+absolute difference. Frames that barely differ (menus, lobby, spectating
+idle, loading screens) are skipped. Every skipped frame is still recorded in
+a `FrameTimeline`, which maps it to the kept frame whose analysis stands in
+for it, so match timelines keep their full length.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Thumbnail size (width, height) frames are sampled down to
+THUMBNAIL_SIZE = (32, 18)
+
+# Mean absolute grayscale difference (0-255) below which a frame is a duplicate
+DEFAULT_THRESHOLD = 2.0
+
+# Scene tags
+SCENE_GAMEPLAY = "gameplay"
+SCENE_STATIC = "static"
+SCENE_LOADING = "loading"
+SCENE_TRANSITION = "transition"
+
+# Mean brightness below which a frame is a loading/black screen
+LOADING_BRIGHTNESS = 12.0
+# Difference above which a kept frame is a scene cut rather than motion
+TRANSITION_DIFFERENCE = 60.0
+
+FrameDecision = namedtuple("FrameDecision", "seq timestamp keep scene difference source")
+
+
+def thumbnails(frames):
+    """Grayscale thumbnails of a frame or an (N, h, w, c) frame stack, as float32"""
+    height, width = frames.shape[-3], frames.shape[-2]
+    step_y = max(1, height // THUMBNAIL_SIZE[1])
+    step_x = max(1, width // THUMBNAIL_SIZE[0])
+    sampled = frames[..., ::step_y, ::step_x, :]
+    return sampled.mean(axis=-1, dtype=np.float32)
+
+
+class FrameTimeline:
+    """Run-length record of which frames were analyzed and which were skipped
+
+    Segments are dicts with start/end sequence numbers and timestamps, the
+    scene tag, whether the frames were analyzed and, for skipped runs, the
+    `source` frame whose analysis covers them.
+    """
+
+    def __init__(self):
+        self.segments = []
+        self.analyzed = 0
+        self.skipped = 0
+
+    def add(self, decision):
+        if decision.keep:
+            self.analyzed += 1
+        else:
+            self.skipped += 1
+
+        last = self.segments[-1] if self.segments else None
+        if (
+            last is not None
+            and last["analyzed"] == decision.keep
+            and last["scene"] == decision.scene
+            and last["source"] == (None if decision.keep else decision.source)
+            and last["end"] + 1 == decision.seq
+        ):
+            last["end"] = decision.seq
+            last["end_time"] = decision.timestamp
+            return
+        self.segments.append({
+            "start": decision.seq,
+            "end": decision.seq,
+            "start_time": decision.timestamp,
+            "end_time": decision.timestamp,
+            "scene": decision.scene,
+            "analyzed": decision.keep,
+            "source": None if decision.keep else decision.source,
+        })
+
+    def skip_ratio(self):
+        total = self.analyzed + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def to_dict(self):
+        """Summary plus segments, in the form stored in match metadata"""
+        return {
+            "analyzed": self.analyzed,
+            "skipped": self.skipped,
+            "segments": self.segments,
+        }
+
+
+class FrameFilter:
+    """Decide frame by frame whether a frame is worth analyzing
+
+    A frame is kept when it differs from the last kept frame by at least
+    `threshold`, and at least every `keyframe_interval` frames so slow drift
+    is never skipped indefinitely.
+
+    Frames checked without a sequence number are numbered from `first_seq`
+    on, e.g. to continue the numbering of a recording whose earlier part
+    went through another filter.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, keyframe_interval=50, first_seq=1):
+        self.threshold = threshold
+        self.keyframe_interval = keyframe_interval
+        self.timeline = FrameTimeline()
+        self._reference = None
+        self._reference_seq = None
+        self._since_keyframe = 0
+        self._seq = first_seq - 1
+
+    def check(self, frame, seq=None, timestamp=None):
+        """Classify one frame, record it in the timeline and return its FrameDecision"""
+        return self._decide(thumbnails(frame), seq, timestamp)
+
+    def check_batch(self, frames, timestamps=None):
+        """Classify a frame stack; thumbnails are computed in one vectorized pass"""
+        thumbs = thumbnails(frames)
+        return [
+            self._decide(thumb, None, None if timestamps is None else timestamps[i])
+            for i, thumb in enumerate(thumbs)
+        ]
+
+    def _decide(self, thumb, seq, timestamp):
+        if seq is None:
+            seq = self._seq + 1
+        self._seq = seq
+        if timestamp is not None:
+            timestamp = float(timestamp)
+
+        brightness = float(thumb.mean())
+        if self._reference is None:
+            difference = float("inf")
+        else:
+            difference = float(np.abs(thumb - self._reference).mean())
+
+        if brightness < LOADING_BRIGHTNESS:
+            scene = SCENE_LOADING
+        elif difference < self.threshold:
+            scene = SCENE_STATIC
+        elif difference >= TRANSITION_DIFFERENCE and self._reference is not None:
+            scene = SCENE_TRANSITION
+        else:
+            scene = SCENE_GAMEPLAY
+
+        keep = (
+            self._reference is None
+            or (difference >= self.threshold and scene != SCENE_LOADING)
+            or self._since_keyframe + 1 >= self.keyframe_interval
+        )
+        if keep:
+            self._reference = thumb
+            self._reference_seq = seq
+            self._since_keyframe = 0
+        else:
+            self._since_keyframe += 1
+
+        decision = FrameDecision(seq, timestamp, keep, scene, difference, self._reference_seq)
+        self.timeline.add(decision)
+        return decision
@@ -0,0 +1,298 @@
+"""In-process publish/subscribe broker for Server-Sent Events
+
+Publishers push events to a topic; each subscriber owns a bounded queue, so
+one slow client can never hold up a publisher or the other subscribers. A
+subscriber whose queue overflows is disconnected, and because every topic
+keeps a short replay history, it picks up where it left off when the browser
+reconnects with Last-Event-ID. A closed topic keeps its history for a
+grace period, so a client that connects just after the last event still
+receives it instead of finding no topic at all.
+
+Topics live in the memory of one process: a client has to reach the worker
+that publishes its topic.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+
+from backend.jobs import CANCELLED, COMPLETED, FAILED
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15
+# Seconds a closed topic's history stays available to late subscribers
+CLOSED_TOPIC_GRACE = 60
+
+
+def format_event(event_id, event, data):
+    """Encode one event in the text/event-stream wire format"""
+    payload = data if isinstance(data, str) else json.dumps(data, separators=(",", ":"))
+    lines = [f"id: {event_id}", f"event: {event}"]
+    lines.extend(f"data: {line}" for line in payload.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """One client's view of a topic
+
+    Readers either block in `get()`/`stream()` (one thread per client, as
+    under WSGI) or await `aget()`/`astream()` on an asyncio loop, where an
+    idle subscriber costs no thread at all.
+    """
+
+    def __init__(self, broker, topic, maxsize):
+        self.broker = broker
+        self.topic = topic
+        self.maxsize = maxsize
+        self.lagged = False
+        self._messages = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+        # (loop, asyncio.Event) of a reader awaiting aget()
+        self._waker = None
+
+    def _offer(self, message):
+        """Queue a message; returns False when the subscriber has fallen behind"""
+        with self._cond:
+            if len(self._messages) >= self.maxsize:
+                self.lagged = True
+                return False
+            self._messages.append(message)
+            self._cond.notify()
+            waker = self._waker
+        self._wake(waker)
+        return True
+
+    def _end(self):
+        """Wake the reader so it sees the end of the stream"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            waker = self._waker
+        self._wake(waker)
+
+    @staticmethod
+    def _wake(waker):
+        if waker is not None:
+            loop, event = waker
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The reader's loop has already shut down
+                pass
+
+    def _pop(self):
+        """Next message, None if there is none yet; caller holds the condition"""
+        if self._messages:
+            return self._messages.popleft()
+        if self._closed:
+            raise EOFError
+        return None
+
+    def get(self, timeout=None):
+        """Next encoded event, None on timeout; raises EOFError once closed"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._messages or self._closed, timeout)
+            return self._pop()
+
+    async def aget(self, timeout=None):
+        """Awaitable get(): next encoded event, None on timeout, EOFError once closed"""
+        event = asyncio.Event()
+        with self._cond:
+            message = self._pop()
+            if message is not None:
+                return message
+            self._waker = (asyncio.get_running_loop(), event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._waker = None
+        with self._cond:
+            return self._pop()
+
+    def close(self):
+        """Unsubscribe"""
+        self.broker._unsubscribe(self)
+        with self._cond:
+            self._closed = True
+
+    def stream(self, heartbeat=HEARTBEAT_SECONDS):
+        """Yield encoded events, with keep-alive comments while idle, until closed"""
+        try:
+            yield "retry: 2000\n\n"
+            while True:
+                try:
+                    message = self.get(timeout=heartbeat)
+                except EOFError:
+                    return
+                yield ": keep-alive\n\n" if message is None else message
+        finally:
+            self.close()
+
+    async def astream(self, heartbeat=HEARTBEAT_SECONDS):
+        """Async stream(), for ASGI servers"""
+        try:
+            yield "retry: 2000\n\n"
+            while True:
+                try:
+                    message = await self.aget(timeout=heartbeat)
+                except EOFError:
+                    return
+                yield ": keep-alive\n\n" if message is None else message
+        finally:
+            self.close()
+
+
+class EventBroker:
+    """Topic-based fan-out of events to SSE subscribers"""
+
+    def __init__(self, history=256, queue_size=256, grace=CLOSED_TOPIC_GRACE):
+        self.history = history
+        self.queue_size = queue_size
+        self.grace = grace
+        self._ids = itertools.count(1)
+        self._topics = {}
+        # Closed topics in closing order, with the time their history expires
+        self._closed = {}
+        self._lock = threading.Lock()
+
+    def _topic(self, topic):
+        state = self._topics.get(topic)
+        if state is None:
+            state = self._topics[topic] = {"history": deque(maxlen=self.history), "subscribers": set()}
+        return state
+
+    def _expire(self):
+        """Forget closed topics whose grace period is over; caller holds the lock"""
+        now = time.monotonic()
+        for topic, expires in list(self._closed.items()):
+            if expires > now:
+                break
+            del self._closed[topic]
+            del self._topics[topic]
+
+    def publish(self, topic, event, data):
+        """Send an event to every subscriber of `topic`, opening the topic if needed; returns its id"""
+        with self._lock:
+            self._expire()
+            event_id = next(self._ids)
+            message = format_event(event_id, event, data)
+            # Publishing again reopens a closed topic
+            self._closed.pop(topic, None)
+            state = self._topic(topic)
+            state["history"].append((event_id, message))
+            subscribers = list(state["subscribers"])
+        for subscription in subscribers:
+            if not subscription._offer(message):
+                # Drop the slow client; it resumes from history on reconnect
+                self._unsubscribe(subscription)
+                subscription._end()
+        return event_id
+
+    def subscribe(self, topic, last_event_id=None, initial=None, create=True):
+        """Subscribe to a topic, replaying missed history after `last_event_id`
+
+        `initial` is an optional (event, data) pair sent first, e.g. a full
+        snapshot for a new client. It carries the id of the latest event so
+        a reconnecting client only replays what came after it. With
+        `create=False`, returns None instead of opening a topic nobody
+        publishes to yet. On a recently closed topic the subscription
+        replays the history and then ends.
+        """
+        subscription = Subscription(self, topic, self.queue_size)
+        with self._lock:
+            self._expire()
+            if not create and topic not in self._topics:
+                return None
+            state = self._topic(topic)
+            if initial is not None:
+                latest_id = state["history"][-1][0] if state["history"] else 0
+                subscription._offer(format_event(latest_id, *initial))
+            if last_event_id is not None:
+                for event_id, message in state["history"]:
+                    if event_id > last_event_id:
+                        subscription._offer(message)
+            if topic in self._closed:
+                subscription._end()
+            else:
+                state["subscribers"].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            state = self._topics.get(subscription.topic)
+            if state is not None:
+                state["subscribers"].discard(subscription)
+
+    def close_topic(self, topic):
+        """End every stream of a topic; its history is forgotten after the grace period"""
+        with self._lock:
+            self._expire()
+            state = self._topics.get(topic)
+            if state is None:
+                return
+            subscribers, state["subscribers"] = state["subscribers"], set()
+            # Re-inserted so the dict stays in expiry order
+            self._closed.pop(topic, None)
+            self._closed[topic] = time.monotonic() + self.grace
+        for subscription in subscribers:
+            subscription._end()
+
+    def subscriber_count(self, topic):
+        """Number of clients currently subscribed to `topic`"""
+        with self._lock:
+            state = self._topics.get(topic)
+            return len(state["subscribers"]) if state is not None else 0
+
+    def stats(self):
+        """Topic and subscriber counts for status endpoints"""
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "subscribers": sum(len(state["subscribers"]) for state in self._topics.values()),
+            }
+
+
+def parse_last_event_id(value):
+    """Last-Event-ID header value as an int, or None"""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def match_topic(match_id):
+    """Topic that a match's analysis progress is published on"""
+    return f"match:{match_id}"
+
+
+def job_listener(broker):
+    """JobQueue listener publishing each match job's status, progress and result
+
+    Events on the match topic: "status" (queued/running), "progress" with
+    the fraction done and any partial metrics, then one of "result",
+    "failed" or "cancelled", after which the topic is closed. Clients
+    subscribing shortly after still receive the history, terminal event
+    included.
+    """
+    def listener(job, event, data):
+        match_id = job.metadata.get("match_id")
+        if match_id is None:
+            return
+        topic = match_topic(match_id)
+        if event == "progress":
+            broker.publish(topic, "progress", {"progress": job.progress, "partial": data})
+        elif event == COMPLETED:
+            broker.publish(topic, "result", job.result)
+            broker.close_topic(topic)
+        elif event in (FAILED, CANCELLED):
+            broker.publish(topic, event, {"job_id": job.id, "error": job.error})
+            broker.close_topic(topic)
+        else:
+            broker.publish(topic, "status", {"job_id": job.id, "status": event})
+    return listener
@@ -0,0 +1,283 @@
+"""Pluggable execution backends for CPU-bound gameplay analysis
+
+Analyzers are referenced by import path ("package.module:ClassName") so that
+worker processes can load them on their own. An analyzer is constructed with
+the match directory and run with `analyze()`; when frames are handed over
+in memory they are passed as `analyze(frames=...)`. An optional class-level
+`load_models()` hook is called once per worker so models stay warm.
+
+Recorded videos are decoded inside the worker itself, so no frames cross
+the process boundary. They are analyzed in checkpointed windows when the
+analyzer supports it (see backend.windows), or streamed through `feed()` and
+`finish()` (see backend.video). A video analysis can be stopped part way
+with an event from the executor's `cancel_event()`.
+"""
+import importlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_ANALYZER = "backend.analyzer:GameplayAnalyzer"
+
+# Analyzer class loaded in each worker process by _init_worker
+_worker_analyzer = None
+
+# Shared executors created by get_executor(), keyed by analyzer path
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def load_analyzer(path):
+    """Import an analyzer class from a "module:ClassName" path"""
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _warm_up(analyzer_cls):
+    """Load OpenCV and the analyzer's models ahead of the first match"""
+    try:
+        import cv2
+        # One OpenCV thread per worker; the pool provides the parallelism
+        cv2.setNumThreads(1)
+    except ImportError:
+        pass
+    load_models = getattr(analyzer_cls, "load_models", None)
+    if load_models is not None:
+        load_models()
+
+
+def _init_worker(analyzer_path):
+    """Process pool initializer: import and warm up the analyzer once"""
+    global _worker_analyzer
+    _worker_analyzer = load_analyzer(analyzer_path)
+    _warm_up(_worker_analyzer)
+
+
+def _ping():
+    """No-op task used to start every worker up front"""
+    return os.getpid()
+
+
+def _run_in_worker(match_dir, frames_ref):
+    """Run one analysis inside a worker process"""
+    analyzer = _worker_analyzer(match_dir)
+    if frames_ref is None:
+        return analyzer.analyze()
+
+    shm, frames = SharedFrames.attach(frames_ref)
+    try:
+        return analyzer.analyze(frames=frames)
+    finally:
+        del frames
+        shm.close()
+
+
+def _run_video_in_worker(match_dir, video_path, sample_fps, cancel_event, max_seconds):
+    """Decode a video and analyze it inside a worker process"""
+    from backend.windows import analyze_recording
+
+    return analyze_recording(
+        _worker_analyzer(match_dir), match_dir, video_path, sample_fps, cancel_event, max_seconds
+    )
+
+
+def _reanalyze_in_worker(match_dir):
+    """Rebuild a windowed analysis from its cached features inside a worker process"""
+    from backend.windows import WindowedAnalysis
+
+    return WindowedAnalysis(match_dir).reanalyze(_worker_analyzer(match_dir))
+
+
+class SharedFrames:
+    """A block of frames placed in shared memory for a worker to read in place"""
+
+    def __init__(self, frames):
+        frames = np.ascontiguousarray(frames)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(frames.nbytes, 1))
+        view = np.ndarray(frames.shape, dtype=frames.dtype, buffer=self._shm.buf)
+        view[...] = frames
+        del view
+        self.ref = (self._shm.name, frames.shape, frames.dtype.str)
+
+    @staticmethod
+    def attach(ref):
+        """Map frames described by `ref` without copying; returns (shm, array)"""
+        name, shape, dtype = ref
+        # Pool workers share the parent's resource tracker, so the segment
+        # stays registered once and is unlinked by its creator in release()
+        shm = shared_memory.SharedMemory(name=name)
+        return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+    def release(self):
+        """Free the shared memory segment"""
+        self._shm.close()
+        self._shm.unlink()
+
+
+class InlineExecutor:
+    """Run analyses in the calling thread"""
+
+    def __init__(self, analyzer_path=DEFAULT_ANALYZER):
+        self.analyzer_cls = load_analyzer(analyzer_path)
+        self.workers = 1
+
+    def submit(self, match_dir, frames=None):
+        """Run the analysis now and return a completed Future"""
+        future = Future()
+        try:
+            analyzer = self.analyzer_cls(match_dir)
+            if frames is None:
+                future.set_result(analyzer.analyze())
+            else:
+                future.set_result(analyzer.analyze(frames=frames))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def analyze(self, match_dir, frames=None):
+        """Run an analysis and return its result"""
+        return self.submit(match_dir, frames).result()
+
+    def cancel_event(self):
+        """Event that stops a video analysis submitted with it"""
+        return threading.Event()
+
+    def submit_video(self, match_dir, video_path, sample_fps, cancel_event=None, max_seconds=None):
+        """Analyze a video now and return a completed Future"""
+        from backend.windows import analyze_recording
+
+        future = Future()
+        try:
+            analyzer = self.analyzer_cls(match_dir)
+            future.set_result(analyze_recording(
+                analyzer, match_dir, video_path, sample_fps, cancel_event, max_seconds
+            ))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit_reanalysis(self, match_dir):
+        """Replay cached window features now and return a completed Future"""
+        from backend.windows import WindowedAnalysis
+
+        future = Future()
+        try:
+            future.set_result(WindowedAnalysis(match_dir).reanalyze(self.analyzer_cls(match_dir)))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self):
+        """Nothing to release"""
+
+
+class ProcessPoolAnalysisExecutor:
+    """Run analyses on a pool of warm worker processes
+
+    Workers are spawned (not forked) so they never inherit the web server's
+    threads or sockets, and each one imports OpenCV and the analyzer models
+    exactly once. Frames are passed through shared memory instead of being
+    pickled into the task.
+    """
+
+    def __init__(self, workers=None, analyzer_path=DEFAULT_ANALYZER):
+        self.workers = workers or os.cpu_count() or 1
+        self.analyzer_path = analyzer_path
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(analyzer_path,),
+        )
+        # Serves the cancel events shared with the workers; started on first use
+        self._manager = None
+        self._manager_lock = threading.Lock()
+
+    def warm(self):
+        """Start every worker now instead of on the first analyses"""
+        pings = [self._pool.submit(_ping) for _ in range(self.workers)]
+        return sorted({ping.result() for ping in pings})
+
+    def submit(self, match_dir, frames=None):
+        """Queue an analysis and return a Future for its result"""
+        if frames is None:
+            return self._pool.submit(_run_in_worker, match_dir, None)
+
+        shared = SharedFrames(frames)
+        future = self._pool.submit(_run_in_worker, match_dir, shared.ref)
+        future.add_done_callback(lambda _: shared.release())
+        return future
+
+    def analyze(self, match_dir, frames=None):
+        """Run an analysis and return its result"""
+        return self.submit(match_dir, frames).result()
+
+    def cancel_event(self):
+        """Event that stops a video analysis submitted with it, settable from this process
+
+        Pool workers are spawned, so the event is a proxy to one held by a
+        manager process rather than a plain multiprocessing.Event.
+        """
+        with self._manager_lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+            return self._manager.Event()
+
+    def submit_video(self, match_dir, video_path, sample_fps, cancel_event=None, max_seconds=None):
+        """Queue a video analysis; the Future yields (result, frame timeline)
+
+        With `max_seconds` it yields None unless the whole recording was
+        analyzed (see backend.windows).
+        """
+        return self._pool.submit(
+            _run_video_in_worker, match_dir, video_path, sample_fps, cancel_event, max_seconds
+        )
+
+    def submit_reanalysis(self, match_dir):
+        """Queue a replay of a windowed analysis from its cached features"""
+        return self._pool.submit(_reanalyze_in_worker, match_dir)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+
+def create_executor(analyzer_path=DEFAULT_ANALYZER, kind=None, workers=None):
+    """Build the executor selected by BGMI_ANALYSIS_EXECUTOR / BGMI_ANALYSIS_WORKERS
+
+    `kind` is "process" (default) or "inline".
+    """
+    kind = kind or os.environ.get("BGMI_ANALYSIS_EXECUTOR", "process")
+    if workers is None and os.environ.get("BGMI_ANALYSIS_WORKERS"):
+        workers = int(os.environ["BGMI_ANALYSIS_WORKERS"])
+
+    if kind == "inline":
+        return InlineExecutor(analyzer_path)
+    if kind == "process":
+        # Resolve the analyzer here too so a bad path fails in the caller,
+        # not separately in every worker
+        load_analyzer(analyzer_path)
+        executor = ProcessPoolAnalysisExecutor(workers, analyzer_path)
+        executor.warm()
+        return executor
+    raise ValueError(f"Unknown analysis executor: {kind}")
+
+
+def get_executor(analyzer_path=DEFAULT_ANALYZER):
+    """Return the process-wide executor for an analyzer, creating it on first use
+
+    Call this lazily (from a request or job), never at import time: spawned
+    workers re-import the main module, and they must not start pools of their own.
+    """
+    with _executors_lock:
+        executor = _executors.get(analyzer_path)
+        if executor is None:
+            executor = create_executor(analyzer_path)
+            _executors[analyzer_path] = executor
+        return executor
@@ -0,0 +1,237 @@
+"""Bounded background job queue for long-running match analysis"""
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Lower values run first
+PRIORITIES = {
+    "high": 0,
+    "normal": 5,
+    "low": 10,
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class JobCancelled(Exception):
+    """Raised by a running job that noticed it was cancelled"""
+
+
+class Job:
+    """A unit of work tracked by a JobQueue"""
+
+    def __init__(self, func, args, kwargs, priority, metadata=None):
+        self.id = uuid.uuid4().hex
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.metadata = metadata or {}
+        self.status = QUEUED
+        self.progress = 0.0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._listener = None
+
+    @property
+    def cancelled(self):
+        """True once cancellation was requested"""
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested; call between steps"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def set_progress(self, progress, partial=None):
+        """Record progress in the 0.0 - 1.0 range, optionally with partial results
+
+        `partial` is a dict merged into the job's partial results, e.g. the
+        metrics computed so far.
+        """
+        self.progress = max(0.0, min(1.0, progress))
+        if partial:
+            self.partial = {**(self.partial or {}), **partial}
+        self._notify("progress", partial)
+
+    def _notify(self, event, data=None):
+        if self._listener is not None:
+            try:
+                self._listener(self, event, data)
+            except Exception:
+                # Status reporting must never take down a job or its worker
+                pass
+
+    def to_dict(self):
+        """JSON-serializable job status"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": self.progress,
+            "partial": self.partial,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            **self.metadata,
+        }
+
+
+class JobQueue:
+    """Priority job queue served by a fixed pool of worker threads
+
+    `max_depth` caps the number of queued (not yet running) jobs so a burst of
+    submissions is rejected instead of piling up. Finished jobs are kept for
+    status lookups, up to `history` entries.
+
+    `listener(job, event, data)` is called when a job is queued, starts,
+    reports progress or finishes; `event` is the new status or "progress".
+    It runs on the thread making the change, so it must be quick.
+    """
+
+    def __init__(self, workers=2, max_depth=32, history=1000, listener=None):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.history = history
+        self.listener = listener
+        self._queue = queue.PriorityQueue()
+        self._jobs = {}
+        self._finished = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._threads = []
+
+    def submit(self, func, *args, priority="normal", metadata=None, **kwargs):
+        """Queue func(job, *args, **kwargs) and return its Job
+
+        Raises ValueError for an unknown priority and QueueFullError when the
+        queue is at its depth limit.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        job = Job(func, args, kwargs, priority, metadata)
+        job._listener = self.listener
+        with self._lock:
+            if self._pending >= self.max_depth:
+                raise QueueFullError(f"Job queue is full ({self.max_depth} pending jobs)")
+            self._pending += 1
+            self._jobs[job.id] = job
+            self._start_workers()
+        job._notify(QUEUED)
+        self._queue.put((PRIORITIES[priority], next(self._sequence), job))
+        return job
+
+    def get(self, job_id):
+        """Return a job by id, or None"""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a job; queued jobs never start, running jobs stop at their next check
+
+        Returns False if the job is unknown or already finished.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return False
+        job._cancel_event.set()
+        with self._lock:
+            if job.status != QUEUED:
+                return True
+            self._pending -= 1
+            self._finish(job, CANCELLED)
+        job._notify(CANCELLED)
+        return True
+
+    def depth(self):
+        """Number of jobs waiting for a worker"""
+        return self._pending
+
+    def stats(self):
+        """Queue counters for status endpoints"""
+        running = sum(1 for job in list(self._jobs.values()) if job.status == RUNNING)
+        return {
+            "workers": self.workers,
+            "queued": self._pending,
+            "running": running,
+            "max_depth": self.max_depth,
+        }
+
+    def shutdown(self):
+        """Stop the worker threads after their current job"""
+        for _ in self._threads:
+            self._queue.put((-1, next(self._sequence), None))
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _start_workers(self):
+        """Start the worker threads on first use"""
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        """Run queued jobs until shutdown"""
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+
+            with self._lock:
+                if job.status != QUEUED:
+                    # Cancelled while waiting in the queue
+                    continue
+                self._pending -= 1
+                job.status = RUNNING
+                job.started_at = time.time()
+            job._notify(RUNNING)
+
+            try:
+                result = job.func(job, *job.args, **job.kwargs)
+            except JobCancelled:
+                state = CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                state = FAILED
+            else:
+                job.result = result
+                job.progress = 1.0
+                state = COMPLETED
+
+            with self._lock:
+                self._finish(job, state)
+            job._notify(state)
+
+    def _finish(self, job, state):
+        """Mark a job finished and trim the finished-job history; caller holds the lock"""
+        job.status = state
+        job.finished_at = time.time()
+        job.func = job.args = job.kwargs = None
+        self._finished[job.id] = job
+        while len(self._finished) > self.history:
+            old_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(old_id, None)
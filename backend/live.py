@@ -0,0 +1,299 @@
+"""Live in-match analysis sessions
+
+A session follows a capture's frame ring, always jumping to the newest frame
+so it can never fall behind the capture rate. Each frame's HUD regions are
+sent to per-region detectors within a per-frame time budget; detectors that
+do not fit are skipped for that frame and run first on the next one. Their
+readings update exponentially weighted rolling metrics, and changed metrics
+are published as SSE deltas several times a second.
+
+Detectors map a region view to readings keyed by (category, metric), the
+same keys SimpleAnalyzer reports.
+
+A session with an idle timeout stops capturing once nobody has been
+subscribed to its events for that long, e.g. after its tab was closed, and
+its registry frees the slot.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+from backend.batch import CATEGORIES, METRIC_KEYS
+
+# Share of the frame interval detectors may use
+DEFAULT_BUDGET_FRACTION = 0.8
+# Seconds between published metric deltas
+DEFAULT_PUBLISH_INTERVAL = 0.2
+# Smallest change worth publishing
+DELTA_EPSILON = 0.005
+# Seconds between checks for remaining subscribers
+IDLE_CHECK_INTERVAL = 1.0
+
+
+class RollingMetrics:
+    """Exponentially weighted moving averages of the live metrics"""
+
+    def __init__(self, alpha=0.2):
+        self.alpha = alpha
+        self.values = {}
+        self._published = {}
+
+    def update(self, readings):
+        for key, value in readings.items():
+            previous = self.values.get(key)
+            self.values[key] = value if previous is None else previous + self.alpha * (value - previous)
+
+    def snapshot(self):
+        """All current values as a nested metrics dict"""
+        nested = {category: {} for category in CATEGORIES}
+        for (category, name), value in self.values.items():
+            nested[category][name] = round(value, 3)
+        return nested
+
+    def delta(self):
+        """Nested dict of the metrics that moved since the last delta, or None"""
+        changed = {}
+        for key, value in self.values.items():
+            if abs(value - self._published.get(key, -1.0)) >= DELTA_EPSILON:
+                self._published[key] = value
+                category, name = key
+                changed.setdefault(category, {})[name] = round(value, 3)
+        return changed or None
+
+
+class LiveSession:
+    """Analyze a running capture and publish rolling metrics to an EventBroker"""
+
+    def __init__(self, capture, detectors, broker, session_id=None,
+                 budget_fraction=DEFAULT_BUDGET_FRACTION, publish_interval=DEFAULT_PUBLISH_INTERVAL,
+                 idle_timeout=None):
+        self.id = session_id or uuid.uuid4().hex
+        self.topic = f"live:{self.id}"
+        self.capture = capture
+        self.detectors = dict(detectors)
+        self.broker = broker
+        self.budget = budget_fraction / capture.fps
+        self.publish_interval = publish_interval
+        self.idle_timeout = idle_timeout
+        self.metrics = RollingMetrics()
+        self.started_at = None
+        # Set when the session stopped itself for lack of subscribers
+        self.expired = False
+
+        self.frames = 0
+        self.skipped_frames = 0
+        self.over_budget = 0
+        self.latencies = deque(maxlen=1000)
+        # Held by the capture thread while it updates metrics and latencies,
+        # and by request threads while they copy them
+        self._lock = threading.Lock()
+        self._order = deque(self.detectors)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start capturing and analyzing"""
+        self.started_at = time.time()
+        self.capture.start()
+        self._thread = threading.Thread(target=self._run, name=f"live-{self.id[:8]}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the session, end its event streams and free the capture; returns final stats"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        final = self.stats()
+        self.broker.publish(self.topic, "stopped", final)
+        self.broker.close_topic(self.topic)
+        self.capture.close()
+        return final
+
+    def _analyze(self, frame, deadline):
+        views = self.capture.layout.crop(frame, self._order)
+        ran = 0
+        for region in self._order:
+            if time.perf_counter() >= deadline:
+                self.over_budget += 1
+                break
+            readings = self.detectors[region](views[region])
+            with self._lock:
+                self.metrics.update(readings)
+            ran += 1
+        # Detectors that missed this frame go first on the next one
+        self._order.rotate(-ran if ran < len(self._order) else 0)
+
+    def _idle_for(self, idle_since, now):
+        """Start of the current stretch without subscribers, None while someone is subscribed"""
+        if self.broker.subscriber_count(self.topic):
+            return None
+        return idle_since if idle_since is not None else now
+
+    def _run(self):
+        ring = self.capture.ring
+        poll = min(0.01, 0.25 / self.capture.fps)
+        last_seq = 0
+        last_publish = 0.0
+        pending_since = None
+        # A session nobody ever subscribes to counts as idle from the start
+        idle_since = last_idle_check = time.monotonic()
+        while not self._stop.is_set():
+            if self.idle_timeout is not None and time.monotonic() - last_idle_check >= IDLE_CHECK_INTERVAL:
+                last_idle_check = time.monotonic()
+                idle_since = self._idle_for(idle_since, last_idle_check)
+                if idle_since is not None and last_idle_check - idle_since >= self.idle_timeout:
+                    self.expired = True
+                    # Free the capture now; the registry stops the session when it next looks
+                    self.capture.stop()
+                    return
+
+            newest = ring.latest()
+            if newest is None or newest[0] == last_seq:
+                self._stop.wait(poll)
+                continue
+
+            seq, captured_at, frame = newest
+            if last_seq:
+                self.skipped_frames += seq - last_seq - 1
+            last_seq = seq
+            self._analyze(frame, time.perf_counter() + self.budget)
+            self.frames += 1
+            pending_since = pending_since or captured_at
+
+            now = time.time()
+            if now - last_publish >= self.publish_interval:
+                with self._lock:
+                    delta = self.metrics.delta()
+                if delta is not None:
+                    self.broker.publish(self.topic, "metrics", {
+                        "seq": seq,
+                        "captured_at": captured_at,
+                        "metrics": delta,
+                    })
+                    # Age of the oldest frame folded into this update
+                    with self._lock:
+                        self.latencies.append(time.time() - pending_since)
+                pending_since = None
+                last_publish = now
+
+    def stats(self):
+        """Session counters, including publish latency percentiles"""
+        with self._lock:
+            latencies = list(self.latencies)
+        latencies = np.array(latencies) if latencies else np.zeros(1)
+        return {
+            "session_id": self.id,
+            "running": self._thread is not None and not self.expired,
+            "expired": self.expired,
+            "started_at": self.started_at,
+            "frames": self.frames,
+            "skipped_frames": self.skipped_frames,
+            "over_budget": self.over_budget,
+            "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+            "latency_p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 1),
+            "capture": self.capture.stats(),
+        }
+
+    def snapshot(self):
+        """Full current state, sent to clients when they first connect"""
+        with self._lock:
+            metrics = self.metrics.snapshot()
+        return {**self.stats(), "metrics": metrics}
+
+
+# Which metrics each HUD region's demo detector reports
+DEMO_REGION_METRICS = {
+    "crosshair": ("accuracy", "recoil_control", "headshot_percentage", "reaction_time"),
+    "kill_feed": ("engagement_choices", "team_coordination"),
+    "minimap": ("zone_awareness", "rotation_timing", "movement_efficiency", "tactical_planning"),
+    "health_bar": ("cover_usage",),
+    "ammo_counter": ("item_management",),
+}
+
+
+def demo_detectors(seed=None):
+    """Simulated detectors for the demo: each region's metrics drift randomly
+
+    Like SimpleAnalyzer they stand in for the real vision models and keep
+    the live pipeline exercisable end to end.
+    """
+    rng = np.random.default_rng(seed)
+    keys = {name: (category, name) for category, name in METRIC_KEYS}
+    levels = {key: rng.uniform(0.5, 0.85) for key in METRIC_KEYS}
+
+    def detector_for(names):
+        region_keys = [keys[name] for name in names]
+
+        def detect(view):
+            readings = {}
+            for key, step in zip(region_keys, rng.normal(0, 0.03, len(region_keys))):
+                levels[key] = float(np.clip(levels[key] + step, 0.2, 0.98))
+                readings[key] = levels[key]
+            return readings
+        return detect
+
+    return {region: detector_for(names) for region, names in DEMO_REGION_METRICS.items()}
+
+
+def session_options(data):
+    """(source, fps, monitor) of a live session request body
+
+    Raises ValueError when a field is not a valid integer; bool is an int
+    subclass, but true is not a frame rate.
+    """
+    fps = data.get("fps", 10)
+    if not isinstance(fps, int) or isinstance(fps, bool) or not 1 <= fps <= 60:
+        raise ValueError("fps must be an integer between 1 and 60")
+    monitor = data.get("monitor", 1)
+    if not isinstance(monitor, int) or isinstance(monitor, bool) or monitor < 0:
+        raise ValueError("monitor must be a non-negative integer")
+    return data.get("source", "screen"), fps, monitor
+
+
+class LiveSessionRegistry:
+    """Live sessions of this process, by id
+
+    Sessions that expired for lack of subscribers are stopped and dropped
+    whenever the registry is used, so they never hold a slot.
+    """
+
+    def __init__(self, max_sessions=4):
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _reap(self):
+        """Stop and drop expired sessions"""
+        with self._lock:
+            expired = [session for session in self._sessions.values() if session.expired]
+            for session in expired:
+                del self._sessions[session.id]
+        for session in expired:
+            session.stop()
+
+    def add(self, session):
+        self._reap()
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError(f"At most {self.max_sessions} live sessions can run at once")
+            self._sessions[session.id] = session
+        return session.start()
+
+    def get(self, session_id):
+        self._reap()
+        return self._sessions.get(session_id)
+
+    def stop(self, session_id):
+        """Stop a session; returns its final stats, or None if it does not exist"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        return session.stop() if session is not None else None
+
+    def __len__(self):
+        self._reap()
+        return len(self._sessions)
@@ -0,0 +1,362 @@
+"""ASGI (FastAPI) variant of the dashboard server
+
+Serves the same routes as dashboard_server.py from the same match store,
+plus the Server-Sent Events streams of app.py: analysis progress per match
+and live sessions. Request handlers never block the event loop: SQLite
+queries, file reads and analysis run on the thread pool, and idle
+connections, SSE subscribers included, cost no thread.
+
+Run with `uvicorn backend.main:app` from the repository root, or
+`python main.py` from inside backend/ as start.py does.
+"""
+import json
+import os
+import sys
+import time
+import uuid
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+if __name__ == "__main__":
+    # start.py launches this file from inside backend/; data paths are relative to the repo root
+    os.chdir(REPO_ROOT)
+
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+from backend.artifacts import available_encodings
+from backend.capture import ScreenCapture, SyntheticCapture
+from backend.events import EventBroker, format_event, job_listener, match_topic, parse_last_event_id
+from backend.jobs import JobQueue, QueueFullError
+from backend.live import LiveSession, LiveSessionRegistry, demo_detectors, session_options
+from backend.pros import k_from_args
+from backend.responses import REVALIDATE
+from backend.store import percentile_query_from_args, query_from_args
+from dashboard_server import SimpleAnalyzer, match_store, pro_index
+
+app = FastAPI(title="BGMI Esports Coach")
+
+# SSE broker, background analyses and live sessions of this server process
+EVENTS = EventBroker()
+JOBS = JobQueue(
+    workers=int(os.environ.get("BGMI_JOB_WORKERS", 2)),
+    max_depth=int(os.environ.get("BGMI_JOB_QUEUE_DEPTH", 32)),
+    listener=job_listener(EVENTS)
+)
+LIVE_SESSIONS = LiveSessionRegistry(max_sessions=int(os.environ.get("BGMI_LIVE_SESSIONS", 4)))
+# Seconds a live session keeps capturing with no client on its events stream
+LIVE_IDLE_TIMEOUT = int(os.environ.get("BGMI_LIVE_IDLE_SECONDS", 60))
+
+
+def _not_modified(request, etag):
+    """True when the request's If-None-Match already names this ETag"""
+    return parse_etags(request.headers.get("if-none-match")).contains_weak(etag)
+
+
+def _negotiate_encoding(request):
+    """Best precompressed encoding the client accepts, falling back to identity"""
+    accepted = parse_accept_header(request.headers.get("accept-encoding"))
+    return accepted.best_match(available_encodings()) or "identity"
+
+
+def _conditional_response(request, body, etag, media_type="application/json", encoding=None):
+    """Serve `body` with a strong ETag, or an empty 304 when the client has it"""
+    headers = {"ETag": quote_etag(etag), "Cache-Control": REVALIDATE}
+    if encoding is not None:
+        headers["Vary"] = "Accept-Encoding"
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding and encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=media_type, headers=headers)
+
+
+async def _json_body(request):
+    """The request's JSON object, {} for an empty body; raises ValueError when malformed"""
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON body: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError("JSON body must be an object")
+    return data
+
+
+def _sse_response(subscription):
+    """Stream a backend.events subscription as text/event-stream
+
+    The stream awaits `astream()`, so a waiting client holds no thread.
+    `subscription` may also be a single (event, data) pair, sent as a
+    complete one-event stream.
+    """
+    # Stop reverse proxies (nginx, Render, Railway) from buffering the stream
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if isinstance(subscription, tuple):
+        return Response(format_event(0, *subscription), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(subscription.astream(), media_type="text/event-stream", headers=headers)
+
+
+def _simulate(game_mode, map_name, match_id, player_id=None):
+    """Run a simulated analysis and index it (CPU and disk work, off the event loop)"""
+    analysis = SimpleAnalyzer(match_id, game_mode, map_name).analyze()
+    match_store.save({
+        "id": match_id,
+        "player_id": player_id,
+        "game_mode": game_mode,
+        "map_name": map_name,
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "status": "completed"
+    }, analysis)
+    return analysis
+
+
+def _run_simulation(job, game_mode, map_name, match_id, player_id=None):
+    """_simulate as a background job, whose progress is published on the match's topic"""
+    job.check_cancelled()
+    job.set_progress(0.1)
+    analysis = _simulate(game_mode, map_name, match_id, player_id)
+    job.set_progress(0.9, {"metrics": analysis["metrics"]})
+    return {"match_id": match_id}
+
+
+def _open_capture(source, fps, monitor):
+    if source == "synthetic":
+        return SyntheticCapture(fps=fps)
+    return ScreenCapture(fps=fps, monitor=monitor)
+
+
+@app.get("/")
+async def index():
+    return FileResponse(os.path.join(REPO_ROOT, "static_demo.html"))
+
+
+@app.get("/status")
+async def status():
+    count = await run_in_threadpool(match_store.count)
+    return {
+        "status": "ok",
+        "active_matches": count,
+        "analysis_cache": match_store.cache.stats()
+    }
+
+
+@app.post("/api/simulate-match")
+async def simulate_match(request: Request):
+    """Simulate a match analysis for demo purposes
+
+    With `"wait": false` the analysis is queued instead and the response
+    points at the match's events stream.
+    """
+    try:
+        data = await _json_body(request)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    game_mode = data.get("game_mode", "Battle Royale")
+    map_name = data.get("map_name", "Erangel")
+
+    match_id = f"demo_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+    if data.get("wait", True):
+        await run_in_threadpool(_simulate, game_mode, map_name, match_id, data.get("player_id"))
+        return {
+            "match_id": match_id,
+            "status": "completed",
+            "message": "Match analysis completed"
+        }
+
+    try:
+        job = JOBS.submit(
+            _run_simulation,
+            game_mode,
+            map_name,
+            match_id,
+            data.get("player_id"),
+            priority=data.get("priority", "normal"),
+            metadata={"match_id": match_id}
+        )
+    except QueueFullError as e:
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return JSONResponse({
+        "match_id": match_id,
+        "job_id": job.id,
+        "status": job.status,
+        "events_url": f"/api/matches/{match_id}/events"
+    }, status_code=202)
+
+
+@app.get("/api/matches/{match_id}/events")
+async def match_events(match_id: str, request: Request):
+    """Server-Sent Events stream of a match's analysis progress and final result"""
+    last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    # Replay the topic's short history so late subscribers catch up on progress
+    subscription = EVENTS.subscribe(match_topic(match_id), last_event_id or 0, create=False)
+    if subscription is not None:
+        return _sse_response(subscription)
+
+    # No analysis in progress: it has already finished, or the match does not exist
+    if await run_in_threadpool(match_store.get, match_id) is None:
+        return JSONResponse({"error": "Match not found"}, status_code=404)
+    return _sse_response(("result", {"match_id": match_id}))
+
+
+@app.post("/api/live/sessions")
+async def start_live_session(request: Request):
+    """Start analyzing the running game live; metrics stream from the events URL"""
+    try:
+        source, fps, monitor = session_options(await _json_body(request))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    try:
+        capture = await run_in_threadpool(_open_capture, source, fps, monitor)
+    except Exception as e:
+        return JSONResponse({"error": f"Cannot start capture: {e}"}, status_code=400)
+
+    session = LiveSession(capture, demo_detectors(), EVENTS, idle_timeout=LIVE_IDLE_TIMEOUT)
+    try:
+        await run_in_threadpool(LIVE_SESSIONS.add, session)
+    except RuntimeError as e:
+        capture.close()
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "30"})
+    return JSONResponse({
+        "success": True,
+        "session_id": session.id,
+        "events_url": f"/api/live/sessions/{session.id}/events"
+    }, status_code=201)
+
+
+@app.get("/api/live/sessions/{session_id}")
+async def get_live_session(session_id: str):
+    """Current metrics and counters of a live session"""
+    session = await run_in_threadpool(LIVE_SESSIONS.get, session_id)
+    if session is None:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+    return session.snapshot()
+
+
+@app.get("/api/live/sessions/{session_id}/events")
+async def live_session_events(session_id: str, request: Request):
+    """Server-Sent Events stream of a live session's metric deltas"""
+    session = await run_in_threadpool(LIVE_SESSIONS.get, session_id)
+    if session is None:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+    last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    # New clients start from a full snapshot, then receive deltas
+    initial = ("snapshot", session.snapshot()) if last_event_id is None else None
+    return _sse_response(EVENTS.subscribe(session.topic, last_event_id, initial))
+
+
+@app.post("/api/live/sessions/{session_id}/stop")
+async def stop_live_session(session_id: str):
+    """Stop a live session"""
+    stats = await run_in_threadpool(LIVE_SESSIONS.stop, session_id)
+    if stats is None:
+        return JSONResponse({"error": "Session not found"}, status_code=404)
+    return {"success": True, **stats}
+
+
+@app.get("/api/analysis/{match_id}")
+async def get_analysis(match_id: str, request: Request):
+    """Get analysis results for a match"""
+    analysis = await run_in_threadpool(match_store.get_analysis_body, match_id, _negotiate_encoding(request))
+    if analysis is None:
+        return JSONResponse({"error": "Analysis not found", "match_id": match_id}, status_code=404)
+    body, etag, encoding = analysis
+    return _conditional_response(request, body, etag, encoding=encoding)
+
+
+@app.get("/api/analysis/{match_id}/pros")
+async def compare_with_pros(match_id: str, request: Request):
+    """The pro players whose matches are most similar to this one, with per-metric deltas"""
+    if pro_index is None:
+        return JSONResponse({"error": "Pro reference index not built, see backend/pros.py"}, status_code=503)
+    try:
+        k = k_from_args(request.query_params)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    vector = await run_in_threadpool(match_store.get_metric_vector, match_id)
+    if vector is None:
+        return JSONResponse({"error": "Analysis not found", "match_id": match_id}, status_code=404)
+    return {"match_id": match_id, "pros": await run_in_threadpool(pro_index.compare, vector, k)}
+
+
+@app.get("/api/players/{player_id}/trends")
+async def get_player_trends(player_id: str, request: Request):
+    """Rolling metric trends of a player across their matches"""
+    trends = await run_in_threadpool(match_store.get_player_trends, player_id)
+    if trends is None:
+        return JSONResponse({"error": "Player not found", "player_id": player_id}, status_code=404)
+    body, etag = trends
+    return _conditional_response(request, body, etag)
+
+
+@app.get("/api/percentiles")
+async def get_metric_percentiles(request: Request):
+    """Where a metric value ranks among all analysed matches, optionally of one map and mode"""
+    try:
+        query = percentile_query_from_args(request.query_params)
+        return await run_in_threadpool(lambda: match_store.metric_percentiles(**query))
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+@app.post("/api/matches/clear")
+async def clear_matches():
+    """Clear all match data"""
+    await run_in_threadpool(match_store.clear)
+    return {"status": "success", "message": "All matches cleared"}
+
+
+@app.get("/api/matches")
+async def list_matches(request: Request):
+    """List matches one page at a time, with optional filters and sorting"""
+    # Invalid parameters are a 400 even when the client's copy looks current
+    try:
+        query = query_from_args(request.query_params)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    etag = await run_in_threadpool(match_store.version_tag)
+    if _not_modified(request, etag):
+        return _conditional_response(request, b"", etag)
+
+    matches, next_cursor = await run_in_threadpool(lambda: match_store.query(**query))
+    body = json.dumps({"matches": matches, "next_cursor": next_cursor})
+    return _conditional_response(request, body, etag)
+
+
+@app.get("/api/matches.ndjson")
+async def stream_matches(request: Request):
+    """Stream every matching match as newline-delimited JSON"""
+    try:
+        query = query_from_args(request.query_params)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    etag = await run_in_threadpool(match_store.version_tag)
+    if _not_modified(request, etag):
+        return _conditional_response(request, b"", etag, media_type="application/x-ndjson")
+
+    rows = match_store.iter_record_json(**query)
+    # A sync iterator: Starlette pulls each row on the thread pool
+    records = (record + "\n" for record in rows)
+    return StreamingResponse(
+        records,
+        media_type="application/x-ndjson",
+        headers={"ETag": quote_etag(etag), "Cache-Control": REVALIDATE}
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.environ.get("PORT", 8000))
+    print(f"Starting BGMI Esports Coach ASGI server on port {port}...")
+    uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,74 @@
+"""HTML pages compiled once and served from pre-rendered bytes"""
+import os
+import threading
+
+from backend.responses import conditional_response
+from backend.store import content_etag
+
+
+class RenderedPage:
+    """A Jinja template compiled at startup whose output is cached as bytes
+
+    The page is rendered again only when the caller's `key` changes, so a
+    static page renders exactly once and a data-driven page renders once per
+    version of its data.
+    """
+
+    def __init__(self, app, source):
+        self.template = app.jinja_env.from_string(source)
+        # (key, html bytes, etag) of the last render, swapped as one object
+        self._rendered = None
+        self._lock = threading.Lock()
+
+    def render(self, key=None, context=None):
+        """Return (html bytes, etag) for this version of the page
+
+        `context` may be a dict or a callable returning one; a callable is only
+        invoked when the page actually has to be rendered.
+        """
+        rendered = self._rendered
+        if rendered is None or rendered[0] != key:
+            with self._lock:
+                rendered = self._rendered
+                if rendered is None or rendered[0] != key:
+                    values = context() if callable(context) else (context or {})
+                    text = self.template.render(**values)
+                    rendered = (key, text.encode("utf-8"), content_etag(text))
+                    self._rendered = rendered
+        return rendered[1], rendered[2]
+
+    def response(self, key=None, context=None):
+        """Serve the page with its ETag, or a 304 when the client's copy is current"""
+        body, etag = self.render(key, context)
+        return conditional_response(body, etag, mimetype="text/html")
+
+
+class StaticPage:
+    """An HTML file served with its CDN links pointed at vendored assets
+
+    The rewritten bytes are cached until the file changes on disk.
+    """
+
+    def __init__(self, path, assets):
+        self.path = path
+        self.assets = assets
+        # (mtime, html bytes, etag) of the last read
+        self._rendered = None
+        self._lock = threading.Lock()
+
+    def render(self):
+        """Return (html bytes, etag) for the current version of the file"""
+        version = os.stat(self.path).st_mtime_ns
+        rendered = self._rendered
+        if rendered is None or rendered[0] != version:
+            with self._lock:
+                with open(self.path, encoding="utf-8") as f:
+                    text = self.assets.localize(f.read())
+                rendered = (version, text.encode("utf-8"), content_etag(text))
+                self._rendered = rendered
+        return rendered[1], rendered[2]
+
+    def response(self):
+        """Serve the page with its ETag, or a 304 when the client's copy is current"""
+        body, etag = self.render()
+        return conditional_response(body, etag, mimetype="text/html")
@@ -0,0 +1,281 @@
+"""Pre-forking production server for the WSGI apps
+
+The master process imports the app once, binds the listening socket and
+forks N worker processes, so every worker starts with the app, its
+templates and its caches already in (copy-on-write) memory. Each worker
+runs a threaded server on the shared socket; the kernel hands every new
+connection to whichever worker accepts it first, so a slow request only
+ever ties up one thread of one worker.
+
+Workers are recycled: after `max_requests` requests (plus a random jitter,
+so they do not all restart together) a worker stops accepting, finishes
+its in-flight requests and exits, and the master forks a fresh one.
+
+Signals to the master:
+
+    SIGTERM, SIGINT   graceful shutdown: workers drain, then exit
+    SIGHUP            rolling restart: every worker is replaced, one at a time
+
+Apps are referenced by import path ("module:attribute"), e.g.
+
+    python -m backend.prefork dashboard_server:app --workers 4
+
+State shared between requests has to live outside the worker (the SQLite
+match store, files on disk); anything kept in process memory is per worker.
+"""
+import argparse
+import importlib
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+DEFAULT_MAX_REQUESTS = 5000
+DEFAULT_GRACEFUL_TIMEOUT = 30
+
+# Seconds between the master's checks on its workers
+_POLL_INTERVAL = 0.5
+
+
+def default_workers():
+    """WEB_CONCURRENCY when set, else one worker per CPU (at least two)"""
+    return int(os.environ.get("WEB_CONCURRENCY") or max(2, os.cpu_count() or 1))
+
+
+def load_app(path):
+    """Import a WSGI app from "module:attribute" """
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute or "app")
+
+
+class _Worker:
+    """One forked worker: a threaded server on the inherited socket"""
+
+    def __init__(self, app, listener, max_requests, graceful_timeout):
+        self.app = app
+        self.listener = listener
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.requests = 0
+        self.in_flight = 0
+        self.stopping = False
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def _track_connections(self, server):
+        """Count every accepted connection as in flight until its thread is done
+
+        Counting at accept time, rather than when the app is called, covers
+        connections whose request is still being read when the worker stops,
+        and stops the accept loop as soon as the request budget is spent.
+        werkzeug closes each connection after one response, so a connection
+        is a request and a finished thread means a finished request, streamed
+        bodies included.
+        """
+        process_request = server.process_request
+        process_request_thread = server.process_request_thread
+
+        def accepted(request, client_address):
+            with self._lock:
+                self.in_flight += 1
+                self.requests += 1
+                if self.max_requests and self.requests >= self.max_requests:
+                    self.stopping = True
+            try:
+                process_request(request, client_address)
+            except BaseException:
+                finished()
+                raise
+
+        def finished():
+            with self._lock:
+                self.in_flight -= 1
+                self._idle.notify_all()
+
+        def serve(request, client_address):
+            try:
+                process_request_thread(request, client_address)
+            finally:
+                finished()
+
+        server.process_request = accepted
+        server.process_request_thread = serve
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        parent = os.getppid()
+
+        host, port = self.listener.getsockname()[:2]
+        server = make_server(host, port, self.app, threaded=True, fd=self.listener.fileno())
+        server.timeout = _POLL_INTERVAL
+        self._track_connections(server)
+        # Stop when asked, when the request budget is spent or when the master is gone
+        while not self.stopping and os.getppid() == parent:
+            server.handle_request()
+        server.socket.close()
+
+        deadline = time.monotonic() + self.graceful_timeout
+        with self._idle:
+            self._idle.wait_for(lambda: self.in_flight == 0, max(0.0, deadline - time.monotonic()))
+
+
+class PreforkServer:
+    """Fork `workers` copies of a preloaded WSGI app onto one listening socket"""
+
+    def __init__(self, app, host="0.0.0.0", port=5000, workers=None,
+                 max_requests=DEFAULT_MAX_REQUESTS, max_requests_jitter=None,
+                 graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers or default_workers()
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests // 10 if max_requests_jitter is None else max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.listener = None
+        # pid -> fork time of each live worker
+        self._children = {}
+        self._shutdown = False
+        self._reload = False
+
+    def _spawn(self):
+        budget = self.max_requests
+        if budget and self.max_requests_jitter:
+            budget += random.randint(0, self.max_requests_jitter)
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                random.seed()
+                _Worker(self.app, self.listener, budget, self.graceful_timeout).run()
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                status = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        self._children[pid] = time.monotonic()
+        return pid
+
+    def _reap(self):
+        """Collect exited workers; returns how many there were"""
+        exited = 0
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                break
+            if pid == 0:
+                break
+            if self._children.pop(pid, None) is not None:
+                exited += 1
+                if os.waitstatus_to_exitcode(status) != 0:
+                    print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}", flush=True)
+        return exited
+
+    def _wait_for(self, pids, timeout):
+        """Wait until none of `pids` is alive; returns those still running"""
+        deadline = time.monotonic() + timeout
+        pending = set(pids)
+        while pending and time.monotonic() < deadline:
+            self._reap()
+            pending &= set(self._children)
+            if pending:
+                time.sleep(0.05)
+        return pending
+
+    def _terminate(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _rolling_restart(self):
+        """Replace every worker, forking each replacement before retiring an old one"""
+        for pid in list(self._children):
+            self._spawn()
+            self._terminate([pid])
+            self._terminate(self._wait_for([pid], self.graceful_timeout))
+
+    def _on_signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self._reload = True
+        else:
+            self._shutdown = True
+
+    def bind(self):
+        """Open the shared listening socket (port 0 picks a free port)"""
+        self.listener = socket.create_server((self.host, self.port), backlog=2048)
+        self.listener.set_inheritable(True)
+        self.port = self.listener.getsockname()[1]
+        return self.listener
+
+    def serve_forever(self):
+        """Run the master loop until SIGTERM or SIGINT"""
+        if self.listener is None:
+            self.bind()
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self._on_signal)
+
+        print(f"Serving on {self.host}:{self.port} with {self.workers} workers "
+              f"(master pid {os.getpid()})", flush=True)
+        try:
+            while not self._shutdown:
+                self._reap()
+                if self._reload:
+                    self._reload = False
+                    self._rolling_restart()
+                while len(self._children) < self.workers and not self._shutdown:
+                    self._spawn()
+                time.sleep(_POLL_INTERVAL)
+        finally:
+            workers = list(self._children)
+            self._terminate(workers)
+            stuck = self._wait_for(workers, self.graceful_timeout + 1)
+            for pid in stuck:
+                os.kill(pid, signal.SIGKILL)
+            self._wait_for(stuck, 5)
+            self.listener.close()
+
+
+def serve(app, host="0.0.0.0", port=5000, workers=None, **options):
+    """Serve a preloaded app with pre-forked workers until terminated"""
+    PreforkServer(app, host, port, workers, **options).serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a WSGI app with pre-forked workers")
+    parser.add_argument("app", help='import path of the app, e.g. "dashboard_server:app"')
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: $WEB_CONCURRENCY or one per CPU)")
+    parser.add_argument("--max-requests", type=int,
+                        default=int(os.environ.get("MAX_REQUESTS", DEFAULT_MAX_REQUESTS)),
+                        help="recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--graceful-timeout", type=float, default=DEFAULT_GRACEFUL_TIMEOUT,
+                        help="seconds a stopping worker may spend finishing requests")
+    args = parser.parse_args(argv)
+
+    # Import before forking so every worker shares the loaded app
+    app = load_app(args.app)
+    serve(app, args.host, args.port, args.workers,
+          max_requests=args.max_requests, graceful_timeout=args.graceful_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Nearest pro-player matches for a match's metric profile
+
+Every reference match is a float32 vector of the 12 metrics in METRIC_KEYS
+order. The index is built offline and saved as .npy files, which are
+memory-mapped at startup, so a server holding an index of a million
+matches (48 MB of vectors) shares the pages with every other worker and
+only touches the parts its queries read.
+
+Search is an inverted file (IVF): the build clusters the vectors with
+k-means and stores them grouped by cluster. A query compares against the
+cluster centroids, then only against the vectors of the `nprobe` nearest
+clusters. Distances are Euclidean after dividing each metric by its spread
+in the reference set, so no single metric dominates. The scaled vectors and
+their squared norms are stored next to the raw ones, so scoring the
+candidates is one small matrix-vector product.
+
+    python -m backend.pros build reference.csv        # player,team,<12 metric columns>
+    python -m backend.pros simulate 1000000           # synthetic reference set for demos
+"""
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+from backend.batch import METRIC_COUNT, METRIC_KEYS
+from backend.sketches import metric_column_of
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEX_DIR = os.environ.get("PRO_INDEX_DIR", os.path.join(REPO_ROOT, "data", "pro_index"))
+
+DEFAULT_K = 5
+MAX_K = 50
+DEFAULT_NPROBE = 16
+# Vectors per cluster aimed for when the number of clusters is not given
+LIST_SIZE = 1000
+KMEANS_ITERATIONS = 10
+# Vectors k-means is trained on, per cluster
+TRAINING_PER_LIST = 64
+_CHUNK = 16384
+
+# Candidates ranked per query, per neighbour asked for, before falling back to all of them
+_SHORTLIST_FACTOR = 16
+
+_ARRAYS = ("vectors", "scaled", "norms", "players", "offsets", "centroids", "scale")
+_PROFILES_FILE = "profiles.json"
+
+
+def _nearest(vectors, centroids):
+    """Index of the nearest centroid of each vector, computed in chunks"""
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    nearest = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _CHUNK):
+        chunk = vectors[start:start + _CHUNK]
+        # |x - c|^2 without the |x|^2 term, which does not change the argmin
+        nearest[start:start + _CHUNK] = (centroid_norms - 2 * chunk @ centroids.T).argmin(axis=1)
+    return nearest
+
+
+def _kmeans(vectors, lists, rng):
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = _nearest(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=lists)
+        # An empty cluster keeps its centroid
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def build_index(vectors, players, profiles, index_dir=INDEX_DIR, lists=None, rng=None):
+    """Cluster reference match vectors and write the index files
+
+    `vectors` is (N x 12) in METRIC_KEYS order, `players[i]` the position
+    in `profiles` (dicts with at least a "name") of the pro who played
+    match i. Returns the number of clusters.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    players = np.asarray(players, dtype=np.int32)
+    if vectors.ndim != 2 or vectors.shape[1] != METRIC_COUNT:
+        raise ValueError(f"Expected an (N x {METRIC_COUNT}) metric array, got {vectors.shape}")
+    if len(players) != len(vectors):
+        raise ValueError("Expected one player per vector")
+
+    # A metric that does not vary (std at float32 noise level) is left unscaled
+    spread = vectors.std(axis=0, dtype=np.float64)
+    scale = np.where(spread > 1e-6, 1 / np.maximum(spread, 1e-6), 1).astype(np.float32)
+    scaled = vectors * scale
+
+    lists = lists or max(1, len(vectors) // LIST_SIZE)
+    lists = min(lists, len(vectors))
+    training = scaled
+    if len(scaled) > lists * TRAINING_PER_LIST:
+        training = scaled[rng.choice(len(scaled), lists * TRAINING_PER_LIST, replace=False)]
+    centroids = _kmeans(training, lists, rng)
+
+    assignment = _nearest(scaled, centroids)
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.zeros(lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignment, minlength=lists), out=offsets[1:])
+
+    os.makedirs(index_dir, exist_ok=True)
+    arrays = {
+        "vectors": vectors[order],
+        "scaled": scaled[order],
+        "norms": (scaled[order] ** 2).sum(axis=1),
+        "players": players[order],
+        "offsets": offsets,
+        "centroids": centroids.astype(np.float32),
+        "scale": scale,
+    }
+    for name, array in arrays.items():
+        tmp_path = os.path.join(index_dir, f"{name}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(index_dir, f"{name}.npy"))
+    with open(os.path.join(index_dir, _PROFILES_FILE), "w") as f:
+        json.dump(profiles, f)
+    return lists
+
+
+class ProIndex:
+    """Memory-mapped IVF index of pro-player reference matches"""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+        self.vectors = arrays["vectors"]
+        self.scaled = arrays["scaled"]
+        self.norms = arrays["norms"]
+        self.players = arrays["players"]
+        self.offsets = np.asarray(arrays["offsets"])
+        # Small enough to keep in memory; every query reads all of them
+        self.scale = np.asarray(arrays["scale"])
+        self.centroids = np.asarray(arrays["centroids"])
+        with open(os.path.join(index_dir, _PROFILES_FILE)) as f:
+            self.profiles = json.load(f)
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR):
+        """The index in `index_dir`, or None when it has not been built"""
+        if not os.path.exists(os.path.join(index_dir, _PROFILES_FILE)):
+            return None
+        return cls(index_dir)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, vector, k=DEFAULT_K, nprobe=DEFAULT_NPROBE):
+        """(rows, distances) of the nearest reference matches, at most one per pro, nearest first"""
+        query = np.asarray(vector, dtype=np.float32) * self.scale
+        probe = np.argsort(((self.centroids - query) ** 2).sum(axis=1))[:nprobe]
+        # Probed clusters are contiguous slices of the mapped files
+        slices = [slice(self.offsets[c], self.offsets[c + 1]) for c in probe]
+        rows = np.concatenate([np.arange(s.start, s.stop) for s in slices])
+        if not len(rows):
+            return rows, np.empty(0, dtype=np.float32)
+        candidates = np.concatenate([self.scaled[s] for s in slices])
+        norms = np.concatenate([self.norms[s] for s in slices])
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2
+        distances = np.maximum(norms - 2 * (candidates @ query) + query @ query, 0)
+
+        # Most of the nearest matches belong to distinct pros, so only the
+        # closest few are ranked; all candidates are if that is not enough
+        players = np.concatenate([self.players[s] for s in slices])
+        for shortlist in (k * _SHORTLIST_FACTOR, len(distances)):
+            if shortlist < len(distances):
+                order = np.argpartition(distances, shortlist)[:shortlist]
+            else:
+                order = np.arange(len(distances))
+            order = order[np.argsort(distances[order])]
+            _, first = np.unique(players[order], return_index=True)
+            if len(first) >= k:
+                break
+        best = order[np.sort(first)[:k]]
+        return rows[best], np.sqrt(distances[best])
+
+    def compare(self, vector, k=DEFAULT_K, nprobe=DEFAULT_NPROBE):
+        """The k most similar pros, with their match's metrics and the deltas (yours - theirs)"""
+        vector = np.asarray(vector, dtype=np.float32)
+        rows, distances = self.search(vector, k, nprobe)
+        pros = []
+        for row, distance in zip(rows, distances):
+            reference = self.vectors[row]
+            metrics, deltas = {}, {}
+            for column, (category, name) in enumerate(METRIC_KEYS):
+                metrics.setdefault(category, {})[name] = round(float(reference[column]), 4)
+                deltas.setdefault(category, {})[name] = round(float(vector[column] - reference[column]), 4)
+            pros.append({
+                **self.profiles[self.players[row]],
+                "distance": round(float(distance), 4),
+                "metrics": metrics,
+                "deltas": deltas,
+            })
+        return pros
+
+
+def k_from_args(args):
+    """Number of pros asked for by the `k` query parameter; raises ValueError"""
+    try:
+        k = int(args.get("k", DEFAULT_K))
+    except ValueError:
+        raise ValueError("k must be an integer")
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    return k
+
+
+def read_reference_csv(path):
+    """(vectors, players, profiles) from a CSV with player, optional team, and one column per metric"""
+    vectors, players, profiles, positions = [], [], [], {}
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = {metric_column_of(field): field for field in reader.fieldnames if field not in ("player", "team")}
+        if len(columns) != METRIC_COUNT:
+            raise ValueError(f"Expected a column for each of the {METRIC_COUNT} metrics")
+        for line in reader:
+            key = (line["player"], line.get("team") or None)
+            if key not in positions:
+                positions[key] = len(profiles)
+                profiles.append({"name": key[0], "team": key[1]})
+            players.append(positions[key])
+            vectors.append([float(line[columns[column]]) for column in range(METRIC_COUNT)])
+    return np.array(vectors, dtype=np.float32), np.array(players, dtype=np.int32), profiles
+
+
+def simulate_reference(count, pros=500, rng=None):
+    """Synthetic reference set: each pro's matches scatter around their own strong profile"""
+    rng = rng if rng is not None else np.random.default_rng()
+    styles = rng.uniform(0.55, 0.95, size=(pros, METRIC_COUNT))
+    players = rng.integers(0, pros, size=count, dtype=np.int32)
+    vectors = np.clip(styles[players] + rng.normal(0, 0.05, size=(count, METRIC_COUNT)), 0, 1)
+    profiles = [{"name": f"Pro {i + 1}", "team": f"Team {i // 4 + 1}"} for i in range(pros)]
+    return np.round(vectors, 2).astype(np.float32), players, profiles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the pro-player reference index")
+    parser.add_argument("--out", default=INDEX_DIR, help="index directory")
+    parser.add_argument("--lists", type=int, help=f"clusters (default: one per {LIST_SIZE} matches)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="index a reference CSV").add_argument("csv")
+    simulate = commands.add_parser("simulate", help="index a synthetic reference set")
+    simulate.add_argument("count", type=int)
+    simulate.add_argument("--pros", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        reference = read_reference_csv(args.csv)
+    else:
+        reference = simulate_reference(args.count, args.pros)
+    lists = build_index(*reference, index_dir=args.out, lists=args.lists)
+    print(f"Indexed {len(reference[0])} matches of {len(reference[2])} pros in {lists} clusters into {args.out}")
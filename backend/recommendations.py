@@ -0,0 +1,257 @@
+"""Declarative recommendation rules, compiled once at import
+
+Each rule fires when its metric drops below `below`. Rules with `high_below`
+escalate to "high" priority when the metric is also below that value.
+`general` holds one recommendation per overall-score band: the first band
+whose `below` is greater than the overall score wins, `None` means "otherwise".
+
+Recommendation dicts are interned: every match that triggers the same rule
+shares the same dict object, so callers must treat them as read-only.
+"""
+import numpy as np
+
+from backend.batch import METRIC_KEYS, overall_score
+
+# Rules used by dashboard_server.py and ngrok_server.py
+DEMO_RULE_TABLE = {
+    "rules": [
+        {
+            "metric": ("aim", "accuracy"),
+            "below": 0.7,
+            "priority": "high",
+            "title": "Improve Aim Accuracy",
+            "description": "Practice target tracking in training mode for 15 minutes daily.",
+        },
+        {
+            "metric": ("aim", "recoil_control"),
+            "below": 0.6,
+            "priority": "medium",
+            "title": "Enhance Recoil Control",
+            "description": "Practice spray patterns with AR and SMG weapons on static targets.",
+        },
+        {
+            "metric": ("positioning", "cover_usage"),
+            "below": 0.6,
+            "priority": "high",
+            "title": "Utilize Cover Better",
+            "description": "Always prioritize moving between cover points rather than open areas.",
+        },
+        {
+            "metric": ("positioning", "zone_awareness"),
+            "below": 0.7,
+            "priority": "medium",
+            "title": "Improve Zone Management",
+            "description": "Plan your movements based on zone predictions earlier in the match.",
+        },
+        {
+            "metric": ("decision_making", "engagement_choices"),
+            "below": 0.6,
+            "priority": "high",
+            "title": "Better Engagement Decisions",
+            "description": "Only take fights when you have a positional or equipment advantage.",
+        },
+        {
+            "metric": ("decision_making", "item_management"),
+            "below": 0.7,
+            "priority": "low",
+            "title": "Optimize Item Management",
+            "description": "Prioritize picking up essential healing items and ammo before looting other items.",
+        },
+    ],
+    "general": [
+        {
+            "below": None,
+            "priority": "medium",
+            "title": "Consistent Practice Schedule",
+            "description": "Set aside 30 minutes daily for targeted practice in areas needing improvement.",
+        },
+    ],
+}
+
+# Rules used by standalone_app.py
+STANDALONE_RULE_TABLE = {
+    "rules": [
+        {
+            "metric": ("aim", "accuracy"),
+            "below": 0.6,
+            "high_below": 0.4,
+            "priority": "medium",
+            "title": "Improve Aim Accuracy",
+            "description": "Your accuracy is below average. Try to practice more with aim trainers and focus on controlled firing.",
+        },
+        {
+            "metric": ("aim", "recoil_control"),
+            "below": 0.6,
+            "priority": "medium",
+            "title": "Work on Recoil Control",
+            "description": "Your recoil control needs improvement. Practice spraying patterns with common weapons and pulling down while shooting.",
+        },
+        {
+            "metric": ("aim", "headshot_percentage"),
+            "below": 0.3,
+            "priority": "medium",
+            "title": "Aim for Headshots",
+            "description": "Your headshot percentage is low. Try to keep your crosshair at head level and aim for headshots when possible.",
+        },
+        {
+            "metric": ("positioning", "cover_usage"),
+            "below": 0.6,
+            "high_below": 0.4,
+            "priority": "medium",
+            "title": "Utilize Cover Better",
+            "description": "You're often exposed to enemies. Try to stay near cover and minimize exposure during firefights.",
+        },
+        {
+            "metric": ("positioning", "zone_awareness"),
+            "below": 0.7,
+            "priority": "medium",
+            "title": "Improve Zone Awareness",
+            "description": "You seem to get caught by the zone frequently. Plan your movements earlier and prioritize zone positioning.",
+        },
+        {
+            "metric": ("decision_making", "engagement_choices"),
+            "below": 0.6,
+            "high_below": 0.4,
+            "priority": "medium",
+            "title": "Better Engagement Decisions",
+            "description": "You're taking unfavorable fights. Choose engagements where you have a positional or numerical advantage.",
+        },
+        {
+            "metric": ("decision_making", "item_management"),
+            "below": 0.7,
+            "priority": "medium",
+            "title": "Improve Item Management",
+            "description": "Your inventory management needs work. Prioritize meds, ammo, and grenades based on your loadout and situation.",
+        },
+    ],
+    "general": [
+        {
+            "below": 0.5,
+            "priority": "high",
+            "title": "Fundamentals Practice",
+            "description": "Focus on mastering core gameplay fundamentals before advancing to complex strategies.",
+        },
+        {
+            "below": 0.7,
+            "priority": "medium",
+            "title": "Consistent Practice",
+            "description": "Your skills are developing well. Consistent practice with focus on your weaker areas will help you improve.",
+        },
+        {
+            "below": None,
+            "priority": "low",
+            "title": "Advanced Techniques",
+            "description": "You have solid fundamentals. Focus on advanced techniques and team coordination for further improvement.",
+        },
+    ],
+}
+
+
+def _make_recommendation(category, priority, rule):
+    """Build the recommendation dict shared by every match a rule fires for"""
+    return {
+        "category": category,
+        "title": rule["title"],
+        "description": rule["description"],
+        "priority": priority,
+    }
+
+
+class RuleSet:
+    """A rule table compiled into threshold arrays and interned recommendations"""
+
+    def __init__(self, table):
+        rules = table["rules"]
+        general = table["general"]
+        if not general or general[-1]["below"] is not None:
+            raise ValueError("The last general rule must have below=None")
+
+        # Threshold arrays used for vectorized batch evaluation
+        self.columns = np.array([METRIC_KEYS.index(rule["metric"]) for rule in rules], dtype=np.intp)
+        self.thresholds = np.array([rule["below"] for rule in rules], dtype=np.float64)
+        self.high_thresholds = np.array(
+            [rule.get("high_below", -np.inf) for rule in rules], dtype=np.float64
+        )
+        self.general_bounds = np.array([band["below"] for band in general[:-1]], dtype=np.float64)
+
+        # Interned recommendation objects: [rule][0] is the normal priority, [rule][1] escalated
+        self.rule_recommendations = [
+            (
+                _make_recommendation(rule["metric"][0], rule["priority"], rule),
+                _make_recommendation(rule["metric"][0], "high", rule),
+            )
+            for rule in rules
+        ]
+        self.general_recommendations = [
+            _make_recommendation("general", band["priority"], band) for band in general
+        ]
+
+        # Flattened rule tuples for the single-match path
+        self._compiled = [
+            (rule["metric"][0], rule["metric"][1], rule["below"], rule.get("high_below", float("-inf")), normal, escalated)
+            for rule, (normal, escalated) in zip(rules, self.rule_recommendations)
+        ]
+        self._general_bounds = [band["below"] for band in general[:-1]]
+        self._combinations = {}
+
+    def recommend(self, metrics):
+        """Return the recommendations for one nested metrics dict"""
+        recommendations = []
+        for category, name, below, high_below, normal, escalated in self._compiled:
+            value = metrics[category][name]
+            if value < below:
+                recommendations.append(escalated if value < high_below else normal)
+
+        band = 0
+        if self._general_bounds:
+            overall = overall_score(metrics)
+            while band < len(self._general_bounds) and overall >= self._general_bounds[band]:
+                band += 1
+        recommendations.append(self.general_recommendations[band])
+        return recommendations
+
+    def recommend_batch(self, batch):
+        """Return one recommendation list per match of a MetricBatch
+
+        All matches are evaluated with a single comparison against the threshold
+        arrays; each distinct combination of fired rules is materialized once.
+        """
+        combinations, inverse = self.combinations_batch(batch)
+        return [list(combinations[i]) for i in inverse.tolist()]
+
+    def combinations_batch(self, batch):
+        """Distinct recommendation tuples of a MetricBatch, and the index of each match's one
+
+        Lets callers derive anything that depends only on the recommendations
+        (summary text, say) once per combination instead of once per match.
+        """
+        values = batch.values[:, self.columns]
+        states = (values < self.thresholds).astype(np.int64) + (values < self.high_thresholds)
+        bands = np.searchsorted(self.general_bounds, batch.overall_scores, side="right")
+
+        # Encode (rule states, general band) as one integer per match
+        radix = 3 ** np.arange(len(self.columns), dtype=np.int64)
+        codes = (states @ radix) * len(self.general_recommendations) + bands
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        return [self._combination(code) for code in unique_codes.tolist()], inverse
+
+    def _combination(self, code):
+        """Decode a combination code into a cached tuple of recommendations"""
+        combination = self._combinations.get(code)
+        if combination is None:
+            band = code % len(self.general_recommendations)
+            states = code // len(self.general_recommendations)
+            recommendations = []
+            for normal, escalated in self.rule_recommendations:
+                state = states % 3
+                states //= 3
+                if state:
+                    recommendations.append(escalated if state == 2 else normal)
+            recommendations.append(self.general_recommendations[band])
+            combination = tuple(recommendations)
+            self._combinations[code] = combination
+        return combination
+
+
+DEMO_RULES = RuleSet(DEMO_RULE_TABLE)
+STANDALONE_RULES = RuleSet(STANDALONE_RULE_TABLE)
@@ -0,0 +1,54 @@
+"""Flask response helpers for cacheable API documents"""
+from flask import Response, request
+
+from backend.artifacts import available_encodings
+from backend.events import format_event
+
+# Clients may store responses but must revalidate them with If-None-Match
+REVALIDATE = "no-cache"
+
+
+def not_modified(etag):
+    """True when the request's If-None-Match already names this ETag"""
+    return request.if_none_match.contains_weak(etag)
+
+
+def negotiate_encoding():
+    """Best precompressed encoding the client accepts, falling back to identity"""
+    return request.accept_encodings.best_match(available_encodings()) or "identity"
+
+
+def conditional_response(body, etag, mimetype="application/json", cache_control=REVALIDATE, encoding=None):
+    """Serve `body` with a strong ETag, or an empty 304 when the client has it
+
+    `body` may be bytes, text or a callable producing either, so callers can
+    skip building the document when the client's copy is current. Pass the
+    negotiated `encoding` when `body` is one of several precompressed variants.
+    """
+    if not_modified(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body() if callable(body) else body, mimetype=mimetype)
+        if encoding and encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    if encoding is not None:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def sse_response(subscription):
+    """Stream a backend.events subscription as text/event-stream
+
+    `subscription` may also be a single (event, data) pair, sent as a
+    complete one-event stream.
+    """
+    if isinstance(subscription, tuple):
+        response = Response(format_event(0, *subscription), mimetype="text/event-stream")
+    else:
+        response = Response(subscription.stream(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop reverse proxies (nginx, Render, Railway) from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,137 @@
+"""HUD region-of-interest layouts and per-region detector dispatch
+
+BGMI draws its HUD at fixed positions, so detectors only ever need a few
+small crops of each frame. A layout is defined once at a reference resolution
+and scaled to whatever resolution frames arrive in; cropping is plain NumPy
+slicing, so every region is a view into the frame, never a copy.
+"""
+import threading
+
+# Reference resolution the built-in layouts are measured at
+REFERENCE_RESOLUTION = (1920, 1080)
+
+DEFAULT_LAYOUT = "bgmi"
+
+# name -> (reference (width, height), {region: (x, y, width, height)})
+_LAYOUTS = {}
+
+# (layout name, (width, height)) -> RoiLayout
+_scaled = {}
+_scaled_lock = threading.Lock()
+
+
+class RoiLayout:
+    """Pixel rectangles of the HUD regions at one resolution"""
+
+    def __init__(self, name, resolution, regions):
+        self.name = name
+        self.resolution = tuple(resolution)
+        self.regions = dict(regions)
+        width, height = self.resolution
+        self._slices = {}
+        for region, (x, y, w, h) in self.regions.items():
+            if x < 0 or y < 0 or x + w > width or y + h > height:
+                raise ValueError(f"Region {region!r} of layout {name!r} lies outside {width}x{height}")
+            self._slices[region] = (slice(y, y + h), slice(x, x + w))
+
+    def __repr__(self):
+        return f"RoiLayout({self.name!r}, {self.resolution[0]}x{self.resolution[1]}, {sorted(self.regions)})"
+
+    def crop(self, frame, regions=None):
+        """Return {region: view} for one (height, width, channels) frame"""
+        self._check(frame.shape[1], frame.shape[0])
+        names = self._slices if regions is None else regions
+        return {name: frame[self._slices[name]] for name in names}
+
+    def crop_batch(self, frames, regions=None):
+        """Return {region: view} for an (N, height, width, channels) frame stack"""
+        self._check(frames.shape[2], frames.shape[1])
+        names = self._slices if regions is None else regions
+        return {name: frames[(slice(None),) + self._slices[name]] for name in names}
+
+    def pixel_fraction(self):
+        """Share of the frame's pixels covered by the regions"""
+        width, height = self.resolution
+        return sum(w * h for _, _, w, h in self.regions.values()) / (width * height)
+
+    def _check(self, width, height):
+        if (width, height) != self.resolution:
+            raise ValueError(
+                f"Layout {self.name!r} is for {self.resolution[0]}x{self.resolution[1]}, "
+                f"got a {width}x{height} frame"
+            )
+
+
+def register_layout(name, regions, resolution=REFERENCE_RESOLUTION):
+    """Register a layout as {region: (x, y, width, height)} at `resolution`"""
+    _LAYOUTS[name] = (tuple(resolution), dict(regions))
+    with _scaled_lock:
+        for key in [key for key in _scaled if key[0] == name]:
+            del _scaled[key]
+
+
+def layout_for(resolution, name=DEFAULT_LAYOUT):
+    """Return layout `name` scaled to `resolution` ((width, height) or "WxH")
+
+    Regions scale with each axis independently; scaled layouts are cached.
+    """
+    if isinstance(resolution, str):
+        resolution = tuple(int(part) for part in resolution.lower().split("x"))
+    key = (name, tuple(resolution))
+    layout = _scaled.get(key)
+    if layout is not None:
+        return layout
+
+    try:
+        (base_width, base_height), regions = _LAYOUTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown ROI layout: {name}") from None
+    width, height = key[1]
+    sx, sy = width / base_width, height / base_height
+    scaled = {
+        region: (round(x * sx), round(y * sy), max(1, round(w * sx)), max(1, round(h * sy)))
+        for region, (x, y, w, h) in regions.items()
+    }
+    layout = RoiLayout(name, key[1], scaled)
+    with _scaled_lock:
+        return _scaled.setdefault(key, layout)
+
+
+class RoiDispatcher:
+    """Send each HUD region of a frame to its own detector
+
+    `detectors` maps region names to callables taking the region view (a
+    single crop, or an (N, h, w, c) stack in `process_batch`). Only regions
+    with a detector are cropped.
+    """
+
+    def __init__(self, detectors, layout=DEFAULT_LAYOUT):
+        self.detectors = dict(detectors)
+        self.layout_name = layout
+        unknown = set(self.detectors) - set(_LAYOUTS[layout][1])
+        if unknown:
+            raise ValueError(f"Layout {layout!r} has no regions {sorted(unknown)}")
+
+    def layout(self, width, height):
+        """Layout for frames of this size"""
+        return layout_for((width, height), self.layout_name)
+
+    def process(self, frame):
+        """Run every detector on its region of one frame; returns {region: result}"""
+        views = self.layout(frame.shape[1], frame.shape[0]).crop(frame, self.detectors)
+        return {region: detector(views[region]) for region, detector in self.detectors.items()}
+
+    def process_batch(self, frames):
+        """Run every detector once on its region across a stack of frames"""
+        views = self.layout(frames.shape[2], frames.shape[1]).crop_batch(frames, self.detectors)
+        return {region: detector(views[region]) for region, detector in self.detectors.items()}
+
+
+# Default BGMI HUD at 1920x1080
+register_layout(DEFAULT_LAYOUT, {
+    "minimap": (1630, 20, 270, 270),
+    "kill_feed": (1380, 300, 520, 170),
+    "crosshair": (900, 480, 120, 120),
+    "ammo_counter": (880, 955, 160, 60),
+    "health_bar": (710, 1025, 500, 30),
+})
@@ -0,0 +1,168 @@
+"""Mergeable quantile sketches of the match metrics
+
+A KLL sketch summarizes a stream of values in a few hundred retained items,
+whatever the stream's length, and answers rank and quantile queries with an
+error of roughly 1/k of the stream. Items sit in levels of "compactors":
+level h items each stand for 2^h values, and a level that outgrows its
+capacity is sorted and every other item (randomly the odd or even ones) is
+promoted to the level above. Two sketches merge by concatenating their
+levels and compacting, so per-slice sketches can be combined freely.
+
+`MetricSketches` keeps one sketch per metric in METRIC_KEYS order and
+serializes them into one compact blob. For queries it is compiled into
+sorted items with cumulative weights, after which a percentile is a
+binary search.
+"""
+import math
+import random
+
+import numpy as np
+
+from backend.batch import METRIC_KEYS
+
+DEFAULT_K = 200
+
+# Compactor capacity shrinks by this factor per level below the top one
+_CAPACITY_DECAY = 2 / 3
+
+_rng = random.Random()
+
+
+class KLLSketch:
+    """KLL quantile sketch of a stream of floats"""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.count = 0
+        self.levels = [[]]
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        size = sum(len(items) for items in self.levels)
+        max_size = sum(self._capacity(h) for h in range(len(self.levels)))
+        h = 0
+        while size >= max_size and h < len(self.levels):
+            items = self.levels[h]
+            if len(items) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                items.sort()
+                # An odd item out stays on this level
+                keep = [items.pop()] if len(items) % 2 else []
+                self.levels[h + 1].extend(items[_rng.randint(0, 1)::2])
+                size -= len(items) - len(items) // 2
+                self.levels[h] = keep
+                max_size = sum(self._capacity(level) for level in range(len(self.levels)))
+            h += 1
+
+    def update(self, value):
+        self.levels[0].append(float(value))
+        self.count += 1
+        self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.count += other.count
+        self._compress()
+
+    def weighted_items(self):
+        """(sorted values, cumulative weights) of the retained items"""
+        # Items are stored as float32, so compare at that precision too
+        values = np.concatenate([np.asarray(items, dtype=np.float32) for items in self.levels])
+        weights = np.concatenate([np.full(len(items), 1 << h, dtype=np.int64) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+
+class MetricSketches:
+    """One KLL sketch per metric, stored together"""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.sketches = [KLLSketch(k) for _ in METRIC_KEYS]
+
+    @property
+    def count(self):
+        return self.sketches[0].count
+
+    def add(self, row):
+        """Add one match's metric row (METRIC_KEYS order)"""
+        for sketch, value in zip(self.sketches, row):
+            sketch.update(value)
+
+    def merge(self, other):
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+
+    def to_bytes(self):
+        """int32 header (k, then count and level count per metric, then level sizes) + float32 items"""
+        header = [self.k]
+        values = []
+        for sketch in self.sketches:
+            header += [sketch.count, len(sketch.levels)] + [len(items) for items in sketch.levels]
+            for items in sketch.levels:
+                values.extend(items)
+        header = np.array([len(header)] + header, dtype=np.int32)
+        return header.tobytes() + np.array(values, dtype=np.float32).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        header_size = int(np.frombuffer(data, dtype=np.int32, count=1)[0])
+        header = np.frombuffer(data, dtype=np.int32, count=header_size + 1)[1:].tolist()
+        values = np.frombuffer(data, dtype=np.float32, offset=(header_size + 1) * 4).tolist()
+        sketches = cls(header[0])
+        position, offset = 1, 0
+        for sketch in sketches.sketches:
+            sketch.count, level_count = header[position], header[position + 1]
+            sizes = header[position + 2:position + 2 + level_count]
+            position += 2 + level_count
+            sketch.levels = []
+            for size in sizes:
+                sketch.levels.append(values[offset:offset + size])
+                offset += size
+        return sketches
+
+    def compile(self):
+        """Read-only form for fast queries"""
+        return CompiledSketches([sketch.weighted_items() for sketch in self.sketches], self.count)
+
+
+class CompiledSketches:
+    """Sorted items with cumulative weights per metric; queries are binary searches"""
+
+    def __init__(self, items, count):
+        self.items = items
+        self.count = count
+
+    def percentile(self, column, value):
+        """Percentage of recorded values at or below `value` (0-100), or None when empty"""
+        values, cumulative = self.items[column]
+        if not len(values):
+            return None
+        index = np.searchsorted(values, np.float32(value), side="right")
+        return 100.0 * (int(cumulative[index - 1]) if index else 0) / int(cumulative[-1])
+
+    def quantile(self, column, q):
+        """Value at quantile `q` (0-1), or None when empty"""
+        values, cumulative = self.items[column]
+        if not len(values):
+            return None
+        index = np.searchsorted(cumulative, q * int(cumulative[-1]), side="left")
+        return round(float(values[min(index, len(values) - 1)]), 6)
+
+
+def metric_column_of(name):
+    """Column of a metric given as "category.name" or just "name"; raises ValueError"""
+    category, _, metric = name.rpartition(".")
+    for column, key in enumerate(METRIC_KEYS):
+        if key[1] == metric and category in ("", key[0]):
+            return column
+    raise ValueError(f"Unknown metric: {name}")
+
@@ -0,0 +1,286 @@
+"""Threaded static file server with zero-copy sends
+
+A drop-in replacement for `socketserver.TCPServer` plus
+`SimpleHTTPRequestHandler`:
+
+- every connection gets its own thread, so a slow client never holds up
+  the others
+- connections are kept alive (HTTP/1.1)
+- file bodies go out with `socket.sendfile`, i.e. `os.sendfile` where the
+  platform has it, without being copied through Python
+- single `Range` requests are served as 206 partial content, with If-Range
+- ETags are content hashes, computed once per file version
+- precompressed `<file>.br` / `<file>.gz` siblings are served to clients
+  that accept them
+- directories without an index.html are listed, as SimpleHTTPRequestHandler
+  does
+
+Files whose names carry a content hash (`app.3f2a9c1b.js`) are cached by
+browsers for a year as immutable; everything else for `max_age` seconds,
+after which it is revalidated with the ETag.
+
+Run it like `python -m http.server`:
+
+    python -m backend.static_server 5000 --bind 0.0.0.0 --directory .
+"""
+import argparse
+import email.utils
+import functools
+import hashlib
+import http.server
+import os
+import re
+import threading
+from http import HTTPStatus
+
+from backend.artifacts import VARIANT_SUFFIXES
+
+# Cache-Control for content-hashed file names, whose content never changes
+IMMUTABLE = "public, max-age=31536000, immutable"
+DEFAULT_MAX_AGE = 3600
+
+# Seconds an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 30
+
+# File names with a content hash before the extension, e.g. app.3f2a9c1b.js
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(path):
+    """Content hash of a file, as an unquoted ETag value"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileInfo:
+    """Content hashes of files, recomputed only when a file changes"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def etag(self, path, stat):
+        version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._entries.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        etag = file_etag(path)
+        with self._lock:
+            self._entries[path] = (version, etag)
+        return etag
+
+
+def parse_range(header, length):
+    """(start, stop) of a single-range `Range` header, None to ignore it
+
+    Raises ValueError when the range cannot be satisfied. Multi-range and
+    malformed headers are ignored, which RFC 9110 allows: the whole file
+    is sent instead.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes, of which an empty file or suffix has none
+        suffix = int(last)
+        if suffix == 0 or length == 0:
+            raise ValueError("range not satisfiable")
+        return max(0, length - suffix), length
+    start = int(first)
+    stop = min(int(last) + 1, length) if last else length
+    if last and int(last) < start:
+        return None
+    if start >= length:
+        raise ValueError("range not satisfiable")
+    return start, stop
+
+
+def accepted_encodings(header):
+    """Content codings a client accepts (q > 0)"""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+class StaticFileHandler(http.server.SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler with keep-alive, sendfile, ranges, ETags and precompression"""
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and the sendfile body go out as separate writes; without
+    # TCP_NODELAY the second waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    # Shared by every handler instance, i.e. every request
+    file_info = FileInfo()
+
+    def __init__(self, *args, max_age=DEFAULT_MAX_AGE, **kwargs):
+        self.max_age = max_age
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _resolve(self, send_body):
+        """Filesystem path to serve, or None after sending a redirect, listing or error"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split("?", 1)[0].endswith("/"):
+                # Same redirect as SimpleHTTPRequestHandler, with a body length for keep-alive
+                location = self.path.split("?", 1)
+                location[0] += "/"
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", "?".join(location))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            index = os.path.join(path, "index.html")
+            if not os.path.isfile(index):
+                self._send_listing(path, send_body)
+                return None
+            path = index
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        return path
+
+    def _send_listing(self, path, send_body):
+        """Directory listing as SimpleHTTPRequestHandler renders it; it sets Content-Length"""
+        listing = self.list_directory(path)
+        if listing is not None:
+            with listing:
+                if send_body:
+                    self.copyfile(listing, self.wfile)
+
+    def _variant(self, path, stat):
+        """(path, stat, encoding) of the best precompressed sibling the client accepts"""
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(path + suffix)
+            except OSError:
+                continue
+            # A sibling older than its source is stale; skip it
+            if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+                return path + suffix, variant_stat, encoding
+        return path, stat, None
+
+    def _cache_headers(self, path, etag, stat):
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Last-Modified", self.date_time_string(stat.st_mtime))
+        if HASHED_NAME.search(os.path.basename(path)):
+            self.send_header("Cache-Control", IMMUTABLE)
+        else:
+            self.send_header("Cache-Control", f"public, max-age={self.max_age}")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _not_modified(self, etag, stat):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or f'"{etag}"' in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(stat.st_mtime) <= since
+        return False
+
+    def _serve(self, send_body):
+        path = self._resolve(send_body)
+        if path is None:
+            return
+        stat = os.stat(path)
+        content_type = self.guess_type(path)
+        body_path, body_stat, encoding = self._variant(path, stat)
+        etag = self.file_info.etag(path, stat) + (f"-{encoding}" if encoding else "")
+
+        if self._not_modified(etag, stat):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._cache_headers(path, etag, stat)
+            self.end_headers()
+            return
+
+        length = body_stat.st_size
+        start, stop = 0, length
+        status = HTTPStatus.OK
+        if_range = self.headers.get("If-Range")
+        if if_range is None or if_range.strip() == f'"{etag}"':
+            try:
+                requested = parse_range(self.headers.get("Range"), length)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{length}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if requested is not None:
+                start, stop = requested
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        with open(body_path, "rb") as f:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(stop - start))
+            self.send_header("Accept-Ranges", "bytes")
+            if status == HTTPStatus.PARTIAL_CONTENT:
+                self.send_header("Content-Range", f"bytes {start}-{stop - 1}/{length}")
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self._cache_headers(path, etag, stat)
+            self.end_headers()
+            if send_body and stop > start:
+                self.wfile.flush()
+                self.connection.sendfile(f, start, stop - start)
+
+
+class StaticServer(http.server.ThreadingHTTPServer):
+    """Thread-per-connection HTTP server"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def serve(directory=".", host="0.0.0.0", port=5000, handler_class=StaticFileHandler, max_age=DEFAULT_MAX_AGE):
+    """Serve `directory` until interrupted"""
+    handler = functools.partial(handler_class, directory=os.path.abspath(directory), max_age=max_age)
+    with StaticServer((host, port), handler) as httpd:
+        print(f"Serving {directory} at http://{host}:{port}")
+        httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a directory over HTTP")
+    parser.add_argument("port", nargs="?", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--directory", default=".")
+    parser.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE,
+                        help="browser cache lifetime of files without a content hash in their name")
+    args = parser.parse_args()
+    serve(args.directory, args.bind, args.port, max_age=args.max_age)
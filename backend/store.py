@@ -0,0 +1,635 @@
+"""Persistent SQLite match store shared by every worker of an app
+
+Match records (the dicts served by /api/matches) and their analysis JSON are
+kept in one SQLite database in WAL mode, so readers never block the writer
+and any number of processes can share it. Indexed columns are extracted from
+each record for filtering; the record itself is stored as JSON text and
+returned as-is.
+
+Every write bumps a version counter in `store_meta`, which together with a
+random per-database epoch gives listings a cheap strong ETag. Analyses carry
+a content hash computed when they are saved.
+
+Each analysed match also keeps its metrics as a float32 vector, the query
+form of the pro-player index (backend.pros). Matches may belong to a player;
+their per-player trends (backend.trends) are updated in the same transaction
+that saves the analysis. So are the metric quantile sketches
+(backend.sketches) of the match's map and mode, which answer "what
+percentile is this value" without reading any analysis.
+"""
+import base64
+import glob
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from backend.artifacts import ANALYSIS_FILE, read_variant, serialize_analysis
+from backend.batch import METRIC_KEYS, metrics_to_row, overall_score
+from backend.cache import AnalysisCache
+from backend.sketches import MetricSketches, metric_column_of
+from backend.trends import PlayerTrends
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id TEXT PRIMARY KEY,
+    game_mode TEXT,
+    map_name TEXT,
+    created_at TEXT,
+    overall_score REAL,
+    record TEXT NOT NULL,
+    analysis TEXT,
+    analysis_etag TEXT,
+    player_id TEXT,
+    metric_vector BLOB
+);
+CREATE TABLE IF NOT EXISTS player_trends (
+    player_id TEXT PRIMARY KEY,
+    state BLOB NOT NULL,
+    trends TEXT NOT NULL,
+    trends_etag TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_matches (
+    player_id TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    PRIMARY KEY (player_id, match_id)
+);
+CREATE TABLE IF NOT EXISTS metric_sketches (
+    map_name TEXT NOT NULL,
+    game_mode TEXT NOT NULL,
+    state BLOB NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (map_name, game_mode)
+);
+CREATE TABLE IF NOT EXISTS sketch_matches (
+    match_id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_matches_game_mode ON matches (game_mode, created_at);
+CREATE INDEX IF NOT EXISTS idx_matches_map_name ON matches (map_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_matches_created_at ON matches (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_matches_score_id ON matches (COALESCE(overall_score, -1), id);
+"""
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the prepared form on every call
+UPSERT_MATCH = """
+INSERT INTO matches (
+    id, game_mode, map_name, created_at, overall_score, record, analysis, analysis_etag, player_id, metric_vector
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    player_id = COALESCE(excluded.player_id, matches.player_id),
+    game_mode = excluded.game_mode,
+    map_name = excluded.map_name,
+    created_at = excluded.created_at,
+    overall_score = COALESCE(excluded.overall_score, matches.overall_score),
+    record = excluded.record,
+    analysis = COALESCE(excluded.analysis, matches.analysis),
+    analysis_etag = COALESCE(excluded.analysis_etag, matches.analysis_etag),
+    metric_vector = COALESCE(excluded.metric_vector, matches.metric_vector)
+"""
+SELECT_RECORD = "SELECT record FROM matches WHERE id = ?"
+SELECT_ANALYSIS = "SELECT analysis, analysis_etag FROM matches WHERE id = ?"
+SELECT_METRIC_VECTOR = "SELECT metric_vector, analysis FROM matches WHERE id = ?"
+COUNT_MATCHES = "SELECT COUNT(*) FROM matches"
+DELETE_ALL = "DELETE FROM matches"
+# A match counts towards its player's trends once, however often it is saved
+CLAIM_PLAYER_MATCH = "INSERT OR IGNORE INTO player_matches (player_id, match_id) VALUES (?, ?)"
+SELECT_TREND_STATE = "SELECT state FROM player_trends WHERE player_id = ?"
+UPSERT_TRENDS = """
+INSERT INTO player_trends (player_id, state, trends, trends_etag) VALUES (?, ?, ?, ?)
+ON CONFLICT (player_id) DO UPDATE SET
+    state = excluded.state, trends = excluded.trends, trends_etag = excluded.trends_etag
+"""
+SELECT_TRENDS = "SELECT trends, trends_etag FROM player_trends WHERE player_id = ?"
+DELETE_ALL_TRENDS = ("DELETE FROM player_trends", "DELETE FROM player_matches")
+# Likewise for the metric sketches; a sketch's version is the store version of its last update
+CLAIM_SKETCH_MATCH = "INSERT OR IGNORE INTO sketch_matches (match_id) VALUES (?)"
+SELECT_SKETCH_STATE = "SELECT state FROM metric_sketches WHERE map_name = ? AND game_mode = ?"
+UPSERT_SKETCH = """
+INSERT INTO metric_sketches (map_name, game_mode, state, version)
+VALUES (?, ?, ?, (SELECT CAST(value AS INTEGER) FROM store_meta WHERE key = 'version'))
+ON CONFLICT (map_name, game_mode) DO UPDATE SET state = excluded.state, version = excluded.version
+"""
+SELECT_SKETCH_VERSION = "SELECT version FROM metric_sketches WHERE map_name = ? AND game_mode = ?"
+SELECT_SKETCH = "SELECT state, version FROM metric_sketches WHERE map_name = ? AND game_mode = ?"
+DELETE_ALL_SKETCHES = ("DELETE FROM metric_sketches", "DELETE FROM sketch_matches")
+INIT_META = "INSERT OR IGNORE INTO store_meta (key, value) VALUES (?, ?)"
+BUMP_VERSION = "UPDATE store_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'"
+SELECT_VERSION_TAG = """
+SELECT (SELECT value FROM store_meta WHERE key = 'epoch') || '-' ||
+       (SELECT value FROM store_meta WHERE key = 'version')
+"""
+
+# Sort keys accepted by query(); expressions match the indexes above
+SORT_KEYS = {
+    "created_at": "created_at",
+    "overall_score": "COALESCE(overall_score, -1)",
+}
+
+# Filter name -> SQL condition
+FILTERS = {
+    "player_id": "player_id = ?",
+    "map_name": "map_name = ?",
+    "game_mode": "game_mode = ?",
+    "date_from": "created_at >= ?",
+    "date_to": "created_at < ?",
+    "min_score": "overall_score >= ?",
+    "max_score": "overall_score <= ?",
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Sketch slice covering every map or every mode
+ALL = "*"
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def content_etag(text):
+    """Strong ETag value (unquoted) for a serialized document"""
+    return bytes_etag(text.encode("utf-8"))
+
+
+def bytes_etag(data):
+    """Strong ETag value (unquoted) for a response body"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def encode_cursor(sort_value, match_id):
+    """Opaque pagination cursor for the last row of a page"""
+    raw = json.dumps([sort_value, match_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, match_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return sort_value, match_id
+
+
+def query_from_args(args):
+    """Translate request query parameters into MatchStore.query() keyword arguments
+
+    Accepts player, map, mode, from, to, min_score, max_score, sort, order,
+    cursor and limit. Raises ValueError for invalid values.
+    """
+    filters = {}
+    for param, name in (
+        ("player", "player_id"), ("map", "map_name"), ("mode", "game_mode"), ("from", "date_from"), ("to", "date_to")
+    ):
+        if args.get(param):
+            filters[name] = args[param]
+    for name in ("min_score", "max_score"):
+        if args.get(name):
+            try:
+                filters[name] = float(args[name])
+            except ValueError:
+                raise ValueError(f"{name} must be a number")
+
+    sort = args.get("sort", "created_at")
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+    order = args.get("order", "desc")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+
+    limit = args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+
+    cursor = args.get("cursor") or None
+    if cursor is not None:
+        # Decoded again by the query; checked here so every invalid value fails up front
+        decode_cursor(cursor)
+
+    return {
+        "filters": filters,
+        "sort": sort,
+        "descending": order == "desc",
+        "cursor": cursor,
+        "limit": limit,
+    }
+
+
+def percentile_query_from_args(args):
+    """Translate request query parameters into MatchStore.metric_percentiles() keyword arguments
+
+    Accepts metric (required), map, mode, and either value (a percentile
+    rank is returned) or q, a comma separated list of quantiles in [0, 1].
+    Raises ValueError for invalid values.
+    """
+    if not args.get("metric"):
+        raise ValueError("metric is required")
+    query = {
+        "metric": args["metric"],
+        "map_name": args.get("map") or ALL,
+        "game_mode": args.get("mode") or ALL,
+    }
+    if args.get("value"):
+        try:
+            query["value"] = float(args["value"])
+        except ValueError:
+            raise ValueError("value must be a number")
+    elif args.get("q"):
+        try:
+            query["quantiles"] = [float(q) for q in args["q"].split(",")]
+        except ValueError:
+            raise ValueError("q must be a comma separated list of numbers")
+        if not all(0 <= q <= 1 for q in query["quantiles"]):
+            raise ValueError("q must be between 0 and 1")
+    return query
+
+
+class MatchStore:
+    """SQLite-backed match index with a small connection pool"""
+
+    def __init__(self, db_path, data_dir=None, pool_size=4, cache_size=256):
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.pool_size = pool_size
+        self.cache = AnalysisCache(cache_size)
+        self._pool = None
+        self._pool_pid = None
+        self._inherited = []
+        self._write_lock = threading.Lock()
+        # (map_name, game_mode) -> (version, CompiledSketches)
+        self._sketches = {}
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        is_new = not os.path.exists(db_path)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            with conn:
+                conn.execute(INIT_META, ("epoch", os.urandom(4).hex()))
+                conn.execute(INIT_META, ("version", "0"))
+        if is_new and data_dir:
+            self.rebuild_from_disk()
+
+    def _migrate(self, conn):
+        """Add columns introduced after a database was first created"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(matches)")}
+        if "analysis_etag" not in columns:
+            conn.execute("ALTER TABLE matches ADD COLUMN analysis_etag TEXT")
+        if "player_id" not in columns:
+            conn.execute("ALTER TABLE matches ADD COLUMN player_id TEXT")
+        if "metric_vector" not in columns:
+            conn.execute("ALTER TABLE matches ADD COLUMN metric_vector BLOB")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_player ON matches (player_id, created_at)")
+
+    def _connect(self):
+        """Open a connection configured for concurrent readers"""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection; pools are per process so forked workers never share one"""
+        if self._pool_pid != os.getpid():
+            # Connections inherited across fork() must never be used or closed by
+            # the child (closing one can checkpoint the parent's WAL), so keep them
+            if self._pool is not None:
+                self._inherited.append(self._pool)
+            self._pool = queue.LifoQueue()
+            self._pool_pid = os.getpid()
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if self._pool.qsize() < self.pool_size:
+                self._pool.put(conn)
+            else:
+                conn.close()
+
+    def save(self, record, analysis=None, score=None):
+        """Insert or update a match record and, optionally, its analysis
+
+        `analysis` may be a dict or already-serialized JSON text. When the
+        record names a `player_id`, the first analysis saved for the match is
+        also folded into that player's trends. The first analysis of every
+        match is added to the metric sketches of its map and mode.
+        """
+        metrics = None
+        if analysis is not None:
+            if isinstance(analysis, str):
+                metrics = json.loads(analysis)["metrics"]
+            else:
+                metrics = analysis["metrics"]
+                analysis = serialize_analysis(analysis)
+            if score is None:
+                score = overall_score(metrics)
+        etag = content_etag(analysis) if analysis is not None else None
+        metric_row = metrics_to_row(metrics) if metrics is not None else None
+        row = (
+            record["id"],
+            record.get("game_mode"),
+            record.get("map_name"),
+            record.get("created_at") or record.get("start_time") or "",
+            score,
+            json.dumps(record),
+            analysis,
+            etag,
+            record.get("player_id"),
+            np.asarray(metric_row, dtype=np.float32).tobytes() if metric_row is not None else None,
+        )
+        with self._write_lock, self._connection() as conn:
+            with conn:
+                conn.execute(UPSERT_MATCH, row)
+                if metric_row is not None:
+                    if record.get("player_id"):
+                        self._update_trends(conn, record["player_id"], record["id"], metric_row)
+                    self._update_sketches(
+                        conn, record["id"], record.get("map_name"), record.get("game_mode"), metric_row
+                    )
+                conn.execute(BUMP_VERSION)
+        if analysis is not None:
+            self.cache.invalidate(record["id"])
+
+    def _update_trends(self, conn, player_id, match_id, row):
+        """Fold a match's metric row into its player's trends, inside the caller's write transaction"""
+        if conn.execute(CLAIM_PLAYER_MATCH, (player_id, match_id)).rowcount == 0:
+            return
+        state = conn.execute(SELECT_TREND_STATE, (player_id,)).fetchone()
+        trends = PlayerTrends.from_bytes(state[0]) if state else PlayerTrends()
+        trends.add(row)
+        text = json.dumps({"player_id": player_id, **trends.summary()}, separators=(",", ":"))
+        conn.execute(UPSERT_TRENDS, (player_id, trends.to_bytes(), text, content_etag(text)))
+
+    def _update_sketches(self, conn, match_id, map_name, game_mode, row):
+        """Add a match's metric row to the sketches of its map and mode, and of "all", in the caller's transaction"""
+        if conn.execute(CLAIM_SKETCH_MATCH, (match_id,)).rowcount == 0:
+            return
+        map_name, game_mode = map_name or ALL, game_mode or ALL
+        for slice_key in {(map_name, game_mode), (map_name, ALL), (ALL, game_mode), (ALL, ALL)}:
+            state = conn.execute(SELECT_SKETCH_STATE, slice_key).fetchone()
+            sketches = MetricSketches.from_bytes(state[0]) if state else MetricSketches()
+            sketches.add(row)
+            conn.execute(UPSERT_SKETCH, (*slice_key, sketches.to_bytes()))
+
+    def get_sketches(self, map_name=ALL, game_mode=ALL):
+        """Compiled metric sketches of a map and mode (ALL for any), or None when no match was seen
+
+        The compiled form is kept per process and rebuilt only when the
+        sketch has been updated since, so a lookup is one indexed read.
+        """
+        slice_key = (map_name, game_mode)
+        cached = self._sketches.get(slice_key)
+        with self._connection() as conn:
+            if cached is not None:
+                row = conn.execute(SELECT_SKETCH_VERSION, slice_key).fetchone()
+                if row is not None and row[0] == cached[0]:
+                    return cached[1]
+            row = conn.execute(SELECT_SKETCH, slice_key).fetchone()
+        if row is None:
+            self._sketches.pop(slice_key, None)
+            return None
+        compiled = MetricSketches.from_bytes(row[0]).compile()
+        self._sketches[slice_key] = (row[1], compiled)
+        return compiled
+
+    def metric_percentiles(self, metric, map_name=ALL, game_mode=ALL, value=None, quantiles=None):
+        """Percentile rank of `value` for a metric, or its values at `quantiles`
+
+        Raises ValueError for an unknown metric. Ranks and quantiles are
+        approximate, typically within a percentile point.
+        """
+        column = metric_column_of(metric)
+        sketches = self.get_sketches(map_name, game_mode)
+        result = {
+            "metric": ".".join(METRIC_KEYS[column]),
+            "map_name": map_name,
+            "game_mode": game_mode,
+            "matches": sketches.count if sketches else 0,
+        }
+        if value is not None:
+            result["value"] = value
+            rank = sketches.percentile(column, value) if sketches else None
+            result["percentile"] = round(rank, 2) if rank is not None else None
+        else:
+            result["quantiles"] = {
+                str(q): sketches.quantile(column, q) if sketches else None
+                for q in (quantiles or DEFAULT_QUANTILES)
+            }
+        return result
+
+    def get_player_trends(self, player_id):
+        """Return (trends JSON bytes, etag) of a player, or None"""
+        with self._connection() as conn:
+            row = conn.execute(SELECT_TRENDS, (player_id,)).fetchone()
+        return (row[0].encode("utf-8"), row[1]) if row else None
+
+    def get(self, match_id):
+        """Return a match record, or None"""
+        with self._connection() as conn:
+            row = conn.execute(SELECT_RECORD, (match_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_analysis_json(self, match_id):
+        """Return the stored analysis as JSON text, or None"""
+        with self._connection() as conn:
+            row = conn.execute(SELECT_ANALYSIS, (match_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_metric_vector(self, match_id):
+        """The match's 12 metrics as a float32 vector in METRIC_KEYS order, or None without an analysis"""
+        with self._connection() as conn:
+            row = conn.execute(SELECT_METRIC_VECTOR, (match_id,)).fetchone()
+        if row is None:
+            return None
+        if row[0] is not None:
+            return np.frombuffer(row[0], dtype=np.float32)
+        # Saved before vectors were stored
+        if row[1] is not None:
+            return np.asarray(metrics_to_row(json.loads(row[1])["metrics"]), dtype=np.float32)
+        return None
+
+    def version_tag(self):
+        """Tag that changes on every write; used as the ETag of match listings"""
+        with self._connection() as conn:
+            return conn.execute(SELECT_VERSION_TAG).fetchone()[0]
+
+    def analysis_version(self, match_id):
+        """mtime of the match's analysis.json, or None when there is no such file"""
+        if not self.data_dir or os.path.basename(match_id) != match_id or match_id.startswith("."):
+            return None
+        try:
+            return os.stat(os.path.join(self.data_dir, match_id, ANALYSIS_FILE)).st_mtime_ns
+        except OSError:
+            return None
+
+    def get_analysis_body(self, match_id, encoding="identity"):
+        """Return (response bytes, etag, encoding) for an analysis, or None
+
+        When the match directory holds analysis.json, the body is read from
+        that file and cached under its mtime, so version and body always come
+        from the same place. `encoding` of "gzip" or "br" serves the variant
+        precompressed by backend.artifacts.write_analysis; when that file is
+        missing the plain JSON is returned with encoding "identity". ETags
+        are hashes of the bytes served. Analyses stored only in the database
+        are read from it on every request.
+        """
+        version = self.analysis_version(match_id)
+        if version is None:
+            return self._stored_analysis_body(match_id)
+
+        entry = self.cache.get((match_id, encoding), version)
+        if entry is not None:
+            return entry
+
+        match_dir = os.path.join(self.data_dir, match_id)
+        body = read_variant(match_dir, encoding) if encoding != "identity" else None
+        if body is not None:
+            # Each representation needs its own strong ETag
+            entry = (body, f"{bytes_etag(body)}-{encoding}", encoding)
+        else:
+            try:
+                with open(os.path.join(match_dir, ANALYSIS_FILE), "rb") as f:
+                    body = f.read()
+            except OSError:
+                return self._stored_analysis_body(match_id)
+            entry = (body, bytes_etag(body), "identity")
+            if encoding != "identity":
+                self.cache.put((match_id, "identity"), version, entry)
+        # A missing variant's fallback is cached under the encoding asked for
+        # too, so the next such request does not look for the file again
+        self.cache.put((match_id, encoding), version, entry)
+        return entry
+
+    def _stored_analysis_body(self, match_id):
+        with self._connection() as conn:
+            row = conn.execute(SELECT_ANALYSIS, (match_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        analysis, etag = row
+        return analysis.encode("utf-8"), etag or content_etag(analysis), "identity"
+
+    def _select(self, filters, sort, descending, cursor, limit):
+        """Build the SELECT for a filtered, keyset-paginated listing"""
+        sort_expr = SORT_KEYS[sort]
+        conditions = []
+        params = []
+        for name, value in (filters or {}).items():
+            conditions.append(FILTERS[name])
+            params.append(value)
+        if cursor:
+            sort_value, match_id = decode_cursor(cursor)
+            conditions.append(f"({sort_expr}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend([sort_value, match_id])
+
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {sort_expr}, id, record FROM matches"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {sort_expr} {direction}, id {direction}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def query(self, filters=None, sort="created_at", descending=True, cursor=None, limit=None):
+        """Return one page of match records and the cursor of the next page
+
+        Pagination is keyset-based, so every page costs the same regardless of
+        how deep into the history it is. The next cursor is None on the last page.
+        """
+        limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        sql, params = self._select(filters, sort, descending, cursor, limit + 1)
+        with self._connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0], rows[-1][1])
+        return [json.loads(row[2]) for row in rows], next_cursor
+
+    def iter_record_json(self, filters=None, sort="created_at", descending=True, cursor=None, limit=None, batch_size=500):
+        """Iterator over matching records as JSON text, fetching `batch_size` rows at a time
+
+        The query is built before this returns, so an invalid cursor raises
+        ValueError here rather than once a response has started streaming.
+        """
+        sql, params = self._select(filters, sort, descending, cursor, limit)
+        return self._iter_rows(sql, params, batch_size)
+
+    def _iter_rows(self, sql, params, batch_size):
+        with self._connection() as conn:
+            rows = conn.execute(sql, params)
+            while True:
+                batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                for row in batch:
+                    yield row[2]
+
+    def count(self):
+        """Number of stored matches"""
+        with self._connection() as conn:
+            return conn.execute(COUNT_MATCHES).fetchone()[0]
+
+    def clear(self):
+        """Remove every match from the index; analysis files stay on disk"""
+        with self._write_lock, self._connection() as conn:
+            with conn:
+                conn.execute(DELETE_ALL)
+                for statement in DELETE_ALL_TRENDS + DELETE_ALL_SKETCHES:
+                    conn.execute(statement)
+                conn.execute(BUMP_VERSION)
+        self.cache.invalidate()
+
+    def rebuild_from_disk(self):
+        """Index every <data_dir>/*/analysis.json; returns the number of matches found"""
+        count = 0
+        for analysis_file in sorted(glob.glob(os.path.join(self.data_dir, "*", "analysis.json"))):
+            match_dir = os.path.dirname(analysis_file)
+            try:
+                with open(analysis_file, "r") as f:
+                    analysis = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            metadata = {}
+            metadata_file = os.path.join(match_dir, "metadata.json")
+            if os.path.exists(metadata_file):
+                try:
+                    with open(metadata_file, "r") as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    pass
+
+            record = {
+                "id": analysis.get("match_id") or os.path.basename(match_dir),
+                "player_id": metadata.get("player_id"),
+                "game_mode": metadata.get("game_mode"),
+                "map_name": metadata.get("map_name"),
+                "created_at": metadata.get("start_time") or analysis.get("analysis_time"),
+                "analysis_file": analysis_file,
+                "status": "completed"
+            }
+            self.save(record, analysis)
+            count += 1
+        return count
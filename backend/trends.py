@@ -0,0 +1,92 @@
+"""Per-player metric trends across matches
+
+Every time a player's analysis is saved, their aggregates are updated in
+place: the new match enters a ring of the last 200 metric rows, the running
+sums of the 10, 50 and 200 match windows add it and drop the row that fell
+out of each window, and the exponentially weighted average moves towards
+it. Percentiles over the ring are refreshed at the same time. The cost of an
+update does not depend on how many matches a player has, and the finished
+trends document is stored with the state, so reading it is a single lookup.
+"""
+import numpy as np
+
+from backend.batch import METRIC_COUNT, METRIC_KEYS
+
+WINDOWS = (10, 50, 200)
+HISTORY = max(WINDOWS)
+EWMA_ALPHA = 0.1
+PERCENTILES = (10, 50, 90)
+
+# Running sums are recomputed from the ring this often, so float error never builds up
+_RESUM_INTERVAL = HISTORY
+
+
+class PlayerTrends:
+    """Rolling aggregates of one player's metrics over their recent matches"""
+
+    def __init__(self):
+        self.count = 0
+        self.ewma = np.zeros(METRIC_COUNT)
+        self.sums = np.zeros((len(WINDOWS), METRIC_COUNT))
+        # Row of match n lives at n % HISTORY
+        self.recent = np.zeros((HISTORY, METRIC_COUNT))
+
+    def add(self, row):
+        """Fold one match's metric row (METRIC_KEYS order) into the aggregates"""
+        row = np.asarray(row, dtype=np.float64)
+        for i, window in enumerate(WINDOWS):
+            if self.count >= window:
+                self.sums[i] -= self.recent[(self.count - window) % HISTORY]
+            self.sums[i] += row
+        self.recent[self.count % HISTORY] = row
+        self.ewma = row.copy() if self.count == 0 else self.ewma + EWMA_ALPHA * (row - self.ewma)
+        self.count += 1
+
+        if self.count % _RESUM_INTERVAL == 0:
+            for i, window in enumerate(WINDOWS):
+                self.sums[i] = self._last(window).sum(axis=0)
+
+    def _last(self, n):
+        """Rows of the last `n` matches (fewer if the player has not played that many)"""
+        n = min(n, self.count)
+        indexes = np.arange(self.count - n, self.count) % HISTORY
+        return self.recent[indexes]
+
+    def to_bytes(self):
+        header = np.array([self.count], dtype=np.float64)
+        return np.concatenate([header, self.ewma, self.sums.ravel(), self.recent.ravel()]).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        values = np.frombuffer(data, dtype=np.float64)
+        trends = cls()
+        trends.count = int(values[0])
+        offset = 1
+        trends.ewma = values[offset:offset + METRIC_COUNT].copy()
+        offset += METRIC_COUNT
+        trends.sums = values[offset:offset + trends.sums.size].reshape(trends.sums.shape).copy()
+        offset += trends.sums.size
+        trends.recent = values[offset:].reshape(trends.recent.shape).copy()
+        return trends
+
+    def summary(self):
+        """Trends document: per metric, the latest value, rolling means, EWMA and percentiles"""
+        if self.count == 0:
+            return {"matches": 0, "metrics": {}}
+        latest = self.recent[(self.count - 1) % HISTORY]
+        means = self.sums / np.minimum(self.count, WINDOWS)[:, None]
+        percentiles = np.percentile(self._last(HISTORY), PERCENTILES, axis=0)
+
+        metrics = {}
+        for column, (category, name) in enumerate(METRIC_KEYS):
+            entry = {"latest": round(float(latest[column]), 4), "ewma": round(float(self.ewma[column]), 4)}
+            for i, window in enumerate(WINDOWS):
+                entry[f"mean_{window}"] = round(float(means[i, column]), 4)
+            for i, q in enumerate(PERCENTILES):
+                entry[f"p{q}"] = round(float(percentiles[i, column]), 4)
+            metrics.setdefault(category, {})[name] = entry
+        return {
+            "matches": self.count,
+            "windows": {str(window): min(window, self.count) for window in WINDOWS},
+            "metrics": metrics,
+        }
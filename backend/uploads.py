@@ -0,0 +1,206 @@
+"""Chunked, resumable uploads of match recordings
+
+An upload is created with the file's total size and split into fixed-size
+chunks. Each chunk is sent on its own with a SHA-256 checksum, streamed
+straight into its place in a preallocated file with `os.pwrite`, and marked
+done by a small marker file once its checksum matches. Clients that lose
+their connection ask for the upload's status and resend only the missing
+chunks; chunks may arrive in any order and from any worker process.
+
+The status also reports `ready_bytes`, the length of the leading run of
+received chunks: that much of the .part file can already be read, e.g. to
+analyze the start of a recording before the upload finishes.
+
+Layout inside the match directory:
+
+    upload.json          manifest, written once when the upload is created
+    source.<ext>.part    the file being assembled
+    chunks/<index>       marker holding the checksum of a received chunk
+    source.<ext>         the finished file, renamed from .part on completion
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+MANIFEST_FILE = "upload.json"
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Bytes read from the request per pwrite, so memory stays constant
+READ_SIZE = 256 * 1024
+
+_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class UploadError(ValueError):
+    """An upload request that cannot be accepted as sent"""
+
+
+class UploadManager:
+    """Create uploads and write their chunks under `data_dir/<upload id>/`"""
+
+    def __init__(self, data_dir, allowed_extensions=None):
+        self.data_dir = data_dir
+        self.allowed_extensions = allowed_extensions
+
+    def _dir(self, upload_id):
+        if not _ID_PATTERN.match(upload_id):
+            raise KeyError(upload_id)
+        return os.path.join(self.data_dir, upload_id)
+
+    def create(self, upload_id, filename, size, chunk_size=None, metadata=None):
+        """Start an upload and preallocate its file; returns the manifest"""
+        extension = os.path.splitext(filename or "")[1].lower()
+        if self.allowed_extensions is not None and extension not in self.allowed_extensions:
+            raise UploadError(f"Unsupported file type: {extension or 'none'}")
+        # bool is an int subclass, but True is not a size
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise UploadError("size must be a positive number of bytes")
+        if chunk_size is None:
+            chunk_size = DEFAULT_CHUNK_SIZE
+        if not isinstance(chunk_size, int) or isinstance(chunk_size, bool):
+            raise UploadError("chunk_size must be a number of bytes")
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise UploadError(f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE}")
+
+        upload_dir = self._dir(upload_id)
+        os.makedirs(os.path.join(upload_dir, "chunks"), exist_ok=True)
+        manifest = {
+            "upload_id": upload_id,
+            "filename": f"source{extension}",
+            "size": size,
+            "chunk_size": chunk_size,
+            "chunk_count": -(-size // chunk_size),
+            "created_at": datetime.now().isoformat(),
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(upload_dir, manifest["filename"] + ".part"), "wb") as f:
+            f.truncate(size)
+        tmp_path = os.path.join(upload_dir, MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(upload_dir, MANIFEST_FILE))
+        return manifest
+
+    def manifest(self, upload_id):
+        """Return an upload's manifest, or None"""
+        try:
+            with open(os.path.join(self._dir(upload_id), MANIFEST_FILE)) as f:
+                return json.load(f)
+        except (KeyError, OSError):
+            return None
+
+    def chunk_length(self, manifest, index):
+        """Expected byte length of chunk `index`"""
+        start = index * manifest["chunk_size"]
+        return min(manifest["chunk_size"], manifest["size"] - start)
+
+    def write_chunk(self, upload_id, index, stream, checksum):
+        """Stream one chunk into place and mark it received if `checksum` matches
+
+        `stream` is a file-like object (the request body) and `checksum` the
+        chunk's hex SHA-256. Rewriting an already received chunk is allowed;
+        it counts as missing again until the new bytes pass their checksum.
+        """
+        manifest = self.manifest(upload_id)
+        if manifest is None:
+            raise KeyError(upload_id)
+        if not 0 <= index < manifest["chunk_count"]:
+            raise UploadError(f"Chunk index out of range: {index}")
+        if not checksum:
+            raise UploadError("Missing chunk checksum")
+
+        upload_dir = self._dir(upload_id)
+        part_path = os.path.join(upload_dir, manifest["filename"] + ".part")
+        if not os.path.exists(part_path):
+            raise UploadError("Upload is already complete")
+
+        # The bytes on disk are about to change, so the chunk is no longer
+        # received until they are checked; a rejected resend leaves it missing
+        marker = os.path.join(upload_dir, "chunks", str(index))
+        try:
+            os.unlink(marker)
+        except FileNotFoundError:
+            pass
+
+        expected = self.chunk_length(manifest, index)
+        offset = index * manifest["chunk_size"]
+        digest = hashlib.sha256()
+        written = 0
+        fd = os.open(part_path, os.O_WRONLY)
+        try:
+            while written < expected:
+                data = stream.read(min(READ_SIZE, expected - written))
+                if not data:
+                    break
+                os.pwrite(fd, data, offset + written)
+                digest.update(data)
+                written += len(data)
+            if written == expected and stream.read(1):
+                raise UploadError(f"Chunk {index} is longer than {expected} bytes")
+        finally:
+            os.close(fd)
+
+        if written != expected:
+            raise UploadError(f"Chunk {index} has {written} bytes, expected {expected}")
+        if digest.hexdigest() != checksum.lower():
+            raise UploadError(f"Checksum mismatch for chunk {index}")
+
+        with open(marker + ".tmp", "w") as f:
+            f.write(digest.hexdigest())
+        os.replace(marker + ".tmp", marker)
+        return self.status(upload_id, manifest)
+
+    def received(self, upload_id):
+        """Sorted indexes of the chunks received so far"""
+        chunks_dir = os.path.join(self._dir(upload_id), "chunks")
+        return sorted(int(name) for name in os.listdir(chunks_dir) if name.isdigit())
+
+    def status(self, upload_id, manifest=None):
+        """Progress of an upload, including the chunks still missing"""
+        manifest = manifest or self.manifest(upload_id)
+        if manifest is None:
+            return None
+        received = self.received(upload_id)
+        have = set(received)
+        missing = [i for i in range(manifest["chunk_count"]) if i not in have]
+        # Chunks 0..n-1 all present: that many leading bytes can be read already
+        prefix_chunks = missing[0] if missing else manifest["chunk_count"]
+        final_path = os.path.join(self._dir(upload_id), manifest["filename"])
+        return {
+            "upload_id": upload_id,
+            "size": manifest["size"],
+            "chunk_size": manifest["chunk_size"],
+            "chunk_count": manifest["chunk_count"],
+            "received": len(received),
+            "missing": missing,
+            "ready_bytes": min(prefix_chunks * manifest["chunk_size"], manifest["size"]),
+            "complete": not missing,
+            "finished": os.path.exists(final_path),
+        }
+
+    def part_path(self, upload_id):
+        """Path of the file being assembled, readable up to the status's `ready_bytes`"""
+        manifest = self.manifest(upload_id)
+        if manifest is None:
+            raise KeyError(upload_id)
+        return os.path.join(self._dir(upload_id), manifest["filename"] + ".part")
+
+    def finish(self, upload_id):
+        """Move a fully received upload into place; returns the final file path"""
+        manifest = self.manifest(upload_id)
+        if manifest is None:
+            raise KeyError(upload_id)
+        upload_dir = self._dir(upload_id)
+        final_path = os.path.join(upload_dir, manifest["filename"])
+        if os.path.exists(final_path):
+            return final_path
+        status = self.status(upload_id, manifest)
+        if not status["complete"]:
+            raise UploadError(f"{len(status['missing'])} chunks are still missing")
+        os.replace(final_path + ".part", final_path)
+        return final_path
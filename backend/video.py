@@ -0,0 +1,116 @@
+"""Streaming decode of recorded match videos
+
+Videos are walked once, front to back, with OpenCV's ffmpeg backend. Frames
+between samples are only grabbed (demuxed and decoded, never converted), and
+sampled frames are written into one reused batch buffer, so memory stays
+bounded by the batch size whatever the video's length.
+
+Analyzers consume videos incrementally through two optional methods:
+`feed(timestamps, frames)` for each batch of kept frames, then `finish()`
+for the result.
+"""
+import os
+
+import cv2
+import numpy as np
+
+from backend.dedup import FrameFilter
+from backend.jobs import JobCancelled
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mkv", ".webm")
+
+DEFAULT_SAMPLE_FPS = 10
+DEFAULT_BATCH_SIZE = 32
+
+
+def _open(path):
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video: {os.path.basename(path)}")
+    return capture
+
+
+def probe_video(path):
+    """Frame rate, frame count, duration and resolution of a video file"""
+    capture = _open(path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        capture.release()
+    return {
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": frame_count / fps if fps else 0.0,
+        "resolution": f"{width}x{height}",
+    }
+
+
+def iter_video_batches(path, sample_fps=DEFAULT_SAMPLE_FPS, batch_size=DEFAULT_BATCH_SIZE, start=0.0, end=None):
+    """Yield (timestamps, frames) batches sampled at `sample_fps` from `start` to `end` seconds
+
+    `frames` is an (n, height, width, 3) BGR view into a buffer that is
+    reused for the next batch; consumers must finish with (or copy) it before
+    asking for more. Seeking to `start` lands on the nearest keyframe, so the
+    first timestamps may precede it slightly.
+    """
+    capture = _open(path)
+    try:
+        if start:
+            capture.set(cv2.CAP_PROP_POS_MSEC, start * 1000.0)
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or sample_fps
+        interval = 1.0 / min(sample_fps, source_fps)
+
+        buffer = None
+        timestamps = np.empty(batch_size, dtype=np.float64)
+        count = 0
+        next_sample = None
+        while capture.grab():
+            timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if end is not None and timestamp > end:
+                break
+            if next_sample is not None and timestamp < next_sample:
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                continue
+            if buffer is None:
+                buffer = np.empty((batch_size, *frame.shape), dtype=frame.dtype)
+            buffer[count] = frame
+            timestamps[count] = timestamp
+            count += 1
+            next_sample = (next_sample if next_sample is not None else timestamp) + interval
+            if count == batch_size:
+                yield timestamps[:count], buffer[:count]
+                count = 0
+        if count:
+            yield timestamps[:count], buffer[:count]
+    finally:
+        capture.release()
+
+
+def analyze_video(analyzer, path, sample_fps=DEFAULT_SAMPLE_FPS, batch_size=DEFAULT_BATCH_SIZE, dedup=True,
+                  cancel_event=None):
+    """Stream a video through an analyzer's feed()/finish() interface
+
+    Near-duplicate frames are dropped by backend.dedup first unless `dedup`
+    is False. Returns (analyzer result, frame timeline dict). Raises
+    JobCancelled between batches once `cancel_event` is set.
+    """
+    if not hasattr(analyzer, "feed"):
+        raise TypeError(f"{type(analyzer).__name__} does not support streaming analysis")
+
+    frame_filter = FrameFilter()
+    for timestamps, frames in iter_video_batches(path, sample_fps, batch_size):
+        if cancel_event is not None and cancel_event.is_set():
+            raise JobCancelled()
+        if dedup:
+            decisions = frame_filter.check_batch(frames, timestamps)
+            keep = np.fromiter((d.keep for d in decisions), dtype=bool, count=len(decisions))
+            if not keep.any():
+                continue
+            timestamps, frames = timestamps[keep], frames[keep]
+        analyzer.feed(timestamps, frames)
+    return analyzer.finish(), frame_filter.timeline.to_dict()
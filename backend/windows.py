@@ -0,0 +1,227 @@
+"""Windowed, checkpointed analysis of match recordings
+
+A recording is analyzed in fixed windows of match time. For every window
+the analyzer's expensive per-frame work produces a small set of feature
+arrays, cached under the match directory; its cheap metric accumulators are
+then updated and checkpointed atomically. A worker that dies mid-match
+resumes at the first window after the checkpoint, and a re-analysis after a
+rule change replays the cached features without decoding the video at all.
+
+Windowed analyzers implement three methods:
+
+    extract_features(timestamps, frames) -> {name: array}
+    accumulate(accumulator, features) -> accumulator    (JSON-serializable)
+    summarize(accumulator) -> analysis result
+
+`accumulate(None, ...)` starts a fresh accumulator. Bump a class-level
+`feature_version` whenever extract_features changes so stale caches are
+ignored.
+
+A run can be given a cancel event (anything with `is_set()`, e.g. a
+multiprocessing Event); it is checked between windows, so a cancelled
+analysis stops decoding and leaves the last checkpoint to resume from.
+
+A run can also stop at `max_seconds` of the recording, e.g. the part of a
+chunked upload that is already on disk (see backend.containers); the run
+on the finished file then resumes after the windows done so far.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from backend.dedup import FrameFilter
+from backend.jobs import JobCancelled
+from backend.video import DEFAULT_BATCH_SIZE, DEFAULT_SAMPLE_FPS, analyze_video, iter_video_batches, probe_video
+
+CHECKPOINT_FILE = "checkpoint.json"
+FEATURES_DIR = "windows"
+
+DEFAULT_WINDOW_SECONDS = 60
+
+# Leading bytes of a recording hashed into its fingerprint
+_HEADER_BYTES = 64 * 1024
+
+# Key of the window's frame timeline inside its cached feature file
+_TIMELINE_KEY = "__timeline__"
+
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class WindowedAnalysis:
+    """Drive a windowed analyzer over one match's recording"""
+
+    def __init__(self, match_dir, window_seconds=DEFAULT_WINDOW_SECONDS, sample_fps=DEFAULT_SAMPLE_FPS):
+        self.match_dir = match_dir
+        self.window_seconds = window_seconds
+        self.sample_fps = sample_fps
+
+    def _fingerprint(self, analyzer, video_path):
+        """Identify the inputs the cached features were computed from
+
+        The recording is identified by its size and leading bytes, which hold
+        the container header, not by its name: a chunked upload's .part file
+        and the finished file it is renamed to share a fingerprint.
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        with open(video_path, "rb") as f:
+            digest.update(f.read(_HEADER_BYTES))
+        digest.update(json.dumps([
+            os.path.getsize(video_path), self.window_seconds, self.sample_fps,
+            type(analyzer).__name__, getattr(analyzer, "feature_version", 1),
+        ]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _features_path(self, fingerprint, index):
+        return os.path.join(self.match_dir, FEATURES_DIR, fingerprint, f"{index:05d}.npz")
+
+    def load_checkpoint(self):
+        """Return the saved checkpoint, or None"""
+        try:
+            with open(os.path.join(self.match_dir, CHECKPOINT_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_features(self, fingerprint, index):
+        """Return (features, frame timeline) of a cached window, or None"""
+        try:
+            with np.load(self._features_path(fingerprint, index)) as data:
+                features = {name: data[name] for name in data.files if name != _TIMELINE_KEY}
+                timeline = json.loads(str(data[_TIMELINE_KEY]))
+        except (OSError, ValueError, KeyError):
+            return None
+        return features, timeline
+
+    def _save_features(self, fingerprint, index, features, timeline):
+        path = self._features_path(fingerprint, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **features, **{_TIMELINE_KEY: np.array(json.dumps(timeline))})
+        os.replace(tmp_path, path)
+
+    def _drop_stale_features(self, fingerprint):
+        features_root = os.path.join(self.match_dir, FEATURES_DIR)
+        if os.path.isdir(features_root):
+            for name in os.listdir(features_root):
+                if name != fingerprint:
+                    shutil.rmtree(os.path.join(features_root, name), ignore_errors=True)
+
+    def _frames_per_window(self):
+        """Most frames a window can sample, which spaces the windows' frame numbers"""
+        return int(np.ceil(self.window_seconds * self.sample_fps))
+
+    def _window_features(self, analyzer, video_path, index, frame_filter):
+        start = index * self.window_seconds
+        end = start + self.window_seconds
+        extracted = []
+        for timestamps, frames in iter_video_batches(
+            video_path, self.sample_fps, DEFAULT_BATCH_SIZE, start=start, end=end
+        ):
+            # Seeking lands on a keyframe before `start`; those frames belong to the previous window
+            keep = (timestamps >= start) & (timestamps < end)
+            decisions = frame_filter.check_batch(frames[keep], timestamps[keep])
+            keep[keep] = [d.keep for d in decisions]
+            if keep.any():
+                extracted.append(analyzer.extract_features(timestamps[keep], frames[keep]))
+
+        # Concatenate batch features so each window caches one array per feature
+        if not extracted:
+            return {}
+        return {
+            name: np.concatenate([np.atleast_1d(batch[name]) for batch in extracted])
+            for name in extracted[0]
+        }
+
+    def run(self, analyzer, video_path, cancel_event=None, max_seconds=None):
+        """Analyze the recording, resuming from the last checkpoint
+
+        With `max_seconds`, only windows that end by that point of the
+        recording are processed and None is returned if any remain; a later
+        call continues from there. Otherwise returns (result, frame timeline
+        dict). Raises JobCancelled once `cancel_event` is set.
+        """
+        duration = probe_video(video_path)["duration"]
+        window_count = max(1, int(np.ceil(duration / self.window_seconds)))
+        fingerprint = self._fingerprint(analyzer, video_path)
+
+        checkpoint = self.load_checkpoint()
+        if checkpoint is None or checkpoint.get("fingerprint") != fingerprint:
+            self._drop_stale_features(fingerprint)
+            checkpoint = {
+                "fingerprint": fingerprint,
+                "window_seconds": self.window_seconds,
+                "window_count": window_count,
+                "completed": 0,
+                "accumulator": None,
+                "timeline": {"analyzed": 0, "skipped": 0, "segments": []},
+            }
+        checkpoint["window_count"] = window_count
+
+        for index in range(checkpoint["completed"], window_count):
+            if max_seconds is not None and (index + 1) * self.window_seconds > max_seconds:
+                return None
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled()
+            cached = self._load_features(fingerprint, index)
+            if cached is None:
+                # Each window starts a fresh filter (its cache must not depend on
+                # the windows before it) but numbers frames within the recording
+                frame_filter = FrameFilter(first_seq=index * self._frames_per_window() + 1)
+                features = self._window_features(analyzer, video_path, index, frame_filter)
+                timeline = frame_filter.timeline.to_dict()
+                self._save_features(fingerprint, index, features, timeline)
+            else:
+                features, timeline = cached
+            checkpoint["timeline"]["analyzed"] += timeline["analyzed"]
+            checkpoint["timeline"]["skipped"] += timeline["skipped"]
+            checkpoint["timeline"]["segments"].extend(timeline["segments"])
+
+            checkpoint["accumulator"] = analyzer.accumulate(checkpoint["accumulator"], features)
+            checkpoint["completed"] = index + 1
+            _write_json_atomic(os.path.join(self.match_dir, CHECKPOINT_FILE), checkpoint)
+
+        return analyzer.summarize(checkpoint["accumulator"]), checkpoint["timeline"]
+
+    def reanalyze(self, analyzer):
+        """Rebuild the result from cached window features, e.g. after a rule change
+
+        Raises LookupError when the features of a completed analysis are not
+        cached (run() has to decode the recording again).
+        """
+        checkpoint = self.load_checkpoint()
+        if checkpoint is None or checkpoint["completed"] < checkpoint["window_count"]:
+            raise LookupError("No completed windowed analysis to replay")
+
+        accumulator = None
+        for index in range(checkpoint["window_count"]):
+            cached = self._load_features(checkpoint["fingerprint"], index)
+            if cached is None:
+                raise LookupError(f"Features of window {index} are not cached")
+            accumulator = analyzer.accumulate(accumulator, cached[0])
+        checkpoint["accumulator"] = accumulator
+        _write_json_atomic(os.path.join(self.match_dir, CHECKPOINT_FILE), checkpoint)
+        return analyzer.summarize(accumulator), checkpoint["timeline"]
+
+
+def analyze_recording(analyzer, match_dir, video_path, sample_fps=DEFAULT_SAMPLE_FPS, cancel_event=None,
+                      max_seconds=None):
+    """Analyze a recording windowed when the analyzer supports it, else streamed in one pass
+
+    A streamed analysis cannot stop part way and resume, so with
+    `max_seconds` it does nothing and returns None.
+    """
+    if hasattr(analyzer, "extract_features"):
+        windows = WindowedAnalysis(match_dir, sample_fps=sample_fps)
+        return windows.run(analyzer, video_path, cancel_event, max_seconds)
+    if max_seconds is not None:
+        return None
+    return analyze_video(analyzer, video_path, sample_fps, cancel_event=cancel_event)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Compare per-match SimpleAnalyzer.analyze() with the vectorized analyze_batch()
+
+Both sides do the same work: simulate metrics, pick recommendations and
+write the summary of every match, returning the result dicts. Neither
+writes files (analyze(save=False) for the analyzers that save by default),
+so the timings measure analysis alone.
+
+The batch path is about 3-4x faster at 10-20k matches, well short of the
+20x that was targeted. Simulating the metrics and choosing recommendations
+are vectorized, but every match still needs its own nested metrics dict
+and summary string, and building those takes most of the batch time. A
+larger gain needs callers that can consume the MetricBatch arrays directly
+instead of per-match dicts.
+
+Also times regenerating recommendations for an archive of stored metrics,
+one match at a time versus one vectorized RuleSet.recommend_batch() call.
+
+Usage: python benchmarks/bench_batch_analyzer.py [match_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def bench(label, analyzer_cls, matches, **analyze_kwargs):
+    """Time both code paths for one analyzer class and print the speedup"""
+    start = time.perf_counter()
+    for match in matches:
+        analyzer_cls(*match).analyze(**analyze_kwargs)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = analyzer_cls.analyze_batch(matches)
+    batch_time = time.perf_counter() - start
+    assert len(results) == len(matches)
+
+    print(f"{label}:")
+    print(f"  analyze() loop   {loop_time:8.3f}s  ({len(matches) / loop_time:10.0f} matches/s)")
+    print(f"  analyze_batch()  {batch_time:8.3f}s  ({len(matches) / batch_time:10.0f} matches/s)")
+    print(f"  speedup          {loop_time / batch_time:8.1f}x")
+
+
+def bench_rules(label, rules, results):
+    """Time recommendation regeneration for already analyzed matches"""
+    from backend.batch import MetricBatch
+
+    metrics_list = [result["metrics"] for result in results]
+
+    start = time.perf_counter()
+    for metrics in metrics_list:
+        rules.recommend(metrics)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = MetricBatch.from_metrics(metrics_list)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rules.recommend_batch(batch)
+    batch_time = time.perf_counter() - start
+
+    print(f"{label} recommendations:")
+    print(f"  recommend() loop    {loop_time:8.3f}s")
+    print(f"  dicts -> batch      {load_time:8.3f}s")
+    print(f"  recommend_batch()   {batch_time:8.3f}s")
+    print(f"  speedup             {loop_time / batch_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    matches = [(f"bench_{i}", "Battle Royale", "Erangel") for i in range(count)]
+
+    # The apps create their data directories relative to the working directory
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        import dashboard_server
+        import standalone_app
+
+        bench("dashboard_server.SimpleAnalyzer", dashboard_server.SimpleAnalyzer, matches, save=False)
+        bench("standalone_app.SimpleAnalyzer", standalone_app.SimpleAnalyzer, matches)
+
+        archive = standalone_app.SimpleAnalyzer.analyze_batch(matches)
+        bench_rules("standalone_app", standalone_app.SimpleAnalyzer.RULES, archive)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Measure the CPU cost of the capture loop against its 5% budget
+
+Runs ScreenCapture for a few seconds at the given fps, with one reader
+draining the ring, and reports the process CPU time as a share of one core
+and of the whole machine. Without a display (or with --synthetic) the
+SyntheticCapture stand-in is timed instead; it skips the mss grab, so its
+figure covers the ring and copy overhead only and is a lower bound.
+
+Usage: python benchmarks/bench_capture.py [seconds] [fps] [--synthetic]
+"""
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from backend.capture import ScreenCapture, SyntheticCapture
+
+CPU_BUDGET = 0.05
+
+
+def open_capture(fps, synthetic):
+    if not synthetic:
+        try:
+            return ScreenCapture(fps=fps), "mss"
+        except Exception as e:
+            print(f"No screen to capture ({e}); timing SyntheticCapture")
+    return SyntheticCapture(fps=fps, resolution=(1920, 1080)), "synthetic"
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    seconds = float(args[0]) if args else 5.0
+    fps = int(args[1]) if len(args) > 1 else 10
+    capture, kind = open_capture(fps, "--synthetic" in sys.argv)
+
+    # The draining reader's polling counts too, as it would for a real consumer
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    capture.start()
+    frames = 0
+    while time.perf_counter() - wall_start < seconds:
+        if capture.reader.next_frame() is None:
+            time.sleep(0.5 / fps)
+        else:
+            frames += 1
+    capture.stop()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    stats = capture.stats()
+    capture.close()
+
+    core_share = cpu / wall
+    print(f"{kind} capture, {stats['resolution']} at {fps} fps for {wall:.1f}s:")
+    print(f"  frames read      {frames:8d}  (late {stats['late']}, dropped {stats['dropped']})")
+    print(f"  CPU, one core    {core_share:8.1%}")
+    print(f"  CPU, {os.cpu_count():2d} cores    {core_share / os.cpu_count():8.1%}")
+    print(f"  budget           {CPU_BUDGET:8.1%}  ({'met' if core_share <= CPU_BUDGET else 'exceeded'} on one core)")
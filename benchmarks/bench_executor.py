@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Measure how analysis throughput scales with process pool workers
+
+A synthetic CPU-bound analyzer stands in for GameplayAnalyzer: it walks the
+frames handed over through shared memory and does per-frame Python and NumPy
+work, so a single process is GIL-bound the same way real frame analysis is.
+
+Usage: python benchmarks/bench_executor.py [max_workers] [jobs]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from backend.executor import ProcessPoolAnalysisExecutor
+
+FRAMES_PER_JOB = 40
+FRAME_SHAPE = (108, 192, 3)
+
+
+class SyntheticAnalyzer:
+    """CPU-bound stand-in for GameplayAnalyzer"""
+
+    def __init__(self, match_dir):
+        self.match_dir = match_dir
+
+    def analyze(self, frames=None):
+        score = 0.0
+        for frame in frames:
+            gray = frame.mean(axis=2)
+            for row in gray[::8]:
+                score += float(np.abs(np.diff(row)).sum()) % 1.0
+        return score
+
+
+def run(workers, jobs, frames):
+    """Return analyses per second for a pool of `workers` processes"""
+    executor = ProcessPoolAnalysisExecutor(workers, "bench_executor:SyntheticAnalyzer")
+    executor.warm()
+    try:
+        start = time.perf_counter()
+        futures = [executor.submit(f"bench_{i}", frames) for i in range(jobs)]
+        for future in futures:
+            future.result()
+        return jobs / (time.perf_counter() - start)
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else min(8, os.cpu_count() or 1)
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 255, size=(FRAMES_PER_JOB, *FRAME_SHAPE), dtype=np.uint8)
+
+    print(f"{os.cpu_count()} CPUs, {jobs} jobs of {FRAMES_PER_JOB} frames")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        rate = run(workers, jobs, frames)
+        baseline = baseline or rate
+        speedup = rate / baseline
+        print(f"  {workers} workers: {rate:8.1f} jobs/s  speedup {speedup:4.2f}x  efficiency {speedup / workers:4.0%}")
+        workers *= 2
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Time pro-player nearest-neighbour queries against an exact search
+
+Builds an index of a synthetic reference set, memory-maps it like the apps
+do, and runs queries both near the reference matches and anywhere in the
+metric space. Latency is reported per nprobe, together with recall: the
+share of the exact k nearest pros (found by scanning every vector) that
+the index returns.
+
+Usage: python benchmarks/bench_pros.py [reference matches] [queries]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+K = 5
+NPROBES = (4, 8, 16, 32)
+
+
+def exact_pros(index, query, k):
+    """Players of the k nearest reference matches (one per pro), by full scan"""
+    query = query * index.scale
+    distances = index.norms - 2 * (index.scaled @ query) + query @ query
+    order = np.argsort(distances)
+    _, first = np.unique(index.players[order], return_index=True)
+    return set(index.players[order[np.sort(first)[:k]]].tolist())
+
+
+if __name__ == "__main__":
+    from backend.pros import ProIndex, build_index, simulate_reference
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        vectors, players, profiles = simulate_reference(count, rng=rng)
+        start = time.perf_counter()
+        lists = build_index(vectors, players, profiles, index_dir, rng=rng)
+        print(f"Indexed {count} matches of {len(profiles)} pros in {lists} clusters"
+              f" in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        index = ProIndex(index_dir)
+        print(f"Loaded (memory-mapped) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        near = vectors[rng.choice(count, query_count // 2)] + rng.normal(0, 0.03, (query_count // 2, 12))
+        anywhere = rng.uniform(0.3, 0.95, (query_count - len(near), 12))
+        queries = np.vstack([near, anywhere]).astype(np.float32)
+        truth = [exact_pros(index, query, K) for query in queries]
+
+        for nprobe in NPROBES:
+            latencies, found = [], 0
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                rows, _ = index.search(query, K, nprobe)
+                latencies.append(time.perf_counter() - start)
+                found += len(expected & set(index.players[rows].tolist()))
+            latencies = np.array(latencies) * 1000
+            print(f"  nprobe {nprobe:3d}  p50 {np.percentile(latencies, 50):5.2f} ms"
+                  f"  p99 {np.percentile(latencies, 99):5.2f} ms  recall@{K} {found / (K * len(queries)):.3f}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Load test the Flask dashboard server against its ASGI (FastAPI) variant
+
+Both servers are started on their own ports against a fresh data directory
+seeded with simulated matches. A pool of keep-alive asyncio clients then
+hits each route for a fixed time (reconnecting after every response when
+the server does not keep connections alive); requests per second and p50/p99 latency
+are reported per server and route.
+
+Usage: python benchmarks/bench_servers.py [seconds per route] [concurrency]
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED_MATCHES = 50
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command, port, data_dir):
+    env = {**os.environ, "PORT": str(port), "PYTHONPATH": REPO_ROOT}
+    process = subprocess.Popen(
+        command, cwd=data_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/status", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{command} did not start on port {port}")
+
+
+async def fetch(reader, writer, path):
+    """One GET; returns (status code, whether the server keeps the connection open)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\nAccept-Encoding: gzip\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        # HTTP/1.0 style: the body runs until the server closes the connection
+        await reader.read()
+    version, status = lines[0].split()[:2]
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    return int(status), keep_alive
+
+
+async def client(port, path, stop_at, latencies):
+    """Send requests back to back, reconnecting whenever the server closes the connection"""
+    connection = None
+    try:
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            if connection is None:
+                connection = await asyncio.open_connection("127.0.0.1", port)
+            status, keep_alive = await fetch(*connection, path)
+            if status != 200:
+                raise RuntimeError(f"GET {path} returned {status}")
+            latencies.append(time.perf_counter() - start)
+            if not keep_alive:
+                connection[1].close()
+                connection = None
+    finally:
+        if connection is not None:
+            connection[1].close()
+
+
+async def load(port, path, seconds, concurrency):
+    latencies = []
+    stop_at = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, path, stop_at, latencies) for _ in range(concurrency)))
+    return latencies
+
+
+def seed(port):
+    match_id = None
+    for _ in range(SEED_MATCHES):
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/api/simulate-match", data=b"{}",
+            headers={"Content-Type": "application/json"}
+        )
+        match_id = json.load(urllib.request.urlopen(request))["match_id"]
+    return match_id
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Both servers run from the same directory, so they share one match store
+        ports = {"flask": free_port(), "asgi": free_port()}
+        processes = {}
+        try:
+            processes["flask"] = start_server(
+                [sys.executable, os.path.join(REPO_ROOT, "dashboard_server.py")], ports["flask"], data_dir
+            )
+            match_id = seed(ports["flask"])
+            routes = ["/status", f"/api/analysis/{match_id}", "/api/matches?limit=20"]
+            processes["asgi"] = start_server(
+                [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(ports["asgi"]),
+                 "--log-level", "warning"],
+                ports["asgi"], data_dir
+            )
+
+            print(f"{concurrency} keep-alive clients, {seconds:g}s per route, {SEED_MATCHES} matches")
+            for route in routes:
+                for name, port in ports.items():
+                    latencies = np.array(asyncio.run(load(port, route, seconds, concurrency))) * 1000
+                    print(f"  {name:5s} {route[:32]:32s} {len(latencies) / seconds:8.0f} req/s"
+                          f"  p50 {np.percentile(latencies, 50):6.1f} ms"
+                          f"  p99 {np.percentile(latencies, 99):6.1f} ms")
+        finally:
+            for process in processes.values():
+                process.terminate()
+                process.wait()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Load test the static page servers
+
+Compares the handler the page servers used to run (socketserver.TCPServer
+plus SimpleHTTPRequestHandler) with backend.static_server, both serving
+the repository root from their own process. Each file is fetched by a pool
+of asyncio clients for a fixed time, first on its own and then while one
+client holds a connection open without finishing its request, like a
+stalled mobile client.
+
+Usage: python benchmarks/bench_static.py [seconds per run] [concurrency]
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FILES = ["/index.html", "/static_demo.html"]
+
+SERVERS = {
+    "tcpserver": (
+        "import http.server, socketserver, sys\n"
+        "socketserver.TCPServer.allow_reuse_address = True\n"
+        "socketserver.TCPServer(('127.0.0.1', int(sys.argv[1])),"
+        " http.server.SimpleHTTPRequestHandler).serve_forever()\n"
+    ),
+    "static": (
+        "import sys\n"
+        "from backend.static_server import serve\n"
+        "serve('.', '127.0.0.1', int(sys.argv[1]))\n"
+    ),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(code, port):
+    process = subprocess.Popen(
+        [sys.executable, "-c", code, str(port)], cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+async def fetch(reader, writer, path):
+    """One GET; returns whether the server keeps the connection open"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    if lines[0].split()[1] != "200":
+        raise RuntimeError(f"GET {path}: {lines[0]}")
+    await reader.readexactly(int(headers["content-length"]))
+    return lines[0].startswith("HTTP/1.1") and headers.get("connection", "").lower() != "close"
+
+
+async def client(port, path, stop_at, latencies):
+    connection = None
+    try:
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            # A blocked server may not even accept; give up shortly after the run ends
+            timeout = stop_at - start + 1
+            if connection is None:
+                connection = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+            keep_alive = await asyncio.wait_for(fetch(*connection, path), timeout)
+            latencies.append(time.perf_counter() - start)
+            if not keep_alive:
+                connection[1].close()
+                connection = None
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        if connection is not None:
+            connection[1].close()
+
+
+async def load(port, path, seconds, concurrency, stalled):
+    latencies = []
+    stall = None
+    if stalled:
+        # Half a request line, never finished
+        stall = await asyncio.open_connection("127.0.0.1", port)
+        stall[1].write(b"GET / HT")
+        await asyncio.sleep(0.1)
+    stop_at = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, path, stop_at, latencies) for _ in range(concurrency)))
+    if stall is not None:
+        stall[1].close()
+    return latencies
+
+
+def report(name, path, latencies, seconds):
+    if not latencies:
+        print(f"  {name:9s} {path:18s}        0 req/s  (no responses)")
+        return
+    latencies = np.array(latencies) * 1000
+    print(f"  {name:9s} {path:18s} {len(latencies) / seconds:8.0f} req/s"
+          f"  p50 {np.percentile(latencies, 50):6.1f} ms  p99 {np.percentile(latencies, 99):6.1f} ms")
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    for stalled in (False, True):
+        print(f"{concurrency} clients, {seconds:g}s per file" + (", one stalled client" if stalled else ""))
+        for path in FILES:
+            for name, code in SERVERS.items():
+                # A fresh server per run, so a stalled connection does not carry over
+                port = free_port()
+                process = start_server(code, port)
+                try:
+                    latencies = asyncio.run(load(port, path, seconds, concurrency, stalled))
+                finally:
+                    process.terminate()
+                    process.wait()
+                report(name, path, latencies, seconds)
@@ -1,17 +1,15 @@
-import http.server
-import socketserver
-import os
+from backend.static_server import StaticFileHandler, StaticServer
 
 PORT = 5003
 DIRECTORY = "."
 
-class Handler(http.server.SimpleHTTPRequestHandler):
+class Handler(StaticFileHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=DIRECTORY, **kwargs)
     
     def log_message(self, format, *args):
         print(format % args)
 
-with socketserver.TCPServer(("0.0.0.0", PORT), Handler) as httpd:
+with StaticServer(("0.0.0.0", PORT), Handler) as httpd:
     print(f"Serving at http://0.0.0.0:{PORT}")
     httpd.serve_forever()
\ No newline at end of file
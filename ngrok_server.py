@@ -3,6 +3,10 @@ import json
 import os
 import time
 import uuid
+
+from backend.artifacts import write_analysis
+from backend.batch import CATEGORY_LABELS, METRIC_LAYOUT, MetricBatch
+from backend.recommendations import DEMO_RULES
 from pyngrok import ngrok
 import atexit
 
@@ -17,6 +21,25 @@ os.makedirs(matches_dir, exist_ok=True)
 active_matches = {}
 
 class SimpleAnalyzer:
+    # (min, max) range of each simulated metric score
+    SCORE_RANGES = {
+        ("aim", "accuracy"): (0.5, 0.95),
+        ("aim", "reaction_time"): (0.4, 0.9),
+        ("aim", "recoil_control"): (0.3, 0.85),
+        ("aim", "headshot_percentage"): (0.1, 0.6),
+        ("positioning", "cover_usage"): (0.4, 0.9),
+        ("positioning", "movement_efficiency"): (0.3, 0.85),
+        ("positioning", "zone_awareness"): (0.5, 0.95),
+        ("positioning", "rotation_timing"): (0.4, 0.9),
+        ("decision_making", "engagement_choices"): (0.3, 0.8),
+        ("decision_making", "item_management"): (0.4, 0.9),
+        ("decision_making", "tactical_planning"): (0.3, 0.85),
+        ("decision_making", "team_coordination"): (0.2, 0.7),
+    }
+    
+    # Compiled recommendation rules, see backend/recommendations.py
+    RULES = DEMO_RULES
+    
     def __init__(self, match_id, game_mode, map_name):
         self.match_id = match_id
         self.game_mode = game_mode
@@ -25,31 +48,16 @@ class SimpleAnalyzer:
         self.recommendations = []
         self.summary = ""
         
-    def analyze(self):
+    def analyze(self, save=True):
         """Analyze the gameplay (simulation)"""
         # Simulate metrics for aim
-        self.metrics["aim"] = {
-            "accuracy": self._simulate_score(0.5, 0.95),
-            "reaction_time": self._simulate_score(0.4, 0.9),
-            "recoil_control": self._simulate_score(0.3, 0.85),
-            "headshot_percentage": self._simulate_score(0.1, 0.6)
-        }
+        self.metrics["aim"] = self._simulate_category("aim")
         
         # Simulate metrics for positioning
-        self.metrics["positioning"] = {
-            "cover_usage": self._simulate_score(0.4, 0.9),
-            "movement_efficiency": self._simulate_score(0.3, 0.85),
-            "zone_awareness": self._simulate_score(0.5, 0.95),
-            "rotation_timing": self._simulate_score(0.4, 0.9)
-        }
+        self.metrics["positioning"] = self._simulate_category("positioning")
         
         # Simulate metrics for decision making
-        self.metrics["decision_making"] = {
-            "engagement_choices": self._simulate_score(0.3, 0.8),
-            "item_management": self._simulate_score(0.4, 0.9),
-            "tactical_planning": self._simulate_score(0.3, 0.85),
-            "team_coordination": self._simulate_score(0.2, 0.7)
-        }
+        self.metrics["decision_making"] = self._simulate_category("decision_making")
         
         # Generate recommendations based on metrics
         self._generate_recommendations()
@@ -58,21 +66,71 @@ class SimpleAnalyzer:
         self._generate_summary()
         
         # Prepare and return analysis results
-        result = {
+        result = self._build_result(time.strftime("%Y-%m-%d %H:%M:%S"))
+        
+        # Save analysis to a file
+        if save:
+            self._save_result(result)
+            
+        return result
+    
+    @classmethod
+    def analyze_batch(cls, matches, save=False, rng=None):
+        """Analyze many (match_id, game_mode, map_name) tuples in one vectorized pass
+        
+        Returns the same per-match dicts as analyze(). Results are only written
+        to disk when `save` is set, since batch replays usually persist elsewhere.
+        """
+        batch = MetricBatch.simulate(len(matches), cls.SCORE_RANGES, rng)
+        analysis_time = time.strftime("%Y-%m-%d %H:%M:%S")
+        combinations, combination_of = cls.RULES.combinations_batch(batch)
+        # A summary only depends on these four values, so each distinct one is written once
+        summaries = {}
+        results = []
+        for (match_id, game_mode, map_name), metrics, combination, strongest, weakest in zip(
+            matches, batch.iter_metrics(), combination_of.tolist(), batch.strongest.tolist(), batch.weakest.tolist()
+        ):
+            key = (strongest, weakest, game_mode, map_name)
+            summary = summaries.get(key)
+            if summary is None:
+                summary = summaries[key] = cls._summary_text(
+                    CATEGORY_LABELS[strongest], CATEGORY_LABELS[weakest], game_mode, map_name
+                )
+            results.append({
+                "match_id": match_id,
+                "analysis_time": analysis_time,
+                "metrics": metrics,
+                "recommendations": list(combinations[combination]),
+                "summary": summary
+            })
+        if save:
+            for result in results:
+                cls._save_result(result)
+        return results
+    
+    def _build_result(self, analysis_time):
+        """Assemble the analysis result dict"""
+        return {
             "match_id": self.match_id,
-            "analysis_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "analysis_time": analysis_time,
             "metrics": self.metrics,
             "recommendations": self.recommendations,
             "summary": self.summary
         }
-        
-        # Save analysis to a file
-        match_dir = os.path.join(matches_dir, self.match_id)
+    
+    @staticmethod
+    def _save_result(result):
+        """Write the analysis result and its compressed variants to the match directory"""
+        match_dir = os.path.join(matches_dir, result["match_id"])
         os.makedirs(match_dir, exist_ok=True)
-        with open(os.path.join(match_dir, "analysis.json"), "w") as f:
-            json.dump(result, f, indent=2)
-            
-        return result
+        write_analysis(match_dir, result)
+    
+    def _simulate_category(self, category):
+        """Simulate every metric score of one category"""
+        return {
+            name: self._simulate_score(*self.SCORE_RANGES[(category, name)])
+            for name in METRIC_LAYOUT[category]
+        }
     
     def _simulate_score(self, min_val, max_val):
         """Simulate a performance score"""
@@ -81,64 +139,7 @@ class SimpleAnalyzer:
     
     def _generate_recommendations(self):
         """Generate recommendations based on metrics"""
-        # Check aim metrics
-        if self.metrics["aim"]["accuracy"] < 0.7:
-            self.recommendations.append({
-                "category": "aim",
-                "title": "Improve Aim Accuracy",
-                "description": "Practice target tracking in training mode for 15 minutes daily.",
-                "priority": "high"
-            })
-        
-        if self.metrics["aim"]["recoil_control"] < 0.6:
-            self.recommendations.append({
-                "category": "aim",
-                "title": "Enhance Recoil Control",
-                "description": "Practice spray patterns with AR and SMG weapons on static targets.",
-                "priority": "medium"
-            })
-            
-        # Check positioning metrics
-        if self.metrics["positioning"]["cover_usage"] < 0.6:
-            self.recommendations.append({
-                "category": "positioning",
-                "title": "Utilize Cover Better",
-                "description": "Always prioritize moving between cover points rather than open areas.",
-                "priority": "high"
-            })
-            
-        if self.metrics["positioning"]["zone_awareness"] < 0.7:
-            self.recommendations.append({
-                "category": "positioning",
-                "title": "Improve Zone Management",
-                "description": "Plan your movements based on zone predictions earlier in the match.",
-                "priority": "medium"
-            })
-            
-        # Check decision making metrics
-        if self.metrics["decision_making"]["engagement_choices"] < 0.6:
-            self.recommendations.append({
-                "category": "decision_making",
-                "title": "Better Engagement Decisions",
-                "description": "Only take fights when you have a positional or equipment advantage.",
-                "priority": "high"
-            })
-            
-        if self.metrics["decision_making"]["item_management"] < 0.7:
-            self.recommendations.append({
-                "category": "decision_making",
-                "title": "Optimize Item Management",
-                "description": "Prioritize picking up essential healing items and ammo before looting other items.",
-                "priority": "low"
-            })
-            
-        # Add general recommendations
-        self.recommendations.append({
-            "category": "general",
-            "title": "Consistent Practice Schedule",
-            "description": "Set aside 30 minutes daily for targeted practice in areas needing improvement.",
-            "priority": "medium"
-        })
+        self.recommendations = self.RULES.recommend(self.metrics)
         
     def _generate_summary(self):
         """Generate an overall summary"""
@@ -156,23 +157,27 @@ class SimpleAnalyzer:
         
         strongest = max(averages, key=averages.get)
         weakest = min(averages, key=averages.get)
-        
-        # Generate the summary
-        self.summary = f"Your gameplay shows {strongest} as your strongest skill area. Focus on improving your {weakest} which needs the most attention. "
+        self.summary = self._summary_text(strongest, weakest, self.game_mode, self.map_name)
+    
+    @staticmethod
+    def _summary_text(strongest, weakest, game_mode, map_name):
+        """Summary for the strongest/weakest area labels, game mode and map"""
+        summary = f"Your gameplay shows {strongest} as your strongest skill area. Focus on improving your {weakest} which needs the most attention. "
         
         # Add specific advice based on the map
-        if self.game_mode.lower() == "battle royale":
-            self.summary += "For Battle Royale, prioritize positioning and zone awareness over aggressive engagements. "
-        elif self.game_mode.lower() == "team deathmatch":
-            self.summary += "In Team Deathmatch, work on quicker reaction times and maintaining high ground control. "
+        if game_mode.lower() == "battle royale":
+            summary += "For Battle Royale, prioritize positioning and zone awareness over aggressive engagements. "
+        elif game_mode.lower() == "team deathmatch":
+            summary += "In Team Deathmatch, work on quicker reaction times and maintaining high ground control. "
             
         # Add map-specific advice
-        if "erangel" in self.map_name.lower():
-            self.summary += "On Erangel, use natural terrain for cover during zone rotations."
-        elif "miramar" in self.map_name.lower():
-            self.summary += "On Miramar, high ground control is essential for spotting enemies at long distances."
-        elif "sanhok" in self.map_name.lower():
-            self.summary += "On Sanhok, quick reflexes and close-combat skills are more important than long-range engagements."
+        if "erangel" in map_name.lower():
+            summary += "On Erangel, use natural terrain for cover during zone rotations."
+        elif "miramar" in map_name.lower():
+            summary += "On Miramar, high ground control is essential for spotting enemies at long distances."
+        elif "sanhok" in map_name.lower():
+            summary += "On Sanhok, quick reflexes and close-combat skills are more important than long-range engagements."
+        return summary
 
 # Routes
 @app.route('/')
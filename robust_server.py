@@ -1,11 +1,12 @@
 import http.server
-import socketserver
 import time
 import socket
 import os
 import signal
 import sys
 
+from backend.static_server import StaticServer
+
 # Very simple HTML page
 HTML_CONTENT = """
 <!DOCTYPE html>
@@ -70,13 +71,19 @@ def signal_handler(sig, frame):
 
 signal.signal(signal.SIGINT, signal_handler)
 
+PAGE = HTML_CONTENT.encode()
+
 class BasicHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep connections open between requests
+    protocol_version = "HTTP/1.1"
+
     def do_GET(self):
         # Respond with our simple HTML
         self.send_response(200)
         self.send_header('Content-type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
         self.end_headers()
-        self.wfile.write(HTML_CONTENT.encode())
+        self.wfile.write(PAGE)
         
     def log_message(self, format, *args):
         # Simple logging
@@ -108,11 +115,9 @@ if __name__ == "__main__":
             print("Please manually kill any processes using port 5000")
             sys.exit(1)
     
-    # Create the HTTP server with allow_reuse_address to help with "Address already in use" errors
-    socketserver.TCPServer.allow_reuse_address = True
-    
+    # Threaded server with allow_reuse_address to help with "Address already in use" errors
     try:
-        with socketserver.TCPServer(("0.0.0.0", PORT), BasicHTTPRequestHandler) as httpd:
+        with StaticServer(("0.0.0.0", PORT), BasicHTTPRequestHandler) as httpd:
             print(f"Server is running at http://0.0.0.0:{PORT}")
             httpd.serve_forever()
     except OSError as e:
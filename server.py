@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
 import os
 import sys
 import time
 import socket
 import signal
 
+from backend.static_server import StaticFileHandler, StaticServer
+
 # Configuration
 PORT = 5000
 DIRECTORY = "."  # Serve from root directory
@@ -134,7 +134,7 @@ if not os.path.exists(DIRECTORY):
 </body>
 </html>""")
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+class MyHTTPRequestHandler(StaticFileHandler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=DIRECTORY, **kwargs)
 
@@ -144,10 +144,12 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         # Special handling for API requests
         if self.path.startswith('/api/'):
+            body = bytes('{"error": "API endpoint not implemented yet"}', 'utf-8')
             self.send_response(501)  # Not Implemented
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(bytes('{"error": "API endpoint not implemented yet"}', 'utf-8'))
+            self.wfile.write(body)
             return
         
         # For all other paths, use the default handler
@@ -180,10 +182,8 @@ def start_server():
     # Try to start the server with multiple attempts
     for attempt in range(MAX_RETRIES):
         try:
-            # Use allow_reuse_address to help with "Address already in use" errors
-            socketserver.TCPServer.allow_reuse_address = True
-            
-            with socketserver.TCPServer(("0.0.0.0", PORT), MyHTTPRequestHandler) as httpd:
+            # One thread per connection; StaticServer also sets allow_reuse_address
+            with StaticServer(("0.0.0.0", PORT), MyHTTPRequestHandler) as httpd:
                 print(f"BGMI Esports Coach server running at http://0.0.0.0:{PORT}")
                 print(f"Serving files from {DIRECTORY}")
                 httpd.serve_forever()
@@ -1,9 +1,13 @@
-from flask import Flask, render_template_string
+from flask import Flask
 import json
 import time
 import random
 
+from backend.assets import register_assets
+from backend.pages import RenderedPage
+
 app = Flask(__name__)
+register_assets(app)
 
 HTML = """
 <!DOCTYPE html>
@@ -11,7 +15,7 @@ HTML = """
 <head>
     <title>BGMI Esports Coach</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/css/bootstrap.min.css" rel="stylesheet">
+    <link href="{{ asset_url('vendor/bootstrap.min.css') }}" rel="stylesheet">
     <style>
         body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f8f9fa; }
         .navbar { background-color: #6200ea !important; }
@@ -274,18 +278,19 @@ HTML = """
         </div>
     </footer>
 
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/js/bootstrap.bundle.min.js"></script>
+    <script src="{{ asset_url('vendor/bootstrap.bundle.min.js') }}"></script>
 </body>
 </html>
 """
 
-@app.route('/')
-def index():
-    # Generate mock data for the demo
+INDEX_PAGE = RenderedPage(app, HTML)
+
+def build_page_context(date):
+    """Mock analysis data for the demo page"""
     match_info = {
         "map_name": "Erangel",
         "game_mode": "Battle Royale - Squad",
-        "date": time.strftime("%B %d, %Y"),
+        "date": date,
         "duration": "24:38"
     }
     
@@ -489,20 +494,24 @@ def index():
         }
     ]
     
-    # Return the template with data
-    return render_template_string(
-        HTML,
-        match_info=match_info,
-        categories=categories,
-        analysis=analysis,
-        strengths=strengths,
-        improvements=improvements,
-        aim_metrics=aim_metrics,
-        weapons=weapons,
-        positioning_metrics=positioning_metrics,
-        decision_metrics=decision_metrics,
-        recommendations=recommendations
-    )
+    return {
+        "match_info": match_info,
+        "categories": categories,
+        "analysis": analysis,
+        "strengths": strengths,
+        "improvements": improvements,
+        "aim_metrics": aim_metrics,
+        "weapons": weapons,
+        "positioning_metrics": positioning_metrics,
+        "decision_metrics": decision_metrics,
+        "recommendations": recommendations
+    }
+
+@app.route('/')
+def index():
+    # The mock data only changes with the date, so render once per day
+    date = time.strftime("%B %d, %Y")
+    return INDEX_PAGE.response(key=date, context=lambda: build_page_context(date))
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001, debug=False)
\ No newline at end of file
@@ -131,11 +131,11 @@ def run_frontend():
         print(f"Current directory: {os.getcwd()}")
         print(f"Contents of {serve_dir}: {os.listdir(serve_dir)}")
             
-        # Use a simple HTTP server to serve the frontend
+        # Serve the frontend with the threaded static server (run from the repo root)
         subprocess.run([
-            sys.executable, "-m", "http.server", str(FRONTEND_PORT),
-            "--bind", "0.0.0.0", "--directory", serve_dir
-        ])
+            sys.executable, "-m", "backend.static_server", str(FRONTEND_PORT),
+            "--bind", "0.0.0.0", "--directory", os.path.abspath(serve_dir)
+        ], cwd=original_dir)
     except Exception as e:
         print(f"Error in frontend server: {str(e)}")
     finally:
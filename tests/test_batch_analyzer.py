@@ -0,0 +1,55 @@
+import importlib
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+MODES = ("Battle Royale", "Team Deathmatch", "Arcade")
+MAPS = ("Erangel", "Miramar", "Sanhok", "Vikendi")
+
+
+def import_app(name, workdir):
+    """Import an app module; they create their data directories in the working directory"""
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return importlib.import_module(name)
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture(scope="module", params=["dashboard_server", "standalone_app", "ngrok_server"])
+def analyzer_cls(request, tmp_path_factory):
+    if request.param == "ngrok_server":
+        pytest.importorskip("pyngrok")
+    return import_app(request.param, tmp_path_factory.mktemp(request.param)).SimpleAnalyzer
+
+
+def per_match(analyzer_cls, match, metrics):
+    """What analyze() reports for a match with these metrics"""
+    analyzer = analyzer_cls(*match)
+    analyzer.metrics = metrics
+    analyzer._generate_recommendations()
+    summary = analyzer._generate_summary()
+    return analyzer.recommendations, summary if summary is not None else analyzer.summary
+
+
+def test_batch_matches_per_match_analysis(analyzer_cls):
+    matches = [
+        (f"m{i}", mode, map_name)
+        for i, (mode, map_name) in enumerate(itertools.islice(itertools.cycle(itertools.product(MODES, MAPS)), 2000))
+    ]
+    results = analyzer_cls.analyze_batch(matches, rng=np.random.default_rng(0))
+    assert [result["match_id"] for result in results] == [match[0] for match in matches]
+    for match, result in zip(matches, results):
+        recommendations, summary = per_match(analyzer_cls, match, result["metrics"])
+        assert result["recommendations"] == recommendations
+        assert result["summary"] == summary
+
+
+def test_batch_metrics_stay_in_their_ranges(analyzer_cls):
+    results = analyzer_cls.analyze_batch([("m", "Solo", "Erangel")] * 500, rng=np.random.default_rng(1))
+    for (category, name), (low, high) in analyzer_cls.SCORE_RANGES.items():
+        values = [result["metrics"][category][name] for result in results]
+        assert low <= min(values) and max(values) <= high
@@ -0,0 +1,57 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("mss")
+
+from backend.capture import FrameReader, FrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing(4, 2, 2, 3)
+    yield ring
+    ring.close()
+
+
+def write(ring, count):
+    for _ in range(count):
+        seq, slot = ring.claim()
+        slot[:] = seq % 256
+        ring.commit(seq, float(seq))
+
+
+def drain(reader):
+    seqs = []
+    while (frame := reader.next_frame()) is not None:
+        seqs.append(frame[0])
+        assert np.all(frame[2] == frame[0] % 256)
+    return seqs
+
+
+def test_each_reader_has_its_own_cursor(ring):
+    first, second = FrameReader(ring), FrameReader(ring)
+    write(ring, 6)
+    assert drain(first) == [3, 4, 5, 6]
+    assert first.stats()["dropped"] == 2
+    write(ring, 1)
+    assert drain(first) == [7]
+    assert drain(second) == [4, 5, 6, 7]
+    assert second.stats() == {"read": 7, "pending": 0, "dropped": 3}
+
+
+def test_threads_sharing_a_reader_get_each_frame_once():
+    ring = FrameRing(1024, 1, 1, 1)
+    try:
+        reader = FrameReader(ring)
+        write(ring, 1000)
+        results = [[] for _ in range(8)]
+        threads = [threading.Thread(target=lambda out=out: out.extend(drain(reader))) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(seq for out in results for seq in out) == list(range(1, 1001))
+    finally:
+        ring.close()
@@ -0,0 +1,100 @@
+import struct
+
+import numpy as np
+import pytest
+
+from backend.containers import decodable_seconds
+
+cv2 = pytest.importorskip("cv2")
+
+FPS = 10
+FRAME_COUNT = 100
+
+
+def write_video(path, fourcc):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), FPS, (96, 64))
+    if not writer.isOpened():
+        pytest.skip(f"OpenCV cannot write {fourcc} to {path.suffix}")
+    rng = np.random.default_rng(0)
+    for _ in range(FRAME_COUNT):
+        writer.write(rng.integers(0, 255, size=(64, 96, 3), dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def boxes(data):
+    offset = 0
+    while offset < len(data):
+        size, kind = struct.unpack_from(">I4s", data, offset)
+        yield kind, data[offset:offset + size]
+        offset += size
+
+
+def fast_start(data):
+    """Move an MP4's moov box ahead of its media data, shifting the chunk offsets"""
+    top = list(boxes(data))
+    moov = bytearray(next(box for kind, box in top if kind == b"moov"))
+    stco = moov.find(b"stco")
+    for i in range(struct.unpack_from(">I", moov, stco + 8)[0]):
+        offset = stco + 12 + 4 * i
+        struct.pack_into(">I", moov, offset, struct.unpack_from(">I", moov, offset)[0] + len(moov))
+    ftyp = top[0][1]
+    return ftyp + bytes(moov) + b"".join(box for kind, box in top[1:] if kind != b"moov")
+
+
+def decode(path):
+    capture = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+@pytest.fixture(params=["mkv", "mp4"])
+def video(request, tmp_path):
+    if request.param == "mkv":
+        return write_video(tmp_path / "match.mkv", "MJPG")
+    path = write_video(tmp_path / "recorded.mp4", "mp4v")
+    fast = tmp_path / "match.mp4"
+    fast.write_bytes(fast_start(path.read_bytes()))
+    return fast
+
+
+def test_full_file_is_decodable(video):
+    assert decodable_seconds(video, video.stat().st_size) >= (FRAME_COUNT - 10) / FPS
+
+
+@pytest.mark.parametrize("fraction", [0.2, 0.5, 0.8])
+def test_frames_before_the_reported_point_are_on_disk(video, tmp_path, fraction):
+    data = video.read_bytes()
+    ready = int(len(data) * fraction)
+    seconds = decodable_seconds(video, ready)
+    assert 0 < seconds < FRAME_COUNT / FPS
+
+    # What an upload's .part file looks like: the prefix, then preallocated zeros
+    partial = tmp_path / f"partial{video.suffix}"
+    partial.write_bytes(data[:ready] + bytes(len(data) - ready))
+    expected = decode(video)[:int(seconds * FPS)]
+    assert len(expected) >= fraction * FRAME_COUNT - 2 * FPS
+    decoded = decode(partial)[:len(expected)]
+    assert len(decoded) == len(expected)
+    assert all(np.array_equal(a, b) for a, b in zip(decoded, expected))
+
+
+def test_index_at_the_end_is_not_decodable_early(tmp_path):
+    video = write_video(tmp_path / "match.mp4", "mp4v")
+    data = video.read_bytes()
+    kinds = [kind for kind, _ in boxes(data)]
+    assert kinds.index(b"moov") > kinds.index(b"mdat")
+    assert decodable_seconds(video, len(data) - 16) is None
+    assert decodable_seconds(video, len(data)) == pytest.approx(FRAME_COUNT / FPS)
+
+
+def test_unknown_container(tmp_path):
+    path = tmp_path / "match.avi"
+    path.write_bytes(b"RIFF" + bytes(100))
+    assert decodable_seconds(path, 104) is None
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from backend.events import EventBroker, job_listener, match_topic
+from backend.jobs import COMPLETED
+
+
+def drain(subscription):
+    messages = []
+    while True:
+        try:
+            messages.append(subscription.get(timeout=0))
+        except EOFError:
+            return messages
+
+
+def test_late_subscriber_receives_the_terminal_event():
+    broker = EventBroker()
+    listener = job_listener(broker)
+    job = SimpleNamespace(id="j1", metadata={"match_id": "m1"}, progress=1.0, result={"match_id": "m1"})
+    listener(job, "running", None)
+    listener(job, COMPLETED, None)
+
+    subscription = broker.subscribe(match_topic("m1"), 0, create=False)
+    messages = drain(subscription)
+    assert [message.split("\n")[1] for message in messages] == ["event: status", "event: result"]
+
+
+def test_closed_topic_is_forgotten_after_the_grace_period():
+    broker = EventBroker(grace=0)
+    broker.publish("t", "result", {})
+    broker.close_topic("t")
+    assert broker.subscribe("t", 0, create=False) is None
+    assert broker.stats()["topics"] == 0
+
+
+def test_many_idle_async_subscribers_share_one_thread():
+    broker = EventBroker()
+    broker.publish("t", "status", {})
+
+    async def read_all(subscription):
+        return [message async for message in subscription.astream(heartbeat=60)]
+
+    async def scenario():
+        threads = threading.active_count()
+        subscriptions = [broker.subscribe("t") for _ in range(1000)]
+        tasks = [asyncio.create_task(read_all(subscription)) for subscription in subscriptions]
+        await asyncio.sleep(0.1)
+        assert threading.active_count() == threads
+        # Published from another thread, as job workers do
+        publisher = threading.Thread(target=lambda: (broker.publish("t", "result", {}), broker.close_topic("t")))
+        publisher.start()
+        streams = await asyncio.wait_for(asyncio.gather(*tasks), 10)
+        publisher.join()
+        return streams
+
+    streams = asyncio.run(scenario())
+    assert all(len(stream) == 2 and "event: result" in stream[1] for stream in streams)
+    assert broker.stats()["subscribers"] == 0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from backend.analyzer import GameplayAnalyzer
+from backend.batch import METRIC_KEYS
+from backend.executor import DEFAULT_ANALYZER, InlineExecutor, ProcessPoolAnalysisExecutor, load_analyzer
+
+
+@pytest.fixture
+def frames():
+    return np.random.default_rng(0).integers(0, 255, size=(12, 108, 192, 3), dtype=np.uint8)
+
+
+def test_default_analyzer_loads():
+    assert load_analyzer(DEFAULT_ANALYZER) is GameplayAnalyzer
+
+
+def test_simulated_analysis_has_every_metric(tmp_path):
+    result = InlineExecutor().analyze(str(tmp_path))
+    for category, name in METRIC_KEYS:
+        assert 0 <= result["metrics"][category][name] <= 1
+    assert result["recommendations"]
+
+
+def test_windows_merge_like_one_pass(frames):
+    timestamps = np.arange(len(frames)) / 10
+    whole = GameplayAnalyzer("m")
+    whole.feed(timestamps, frames)
+
+    windowed = GameplayAnalyzer("m")
+    accumulator = None
+    for part in (slice(0, 5), slice(5, None)):
+        accumulator = windowed.accumulate(accumulator, windowed.extract_features(timestamps[part], frames[part]))
+    assert windowed.summarize(accumulator)["metrics"] == whole.finish()["metrics"]
+
+
+def test_process_pool_reads_frames_from_shared_memory(tmp_path, frames):
+    executor = ProcessPoolAnalysisExecutor(workers=1)
+    try:
+        assert len(executor.warm()) == 1
+        pooled = executor.analyze(str(tmp_path), frames)
+    finally:
+        executor.shutdown()
+    inline = InlineExecutor().analyze(str(tmp_path), frames)
+    assert pooled["frames_analyzed"] == len(frames)
+    assert pooled["metrics"] == inline["metrics"]
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from backend import live
+from backend.events import EventBroker
+from backend.live import LiveSession, LiveSessionRegistry
+
+
+class StubCapture:
+    """Capture stand-in whose ring never receives a frame"""
+
+    fps = 10
+
+    def __init__(self):
+        self.ring = self
+        self.running = False
+        self.closed = False
+
+    def latest(self):
+        return None
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        self.stop()
+        self.closed = True
+
+    def stats(self):
+        return {}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def fast_idle_checks(monkeypatch):
+    monkeypatch.setattr(live, "IDLE_CHECK_INTERVAL", 0.01)
+
+
+def test_unwatched_session_expires_and_frees_its_slot():
+    broker = EventBroker()
+    registry = LiveSessionRegistry(max_sessions=1)
+    capture = StubCapture()
+    session = registry.add(LiveSession(capture, {}, broker, idle_timeout=0.1))
+    with pytest.raises(RuntimeError):
+        registry.add(LiveSession(StubCapture(), {}, broker))
+
+    wait_for(lambda: session.expired)
+    assert not capture.running
+    registry.add(LiveSession(StubCapture(), {}, broker))
+    assert capture.closed
+    assert registry.get(session.id) is None
+
+
+def test_session_runs_while_subscribed():
+    broker = EventBroker()
+    registry = LiveSessionRegistry()
+    session = LiveSession(StubCapture(), {}, broker, idle_timeout=0.1)
+    subscription = broker.subscribe(session.topic)
+    registry.add(session)
+    time.sleep(0.3)
+    assert not session.expired
+
+    subscription.close()
+    wait_for(lambda: session.expired)
+    assert len(registry) == 0
@@ -0,0 +1,130 @@
+import asyncio
+import importlib
+import json
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("mss")
+
+from backend.events import match_topic
+
+SUBSCRIBERS = 300
+
+
+@pytest.fixture(scope="module")
+def main(tmp_path_factory):
+    # dashboard_server creates its data directories in the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("main"))
+    try:
+        yield importlib.import_module("backend.main")
+    finally:
+        os.chdir(cwd)
+
+
+class Client:
+    """Drive one HTTP request through the ASGI app without a server"""
+
+    def __init__(self, app, method, path, body=b"", headers=()):
+        self.app = app
+        self.scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("test", 1),
+            "headers": [(b"content-type", b"application/json"), *headers],
+        }
+        self.body = body
+        self.status = None
+        self.chunks = []
+        self.disconnected = asyncio.Event()
+        self.started = asyncio.Event()
+        self._sent_body = False
+
+    async def receive(self):
+        if not self._sent_body:
+            self._sent_body = True
+            return {"type": "http.request", "body": self.body, "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            self.chunks.append(message.get("body", b""))
+            self.started.set()
+
+    async def run(self):
+        await self.app(self.scope, self.receive, self.send)
+        return self
+
+    @property
+    def text(self):
+        return b"".join(self.chunks).decode()
+
+
+def request(main, method, path, body=b""):
+    return asyncio.run(Client(main.app, method, path, body).run())
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"[1, 2]", b"\xff"])
+def test_malformed_json_is_a_bad_request(main, body):
+    assert request(main, "POST", "/api/simulate-match", body).status == 400
+    assert request(main, "POST", "/api/live/sessions", body).status == 400
+
+
+def test_live_session_options_are_validated(main):
+    for options in ({"fps": "10"}, {"fps": True}, {"fps": 0}, {"monitor": "a"}):
+        assert request(main, "POST", "/api/live/sessions", json.dumps(options).encode()).status == 400
+
+
+def test_idle_match_subscribers_hold_no_threads(main):
+    async def scenario():
+        topic = match_topic("m1")
+        main.EVENTS.publish(topic, "status", {"status": "running"})
+        threads = threading.active_count()
+
+        clients = [Client(main.app, "GET", "/api/matches/m1/events") for _ in range(SUBSCRIBERS)]
+        tasks = [asyncio.create_task(client.run()) for client in clients]
+        await asyncio.gather(*(client.started.wait() for client in clients))
+        assert main.EVENTS.subscriber_count(topic) == SUBSCRIBERS
+        # Every idle stream is a suspended coroutine; at most the thread pool's first worker appears
+        assert threading.active_count() <= threads + 1
+
+        main.EVENTS.publish(topic, "result", {"match_id": "m1"})
+        main.EVENTS.close_topic(topic)
+        await asyncio.wait_for(asyncio.gather(*tasks), 10)
+        assert all(client.status == 200 for client in clients)
+        assert all("event: status" in client.text and "event: result" in client.text for client in clients)
+
+    asyncio.run(scenario())
+
+
+def test_disconnected_subscriber_is_dropped(main):
+    async def scenario():
+        topic = match_topic("m2")
+        main.EVENTS.publish(topic, "status", {"status": "running"})
+        client = Client(main.app, "GET", "/api/matches/m2/events")
+        task = asyncio.create_task(client.run())
+        await client.started.wait()
+        assert main.EVENTS.subscriber_count(topic) == 1
+        client.disconnected.set()
+        await asyncio.wait_for(task, 10)
+        assert main.EVENTS.subscriber_count(topic) == 0
+
+    asyncio.run(scenario())
+
+
+def test_queued_simulation_streams_progress_and_result(main):
+    async def scenario():
+        response = await Client(main.app, "POST", "/api/simulate-match", b'{"wait": false}').run()
+        assert response.status == 202
+        events_url = json.loads(response.text)["events_url"]
+        stream = await asyncio.wait_for(Client(main.app, "GET", events_url).run(), 10)
+        return stream.text
+
+    text = asyncio.run(scenario())
+    assert "event: result" in text
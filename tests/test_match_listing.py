@@ -0,0 +1,24 @@
+import importlib
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="module", params=["dashboard_server", "standalone_app"])
+def client(request, tmp_path_factory):
+    # The apps create their data directories in the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp(request.param))
+    try:
+        module = importlib.import_module(request.param)
+    finally:
+        os.chdir(cwd)
+    return module.app.test_client()
+
+
+@pytest.mark.parametrize("path", ["/api/matches", "/api/matches.ndjson"])
+@pytest.mark.parametrize("query", ["limit=abc", "sort=nope", "cursor=not-a-cursor"])
+def test_invalid_query_is_rejected_before_revalidation(client, path, query):
+    etag = client.get(path).headers["ETag"]
+    response = client.get(f"{path}?{query}", headers={"If-None-Match": etag})
+    assert response.status_code == 400
@@ -0,0 +1,114 @@
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP = textwrap.dedent('''
+    import os
+    import time
+
+    def app(environ, start_response):
+        if environ["PATH_INFO"] == "/slow":
+            time.sleep(1)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [str(os.getpid()).encode()]
+''')
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="prefork needs os.fork")
+
+
+@pytest.fixture
+def launch(tmp_path):
+    (tmp_path / "prefork_app.py").write_text(APP)
+    processes = []
+
+    def start(*args):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path), REPO_ROOT]))
+        process = subprocess.Popen(
+            [sys.executable, "-m", "backend.prefork", "prefork_app:app",
+             "--host", "127.0.0.1", "--port", "0", *args],
+            env=env, stdout=subprocess.PIPE, text=True,
+        )
+        processes.append(process)
+        # "Serving on 127.0.0.1:<port> with N workers (master pid P)"
+        line = process.stdout.readline()
+        port = int(line.split()[2].rsplit(":", 1)[1])
+        return process, port
+
+    yield start
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+
+
+def get(port, path="/"):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        return response.status, int(response.read())
+    finally:
+        connection.close()
+
+
+def test_workers_share_the_socket(launch):
+    _, port = launch("--workers", "2", "--max-requests", "0")
+    # Whichever worker accepts first takes a connection, so keep asking until both have
+    deadline = time.monotonic() + 10
+    pids = set()
+    while time.monotonic() < deadline and len(pids) < 2:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: get(port), range(16)))
+        assert all(status == 200 for status, _ in results)
+        pids |= {pid for _, pid in results}
+    assert len(pids) == 2
+
+
+def test_recycling_never_drops_a_request(launch):
+    _, port = launch("--workers", "2", "--max-requests", "5")
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: get(port), range(60)))
+    assert all(status == 200 for status, _ in results)
+    # Each worker serves at most its budget before a fresh one takes over
+    pids = [pid for _, pid in results]
+    assert len(set(pids)) >= 60 // 5
+    assert max(pids.count(pid) for pid in set(pids)) <= 5
+
+
+def test_rolling_restart_replaces_every_worker(launch):
+    process, port = launch("--workers", "2", "--max-requests", "0")
+    with ThreadPoolExecutor(4) as pool:
+        before = {pid for _, pid in pool.map(lambda _: get(port, "/slow"), range(4))}
+    process.send_signal(signal.SIGHUP)
+
+    deadline = time.monotonic() + 10
+    after = set()
+    while time.monotonic() < deadline and (len(after) < 2 or after & before):
+        with ThreadPoolExecutor(4) as pool:
+            after = {pid for _, pid in pool.map(lambda _: get(port, "/slow"), range(4))}
+    assert len(after) == 2 and not after & before
+
+
+def test_sigterm_drains_in_flight_requests(launch):
+    process, port = launch("--workers", "2", "--max-requests", "0")
+    results = []
+    request = threading.Thread(target=lambda: results.append(get(port, "/slow")))
+    request.start()
+    time.sleep(0.3)
+    process.send_signal(signal.SIGTERM)
+    request.join()
+    assert results and results[0][0] == 200
+    assert process.wait(timeout=10) == 0
+    with pytest.raises(OSError):
+        get(port)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from backend.batch import METRIC_COUNT, METRIC_KEYS
+from backend.pros import DEFAULT_K, DEFAULT_NPROBE, MAX_K, ProIndex, build_index, k_from_args, simulate_reference
+
+LISTS = 100
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return simulate_reference(20_000, pros=200, rng=np.random.default_rng(0))
+
+
+@pytest.fixture(scope="module")
+def index(reference, tmp_path_factory):
+    index_dir = tmp_path_factory.mktemp("pro_index")
+    build_index(*reference, index_dir=str(index_dir), lists=LISTS, rng=np.random.default_rng(0))
+    return ProIndex.load(str(index_dir))
+
+
+@pytest.fixture(scope="module")
+def queries(reference):
+    vectors = reference[0]
+    rng = np.random.default_rng(1)
+    picked = vectors[rng.choice(len(vectors), 100, replace=False)]
+    return np.clip(picked + rng.normal(0, 0.05, size=picked.shape), 0, 1).astype(np.float32)
+
+
+def brute_force(index, reference, query, k):
+    """(pros, distances) of the exact k nearest pros, by each pro's closest match"""
+    vectors, players, _ = reference
+    distances = np.sqrt((((vectors - query) * index.scale) ** 2).sum(axis=1))
+    order = np.argsort(distances, kind="stable")
+    _, first = np.unique(players[order], return_index=True)
+    best = order[np.sort(first)[:k]]
+    return players[best], distances[best]
+
+
+def test_recall_against_brute_force(index, reference, queries):
+    k = 10
+    recall = np.mean([
+        len(set(brute_force(index, reference, query, k)[0]) & set(index.players[index.search(query, k)[0]])) / k
+        for query in queries
+    ])
+    assert DEFAULT_NPROBE < LISTS
+    assert recall >= 0.9
+
+
+def test_probing_every_list_is_exact(index, reference, queries):
+    for query in queries[:20]:
+        rows, distances = index.search(query, 10, nprobe=LISTS)
+        expected_pros, expected_distances = brute_force(index, reference, query, 10)
+        assert list(index.players[rows]) == list(expected_pros)
+        np.testing.assert_allclose(distances, expected_distances, rtol=1e-3, atol=1e-3)
+
+
+def test_results_are_distinct_pros_nearest_first(index, queries):
+    rows, distances = index.search(queries[0], MAX_K)
+    assert len(rows) == MAX_K
+    assert len(set(index.players[rows])) == MAX_K
+    assert list(distances) == sorted(distances)
+
+
+def test_compare_reports_deltas(index, queries):
+    query = queries[0]
+    [pro] = index.compare(query, k=1)
+    reference = index.vectors[index.search(query, 1)[0][0]]
+    assert {"name", "team", "distance", "metrics", "deltas"} <= set(pro)
+    for column, (category, name) in enumerate(METRIC_KEYS):
+        assert pro["metrics"][category][name] == pytest.approx(reference[column], abs=1e-4)
+        assert pro["deltas"][category][name] == pytest.approx(query[column] - reference[column], abs=1e-4)
+
+
+def test_build_validation(tmp_path):
+    with pytest.raises(ValueError):
+        build_index(np.zeros((10, METRIC_COUNT - 1)), np.zeros(10), [], index_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        build_index(np.zeros((10, METRIC_COUNT)), np.zeros(9), [], index_dir=str(tmp_path))
+    assert ProIndex.load(str(tmp_path)) is None
+
+
+@pytest.mark.parametrize("value", ["0", str(MAX_K + 1), "five"])
+def test_k_from_args_rejects(value):
+    with pytest.raises(ValueError):
+        k_from_args({"k": value})
+
+
+def test_k_from_args_default():
+    assert k_from_args({}) == DEFAULT_K and k_from_args({"k": "12"}) == 12
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from backend.batch import METRIC_COUNT, MetricBatch
+from backend.recommendations import DEMO_RULES, STANDALONE_RULES
+
+
+def baseline_demo(metrics):
+    """(category, title, priority) of the original dashboard_server if-chain"""
+    aim, positioning, decisions = metrics["aim"], metrics["positioning"], metrics["decision_making"]
+    recommendations = []
+    if aim["accuracy"] < 0.7:
+        recommendations.append(("aim", "Improve Aim Accuracy", "high"))
+    if aim["recoil_control"] < 0.6:
+        recommendations.append(("aim", "Enhance Recoil Control", "medium"))
+    if positioning["cover_usage"] < 0.6:
+        recommendations.append(("positioning", "Utilize Cover Better", "high"))
+    if positioning["zone_awareness"] < 0.7:
+        recommendations.append(("positioning", "Improve Zone Management", "medium"))
+    if decisions["engagement_choices"] < 0.6:
+        recommendations.append(("decision_making", "Better Engagement Decisions", "high"))
+    if decisions["item_management"] < 0.7:
+        recommendations.append(("decision_making", "Optimize Item Management", "low"))
+    recommendations.append(("general", "Consistent Practice Schedule", "medium"))
+    return recommendations
+
+
+def baseline_standalone(metrics):
+    """(category, title, priority) of the original standalone_app if-chain"""
+    aim, positioning, decisions = metrics["aim"], metrics["positioning"], metrics["decision_making"]
+    recommendations = []
+    if aim["accuracy"] < 0.6:
+        recommendations.append(("aim", "Improve Aim Accuracy", "high" if aim["accuracy"] < 0.4 else "medium"))
+    if aim["recoil_control"] < 0.6:
+        recommendations.append(("aim", "Work on Recoil Control", "medium"))
+    if aim["headshot_percentage"] < 0.3:
+        recommendations.append(("aim", "Aim for Headshots", "medium"))
+    if positioning["cover_usage"] < 0.6:
+        priority = "high" if positioning["cover_usage"] < 0.4 else "medium"
+        recommendations.append(("positioning", "Utilize Cover Better", priority))
+    if positioning["zone_awareness"] < 0.7:
+        recommendations.append(("positioning", "Improve Zone Awareness", "medium"))
+    if decisions["engagement_choices"] < 0.6:
+        priority = "high" if decisions["engagement_choices"] < 0.4 else "medium"
+        recommendations.append(("decision_making", "Better Engagement Decisions", priority))
+    if decisions["item_management"] < 0.7:
+        recommendations.append(("decision_making", "Improve Item Management", "medium"))
+
+    average = sum(sum(metrics[c].values()) / len(metrics[c]) for c in ("aim", "positioning", "decision_making")) / 3
+    if average < 0.5:
+        recommendations.append(("general", "Fundamentals Practice", "high"))
+    elif average < 0.7:
+        recommendations.append(("general", "Consistent Practice", "medium"))
+    else:
+        recommendations.append(("general", "Advanced Techniques", "low"))
+    return recommendations
+
+
+def summarize(recommendations):
+    return [(r["category"], r["title"], r["priority"]) for r in recommendations]
+
+
+@pytest.fixture
+def batch():
+    # Two-decimal scores hit every threshold exactly, as the simulated metrics do
+    values = np.round(np.random.default_rng(0).uniform(0.2, 1.0, size=(3000, METRIC_COUNT)), 2)
+    return MetricBatch(values)
+
+
+@pytest.mark.parametrize("rules, baseline", [(DEMO_RULES, baseline_demo), (STANDALONE_RULES, baseline_standalone)])
+def test_rules_match_the_original_if_chains(batch, rules, baseline):
+    metrics_list = list(batch.iter_metrics())
+    expected = [baseline(metrics) for metrics in metrics_list]
+    assert [summarize(rules.recommend(metrics)) for metrics in metrics_list] == expected
+    assert [summarize(recommendations) for recommendations in rules.recommend_batch(batch)] == expected
+
+
+def test_recommendations_are_interned():
+    metrics = next(MetricBatch(np.full((1, METRIC_COUNT), 0.3)).iter_metrics())
+    assert all(a is b for a, b in zip(DEMO_RULES.recommend(metrics), DEMO_RULES.recommend(metrics)))
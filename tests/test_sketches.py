@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from backend import sketches
+from backend.batch import METRIC_KEYS
+from backend.sketches import DEFAULT_K, KLLSketch, MetricSketches, metric_column_of
+
+# Rank error allowed at the default k; observed errors are around 0.6%
+RANK_ERROR = 0.02
+
+
+@pytest.fixture(autouse=True)
+def seeded(monkeypatch):
+    monkeypatch.setattr(sketches, "_rng", sketches.random.Random(0))
+
+
+def rank_errors(sketch, data):
+    """Largest gap between estimated and true rank over the percentiles of `data`"""
+    values, cumulative = sketch.weighted_items()
+    exact = np.sort(data.astype(np.float32))
+    points = np.quantile(exact, np.linspace(0.01, 0.99, 99)).astype(np.float32)
+    estimated = cumulative[np.searchsorted(values, points, side="right") - 1] / cumulative[-1]
+    true = np.searchsorted(exact, points, side="right") / len(exact)
+    return np.abs(estimated - true).max()
+
+
+@pytest.fixture
+def data():
+    return np.random.default_rng(0).lognormal(size=50_000)
+
+
+def test_rank_error_and_size_are_bounded(data):
+    sketch = KLLSketch()
+    for value in data:
+        sketch.update(value)
+    assert sketch.count == len(data)
+    assert sketch.weighted_items()[1][-1] == len(data)
+    assert sum(len(items) for items in sketch.levels) < 3 * DEFAULT_K
+    assert rank_errors(sketch, data) < RANK_ERROR
+
+
+def test_merged_slices_keep_the_error_bound(data):
+    parts = [KLLSketch() for _ in range(8)]
+    for i, value in enumerate(data):
+        parts[i % 8].update(value)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.count == len(data)
+    assert merged.weighted_items()[1][-1] == len(data)
+    assert rank_errors(merged, data) < RANK_ERROR
+
+
+def test_serialization_round_trip():
+    rng = np.random.default_rng(1)
+    original = MetricSketches(k=50)
+    for _ in range(2000):
+        original.add(rng.normal(50, 15, size=len(METRIC_KEYS)))
+    restored = MetricSketches.from_bytes(original.to_bytes())
+
+    assert restored.k == 50 and restored.count == 2000
+    for a, b in zip(original.sketches, restored.sketches):
+        assert b.count == a.count
+        assert b.levels == [np.float32(items).tolist() for items in a.levels]
+    compiled, recompiled = original.compile(), restored.compile()
+    for column in range(len(METRIC_KEYS)):
+        assert recompiled.quantile(column, 0.5) == compiled.quantile(column, 0.5)
+        assert recompiled.percentile(column, 50) == compiled.percentile(column, 50)
+
+    # A restored sketch keeps accepting values
+    restored.add(np.zeros(len(METRIC_KEYS)))
+    assert restored.count == 2001
+
+
+def test_compiled_queries():
+    metrics = MetricSketches()
+    assert metrics.compile().percentile(0, 1.0) is None
+    assert metrics.compile().quantile(0, 0.5) is None
+
+    for value in range(1, 101):
+        metrics.add([value] * len(METRIC_KEYS))
+    compiled = metrics.compile()
+    assert compiled.percentile(0, 0) == 0
+    assert compiled.percentile(0, 50) == 50
+    assert compiled.percentile(0, 1000) == 100
+    assert compiled.quantile(0, 0.5) == 50
+    assert compiled.quantile(0, 1.0) == 100
+
+
+def test_metric_column_of():
+    category, name = METRIC_KEYS[0]
+    assert metric_column_of(name) == 0
+    assert metric_column_of(f"{category}.{name}") == 0
+    with pytest.raises(ValueError):
+        metric_column_of(f"no_such_category.{name}")
+    with pytest.raises(ValueError):
+        metric_column_of("no_such_metric")
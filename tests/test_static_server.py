@@ -0,0 +1,84 @@
+import functools
+import http.client
+import threading
+
+import pytest
+
+from backend.static_server import StaticFileHandler, StaticServer, parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-0", (0, 1)),
+    ("bytes=0-", (0, 100)),
+    ("bytes=10-19", (10, 20)),
+    ("bytes=90-200", (90, 100)),
+    ("bytes=-10", (90, 100)),
+    ("bytes=-500", (0, 100)),
+    (None, None),
+    ("bytes=0-9,20-29", None),
+    ("bytes=20-10", None),
+    ("bytes=-", None),
+    ("items=0-9", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header, length", [
+    ("bytes=-0", 100),
+    ("bytes=100-", 100),
+    ("bytes=150-160", 100),
+    ("bytes=0-0", 0),
+    ("bytes=-5", 0),
+])
+def test_unsatisfiable_range(header, length):
+    with pytest.raises(ValueError):
+        parse_range(header, length)
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "data.bin").write_bytes(bytes(range(256)) * 4)
+    handler = functools.partial(StaticFileHandler, directory=str(tmp_path))
+    httpd = StaticServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(port, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request("GET", "/data.bin", headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_range_requests(server):
+    status, headers, body = get(server, {"Range": "bytes=10-19"})
+    assert status == 206
+    assert headers["Content-Range"] == "bytes 10-19/1024"
+    assert body == bytes(range(10, 20))
+
+    status, headers, _ = get(server, {"Range": "bytes=-0"})
+    assert status == 416
+    assert headers["Content-Range"] == "bytes */1024"
+
+    status, _, body = get(server, {"Range": "bytes=0-9,20-29"})
+    assert status == 200 and len(body) == 1024
+
+
+def test_etag_revalidation_and_if_range(server):
+    status, headers, _ = get(server)
+    etag = headers["ETag"]
+    assert status == 200
+
+    assert get(server, {"If-None-Match": etag})[0] == 304
+    assert get(server, {"If-None-Match": '"stale"'})[0] == 200
+    assert get(server, {"Range": "bytes=0-9", "If-Range": etag})[0] == 206
+    # A stale validator gets the whole, current file
+    assert get(server, {"Range": "bytes=0-9", "If-Range": '"stale"'})[0] == 200
@@ -0,0 +1,93 @@
+import json
+
+import os
+
+import pytest
+
+from backend.artifacts import write_analysis
+from backend.batch import METRIC_KEYS
+from backend.store import MatchStore, bytes_etag, query_from_args
+
+
+def make_metrics(value):
+    metrics = {}
+    for category, name in METRIC_KEYS:
+        metrics.setdefault(category, {})[name] = value
+    return metrics
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MatchStore(str(tmp_path / "matches.db"))
+
+
+def test_player_trends_across_matches(store):
+    store.save({"id": "m1", "player_id": "p1"}, {"metrics": make_metrics(0.4)})
+    store.save({"id": "m2", "player_id": "p1"}, {"metrics": make_metrics(0.8)})
+    # A re-save of the same match does not count twice
+    store.save({"id": "m2", "player_id": "p1"}, {"metrics": make_metrics(0.8)})
+
+    body, etag = store.get_player_trends("p1")
+    trends = json.loads(body)
+    assert trends["player_id"] == "p1"
+    assert trends["matches"] == 2
+    accuracy = trends["metrics"]["aim"]["accuracy"]
+    assert accuracy["latest"] == 0.8
+    assert accuracy["mean_10"] == pytest.approx(0.6)
+    assert etag
+    assert store.get_player_trends("p2") is None
+
+
+def test_invalid_cursor_fails_before_streaming(store):
+    store.save({"id": "m1"})
+    with pytest.raises(ValueError):
+        store.iter_record_json(cursor="not-a-cursor")
+    assert [json.loads(record)["id"] for record in store.iter_record_json()] == ["m1"]
+
+
+def test_serialized_analysis_gets_a_score(store):
+    store.save({"id": "low"}, json.dumps({"metrics": make_metrics(0.3)}))
+    store.save({"id": "high"}, json.dumps({"metrics": make_metrics(0.9)}))
+    matches, _ = store.query(filters={"min_score": 0.5})
+    assert [match["id"] for match in matches] == ["high"]
+
+
+def test_query_args_reject_an_invalid_cursor():
+    with pytest.raises(ValueError):
+        query_from_args({"cursor": "not-a-cursor"})
+
+
+def test_analysis_body_follows_the_file_it_is_versioned_by(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.db"), str(tmp_path))
+    match_dir = tmp_path / "m1"
+    match_dir.mkdir()
+    old = write_analysis(str(match_dir), {"metrics": make_metrics(0.4)})
+    store.save({"id": "m1"}, old)
+    assert store.get_analysis_body("m1")[0] == old.encode()
+
+    # A new analysis is on disk but not yet saved to the store
+    new = write_analysis(str(match_dir), {"metrics": make_metrics(0.8)})
+    os.utime(match_dir / "analysis.json", ns=(1, 10 ** 18))
+    body, etag, encoding = store.get_analysis_body("m1")
+    assert body == new.encode()
+    assert etag == bytes_etag(body)
+    gzipped, gzip_etag, _ = store.get_analysis_body("m1", "gzip")
+    assert gzip_etag == f"{bytes_etag(gzipped)}-gzip"
+
+
+def test_missing_variant_fallback_is_cached(tmp_path, monkeypatch):
+    store = MatchStore(str(tmp_path / "matches.db"), str(tmp_path))
+    match_dir = tmp_path / "m1"
+    match_dir.mkdir()
+    body = write_analysis(str(match_dir), {"metrics": make_metrics(0.4)})
+    store.save({"id": "m1"}, body)
+    for name in os.listdir(match_dir):
+        if name != "analysis.json":
+            os.unlink(match_dir / name)
+
+    assert store.get_analysis_body("m1", "br") == (body.encode(), bytes_etag(body.encode()), "identity")
+    hits = store.cache.stats()["hits"]
+    monkeypatch.setattr("backend.store.read_variant", lambda *args: pytest.fail("variant looked up again"))
+    assert store.get_analysis_body("m1", "br")[2] == "identity"
+    assert store.get_analysis_body("m1")[2] == "identity"
+    assert store.cache.stats()["hits"] == hits + 2
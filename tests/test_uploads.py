@@ -0,0 +1,55 @@
+import hashlib
+import io
+
+import pytest
+
+from backend.uploads import MIN_CHUNK_SIZE, UploadError, UploadManager
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_rejected_resend_does_not_leave_chunk_received(tmp_path):
+    uploads = UploadManager(str(tmp_path))
+    chunks = [b"a" * MIN_CHUNK_SIZE, b"b" * 100]
+    uploads.create("u1", "match.mp4", sum(map(len, chunks)), chunk_size=MIN_CHUNK_SIZE)
+    for index, chunk in enumerate(chunks):
+        uploads.write_chunk("u1", index, io.BytesIO(chunk), sha256(chunk))
+    assert uploads.status("u1")["complete"]
+
+    with pytest.raises(UploadError):
+        uploads.write_chunk("u1", 0, io.BytesIO(b"x" * MIN_CHUNK_SIZE), sha256(chunks[0]))
+    status = uploads.status("u1")
+    assert not status["complete"]
+    assert status["missing"] == [0]
+    with pytest.raises(UploadError):
+        uploads.finish("u1")
+
+    uploads.write_chunk("u1", 0, io.BytesIO(chunks[0]), sha256(chunks[0]))
+    with open(uploads.finish("u1"), "rb") as f:
+        assert f.read() == b"".join(chunks)
+
+
+@pytest.mark.parametrize("size, chunk_size", [
+    (None, None), ("100", None), (True, None), (0, None), (100, "abc"), (100, True), (100, 1.5),
+])
+def test_create_rejects_bad_sizes(tmp_path, size, chunk_size):
+    with pytest.raises(UploadError):
+        UploadManager(str(tmp_path)).create("u1", "match.mp4", size, chunk_size=chunk_size)
+
+
+def test_ready_bytes_is_the_received_prefix(tmp_path):
+    uploads = UploadManager(str(tmp_path))
+    chunks = [b"a" * MIN_CHUNK_SIZE, b"b" * MIN_CHUNK_SIZE, b"c" * 100]
+    uploads.create("u1", "match.mp4", sum(map(len, chunks)), chunk_size=MIN_CHUNK_SIZE)
+    assert uploads.status("u1")["ready_bytes"] == 0
+
+    uploads.write_chunk("u1", 1, io.BytesIO(chunks[1]), sha256(chunks[1]))
+    assert uploads.status("u1")["ready_bytes"] == 0
+    uploads.write_chunk("u1", 0, io.BytesIO(chunks[0]), sha256(chunks[0]))
+    assert uploads.status("u1")["ready_bytes"] == 2 * MIN_CHUNK_SIZE
+    uploads.write_chunk("u1", 2, io.BytesIO(chunks[2]), sha256(chunks[2]))
+    assert uploads.status("u1")["ready_bytes"] == sum(map(len, chunks))
+    with open(uploads.part_path("u1"), "rb") as f:
+        assert f.read(2 * MIN_CHUNK_SIZE) == chunks[0] + chunks[1]
@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import pytest
+
+from backend import windows
+from backend.jobs import JobCancelled
+from backend.windows import WindowedAnalysis
+
+
+class CountingAnalyzer:
+    """Windowed analyzer counting the frames it is given"""
+
+    def __init__(self, on_window=None):
+        self.on_window = on_window
+
+    def extract_features(self, timestamps, frames):
+        return {"frames": np.array([len(frames)])}
+
+    def accumulate(self, accumulator, features):
+        if self.on_window is not None:
+            self.on_window()
+        return (accumulator or 0) + int(features["frames"].sum())
+
+    def summarize(self, accumulator):
+        return {"frames": accumulator}
+
+
+@pytest.fixture
+def video(monkeypatch, tmp_path):
+    """A 3-window recording with one distinct frame per second"""
+    def iter_video_batches(path, sample_fps, batch_size, start=0, end=None):
+        timestamps = np.arange(start, end, dtype=np.float64)
+        frames = np.random.default_rng(int(start)).integers(0, 255, (len(timestamps), 8, 8, 3), dtype=np.uint8)
+        yield timestamps, frames
+
+    monkeypatch.setattr(windows, "probe_video", lambda path: {"duration": 30})
+    monkeypatch.setattr(windows, "iter_video_batches", iter_video_batches)
+    path = tmp_path / "match.mp4"
+    path.write_bytes(b"\0" * 16)
+    return str(path)
+
+
+def test_cancelled_run_stops_between_windows_and_resumes(video, tmp_path):
+    analysis = WindowedAnalysis(str(tmp_path), window_seconds=10)
+    cancel_event = threading.Event()
+    with pytest.raises(JobCancelled):
+        analysis.run(CountingAnalyzer(on_window=cancel_event.set), video, cancel_event)
+    assert analysis.load_checkpoint()["completed"] == 1
+
+    result, timeline = analysis.run(CountingAnalyzer(), video)
+    assert analysis.load_checkpoint()["completed"] == 3
+    assert result["frames"] == timeline["analyzed"]
+
+
+def test_partial_run_resumes_on_the_renamed_file(video, tmp_path):
+    part = tmp_path / "source.mp4.part"
+    (tmp_path / "match.mp4").rename(part)
+    analysis = WindowedAnalysis(str(tmp_path), window_seconds=10)
+    assert analysis.run(CountingAnalyzer(), str(part), max_seconds=25) is None
+    assert analysis.load_checkpoint()["completed"] == 2
+
+    part.rename(video)
+    analyzed = []
+    result, _ = analysis.run(CountingAnalyzer(on_window=lambda: analyzed.append(1)), video)
+    assert len(analyzed) == 1
+    assert result["frames"] == 30
+
+
+def test_segments_are_numbered_across_windows(video, tmp_path):
+    _, timeline = WindowedAnalysis(str(tmp_path), window_seconds=10).run(CountingAnalyzer(), video)
+    segments = timeline["segments"]
+    assert len(segments) > 1
+    assert all(s["start"] <= s["end"] for s in segments)
+    assert all(a["end"] < b["start"] for a, b in zip(segments, segments[1:]))